@@ -0,0 +1,65 @@
+from argparse import ArgumentParser
+import os
+import re
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Accentor import Accentor, ACCENT_TIERS
+
+
+def load_phrases(file_name: str) -> list:
+    re_for_words = re.compile(r'[абвгдеёжзийклмнопрстуфхцчшщъыьэюя]+(?:\-[абвгдеёжзийклмнопрстуфхцчшщъыьэюя]+)*', re.U)
+    phrases = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = re_for_words.findall(' '.join(cur_line.strip().split()[1:]).lower())
+            if len(words) > 0:
+                phrases.append([[it] for it in words])
+    return phrases
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-s', '--src', dest='source_corpus', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Corpus with one text per line (the first token of each line is its identifier).')
+    parser.add_argument('--wiki', dest='use_wiki', action='store_true',
+                        help='Unknown words are looked up in Wiktionary.')
+    args = parser.parse_args()
+
+    phrases = load_phrases(args.source_corpus)
+    print(f'{len(phrases)} phrases, {sum(map(len, phrases))} words.')
+    accentor = Accentor(use_wiki=args.use_wiki)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        durations = dict()
+        for collect_stats in [False, True, False, True]:
+            accentor.collect_stats = collect_stats
+            accentor.reset_tier_stats()
+            start = time.perf_counter()
+            for cur_phrase in phrases:
+                try:
+                    accentor.do_accents(cur_phrase)
+                except:
+                    pass
+            durations[collect_stats] = time.perf_counter() - start
+    print(f'Without statistics: {durations[False]:.3f} s, with statistics: {durations[True]:.3f} s.')
+    stats = accentor.get_tier_stats()
+    n_words = sum(it['hits'] for it in stats['tiers'].values())
+    print(f'{"tier":<16}{"hits":>10}{"share":>10}{"misses":>10}{"time, s":>10}{"us/word":>10}')
+    for cur_tier in ACCENT_TIERS:
+        cur_stats = stats['tiers'][cur_tier]
+        time_per_word = (1e6 * cur_stats['time'] / cur_stats['hits']) if cur_stats['hits'] > 0 else 0.0
+        print(f'{cur_tier:<16}{cur_stats["hits"]:>10}{100.0 * cur_stats["hits"] / n_words:>9.2f}%'
+              f'{cur_stats["misses"]:>10}{cur_stats["time"]:>10.3f}{time_per_word:>10.1f}')
+    print(f'Wiktionary: {stats["wiki"]["requests"]} requests, {stats["wiki"]["errors"]} errors, '
+          f'{stats["wiki"]["time"]:.3f} s.')
+
+
+if __name__ == '__main__':
+    main()
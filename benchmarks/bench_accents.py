@@ -0,0 +1,74 @@
+from argparse import ArgumentParser
+import itertools
+import os
+import random
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Accentor import Accentor
+
+
+def load_corpus_words(file_name: str, accentor: Accentor) -> list:
+    words = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            for cur_word in cur_line.strip().lower().split()[1:]:
+                if cur_word.isalpha() and (cur_word in accentor.simple_words_dawg):
+                    words.append(cur_word)
+    return words
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--words', dest='n_words', type=int, required=False, default=200,
+                        help='Number of words in each test phrase.')
+    parser.add_argument('-p', '--homographs', dest='homographs_part', type=float, required=False, default=0.25,
+                        help='Part of homographs (without morphotags) in each test phrase.')
+    parser.add_argument('-k', '--top', dest='top_k', type=int, required=False, default=100,
+                        help='Number of accent variants generated in the "many" mode.')
+    parser.add_argument('-r', '--repeats', dest='n_repeats', type=int, required=False, default=20,
+                        help='Number of test phrases.')
+    args = parser.parse_args()
+
+    accentor_one = Accentor(mode='one', use_wiki=False)
+    accentor_many = Accentor(mode='many', use_wiki=False)
+    simple_words = load_corpus_words(os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'), accentor_one)
+    homographs = sorted(filter(lambda it: it.isalpha(), accentor_one.homographs.keys()))
+    n_homographs = int(round(args.n_words * args.homographs_part))
+    phrases = []
+    for phrase_idx in range(args.n_repeats):
+        words = simple_words[(phrase_idx * args.n_words):((phrase_idx + 1) * args.n_words - n_homographs)]
+        words += homographs[(phrase_idx * n_homographs):((phrase_idx + 1) * n_homographs)]
+        random.Random(phrase_idx).shuffle(words)
+        phrases.append([[it] for it in words])
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        start = time.perf_counter()
+        for cur_phrase in phrases:
+            accentor_one.do_accents(cur_phrase)
+        duration_one = (time.perf_counter() - start) / len(phrases)
+        start = time.perf_counter()
+        n_variants = 0
+        for cur_phrase in phrases:
+            lattice = accentor_many.get_accents_lattice(cur_phrase)
+            n_variants = max(n_variants, len(list(itertools.islice(itertools.product(*lattice), args.top_k))))
+        duration_many = (time.perf_counter() - start) / len(phrases)
+        sizes = [len(it) for it in lattice]
+        full_size = 1
+        for cur in sizes:
+            full_size *= cur
+
+    print(f'{args.n_words} words per phrase, {n_homographs} of them are homographs.')
+    print(f'Mode "one": {duration_one * 1000.0:.2f} ms per phrase.')
+    print(f'Mode "many": {duration_many * 1000.0:.2f} ms per phrase for the lattice and top-{n_variants} variants '
+          f'(full expansion of the last phrase would contain {full_size:.3e} variants).')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+from argparse import ArgumentParser
+import os
+import re
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Accentor import Accentor
+
+
+def load_phrases(file_name: str) -> list:
+    re_for_words = re.compile(r'[абвгдеёжзийклмнопрстуфхцчшщъыьэюя]+(?:\-[абвгдеёжзийклмнопрстуфхцчшщъыьэюя]+)*', re.U)
+    phrases = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = re_for_words.findall(' '.join(cur_line.strip().split()[1:]).lower())
+            if len(words) > 0:
+                phrases.append([[it] for it in words])
+    return phrases
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-s', '--src', dest='source_corpus', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Corpus with one text per line (the first token of each line is its identifier).')
+    args = parser.parse_args()
+
+    phrases = load_phrases(args.source_corpus)
+    n_words = sum(map(len, phrases))
+    n_unique_words = len(set(it[0] for phrase in phrases for it in phrase))
+    print(f'{len(phrases)} phrases, {n_words} words, {n_unique_words} unique words.')
+    accentor = Accentor(use_wiki=False)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        start = time.perf_counter()
+        results_one_by_one = []
+        for cur_phrase in phrases:
+            try:
+                results_one_by_one.append(accentor.do_accents(cur_phrase))
+            except:
+                results_one_by_one.append([])
+        duration_one_by_one = time.perf_counter() - start
+        start = time.perf_counter()
+        results_batch = accentor.do_accents_batch(phrases)
+        duration_batch = time.perf_counter() - start
+    assert results_one_by_one == results_batch
+    print(f'do_accents phrase by phrase: {duration_one_by_one:.3f} s ({n_words / duration_one_by_one:.0f} words/s)')
+    print(f'do_accents_batch:            {duration_batch:.3f} s ({n_words / duration_batch:.0f} words/s)')
+
+
+if __name__ == '__main__':
+    main()
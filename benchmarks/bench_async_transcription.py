@@ -0,0 +1,89 @@
+from argparse import ArgumentParser
+import asyncio
+import os
+import random
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.AsyncTranscription import AsyncTranscription
+from russian_g2p.Transcription import Transcription
+
+
+def load_texts(file_name: str) -> list:
+    texts = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = cur_line.strip().split()[1:]
+            if len(words) > 0:
+                texts.append(' '.join(words))
+    return texts
+
+
+def percentile(values: list, q: float) -> float:
+    sorted_values = sorted(values)
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100.0 * (len(sorted_values) - 1))))]
+
+
+async def run_load(async_transcription: AsyncTranscription, texts: list, n_clients: int,
+                   requests_per_client: int) -> tuple:
+    latencies = []
+
+    async def client(client_idx: int):
+        generator = random.Random(client_idx)
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            await async_transcription.transcribe(generator.choice(texts))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(it) for it in range(n_clients)])
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('-n', '--clients', dest='n_clients', type=int, required=False, default=64,
+                        help='Number of concurrent clients.')
+    parser.add_argument('-r', '--requests', dest='requests_per_client', type=int, required=False, default=20,
+                        help='Number of sequential requests of each client.')
+    parser.add_argument('-b', '--batch', dest='max_batch_size', type=int, required=False, default=64,
+                        help='Maximal number of texts in a micro-batch.')
+    parser.add_argument('-w', '--wait', dest='max_wait', type=float, required=False, default=0.005,
+                        help='Maximal waiting time (in seconds) of the first text in a micro-batch.')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger.')
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus_name)
+    transcription = Transcription(tagger=args.tagger)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        # прогрев: загрузка модели и кэши слов не должны попадать в измерения
+        transcription.transcribe(texts[:args.max_batch_size])
+        for max_batch_size, max_wait in [(1, 0.0), (args.max_batch_size, args.max_wait)]:
+            async_transcription = AsyncTranscription(transcription, max_batch_size=max_batch_size,
+                                                     max_wait=max_wait)
+
+            async def run():
+                async with async_transcription:
+                    return await run_load(async_transcription, texts, args.n_clients, args.requests_per_client)
+
+            latencies, duration = asyncio.run(run())
+            name = 'one text per call' if max_batch_size == 1 else \
+                f'micro-batches of at most {max_batch_size} texts, {1000.0 * max_wait:.1f} ms of waiting'
+            print(f'{name}: {len(latencies) / duration:.1f} requests/s, mean batch '
+                  f'{async_transcription.n_texts / async_transcription.n_batches:.1f}, latency p50 '
+                  f'{1000.0 * percentile(latencies, 50):.1f} ms, p90 {1000.0 * percentile(latencies, 90):.1f} ms, '
+                  f'p99 {1000.0 * percentile(latencies, 99):.1f} ms.')
+
+
+if __name__ == '__main__':
+    main()
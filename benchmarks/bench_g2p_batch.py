@@ -0,0 +1,62 @@
+from argparse import ArgumentParser
+import os
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+
+
+def load_words(file_name: str, g2p: Grapheme2Phoneme) -> list:
+    words = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            cur_word = cur_line.strip()
+            if len(cur_word) == 0:
+                continue
+            try:
+                g2p.check_word(cur_word)
+            except AssertionError:
+                continue
+            words.append(cur_word)
+    return words
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-w', '--wordlist', dest='wordlist_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'wordlist'),
+                        help='List of words (one word per line).')
+    parser.add_argument('-m', '--mode', dest='users_mode', type=str, required=False, default='Modern',
+                        choices=['Modern', 'Classic'], help='Transcription mode.')
+    parser.add_argument('-b', '--batch', dest='batch_size', type=int, required=False, default=4096,
+                        help='Size of a batch for the vectorized transcription.')
+    parser.add_argument('-r', '--repeats', dest='n_repeats', type=int, required=False, default=3,
+                        help='Number of passes over the word list.')
+    args = parser.parse_args()
+
+    g2p = Grapheme2Phoneme(users_mode=args.users_mode, cache_size=0)
+    words = load_words(args.wordlist_name, g2p)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        start = time.perf_counter()
+        for _ in range(args.n_repeats):
+            scalar_transcriptions = [g2p.word_to_phonemes(cur_word) for cur_word in words]
+        duration_scalar = (time.perf_counter() - start) / args.n_repeats
+        start = time.perf_counter()
+        for _ in range(args.n_repeats):
+            batch_transcriptions = g2p.words_to_phonemes_batch(words, batch_size=args.batch_size)
+        duration_batch = (time.perf_counter() - start) / args.n_repeats
+    n_differences = sum(map(lambda it: it[0] != it[1], zip(scalar_transcriptions, batch_transcriptions)))
+
+    print(f'{len(words)} words, {n_differences} differences between the scalar and the batch transcriptions.')
+    print(f'word_to_phonemes:        {duration_scalar:.3f} s ({len(words) / duration_scalar:.0f} words/s).')
+    print(f'words_to_phonemes_batch: {duration_batch:.3f} s ({len(words) / duration_batch:.0f} words/s).')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+from argparse import ArgumentParser
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Accentor import Accentor
+
+
+def load_corpus_sentences(file_name: str) -> list:
+    sentences = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = list(filter(lambda it: it.replace('-', '').isalpha(), cur_line.strip().lower().split()[1:]))
+            if len(words) > 0:
+                sentences.append(words)
+    return sentences
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_names', type=str, nargs='+', required=False,
+                        default=[os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                                 os.path.join(PROJECT_DIR, 'corpus', 'corpus_fixed')],
+                        help='Text corpora (an utterance identifier and words in each line).')
+    parser.add_argument('--wiki', dest='use_wiki', action='store_true',
+                        help='Unknown words are looked up in Wiktionary (so they need morphotags too).')
+    args = parser.parse_args()
+
+    accentor = Accentor(use_wiki=args.use_wiki)
+    for corpus_name in args.corpus_names:
+        sentences = load_corpus_sentences(corpus_name)
+        n_words = sum(map(len, sentences))
+        tagged_sentences = list(filter(lambda it: any(map(accentor.needs_morphotag, it)), sentences))
+        n_tagged_words = sum(map(len, tagged_sentences))
+        print(f'{os.path.basename(corpus_name)}: {len(sentences)} sentences, {n_words} words.')
+        print(f'  Sentences sent to the tagger: {len(tagged_sentences)} '
+              f'({100.0 * len(tagged_sentences) / len(sentences):.2f}%), words: {n_tagged_words} '
+              f'({100.0 * n_tagged_words / n_words:.2f}%).')
+        print(f'  Tagging avoided for {100.0 * (1.0 - n_tagged_words / n_words):.2f}% of words.')
+
+
+if __name__ == '__main__':
+    main()
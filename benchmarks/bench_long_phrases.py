@@ -0,0 +1,57 @@
+from argparse import ArgumentParser
+import os
+import random
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+
+
+def load_accented_words(file_name: str, g2p: Grapheme2Phoneme) -> list:
+    words = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            cur_word = cur_line.strip()
+            if '+' not in cur_word:
+                continue
+            try:
+                g2p.check_word(cur_word)
+            except AssertionError:
+                continue
+            words.append(cur_word)
+    return words
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-w', '--wordlist', dest='wordlist_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'wordlist'),
+                        help='List of accented words (one word per line).')
+    parser.add_argument('-m', '--max', dest='max_words', type=int, required=False, default=10000,
+                        help='Maximal number of words in a test phrase.')
+    args = parser.parse_args()
+
+    g2p = Grapheme2Phoneme()
+    words = load_accented_words(args.wordlist_name, g2p)
+    rnd = random.Random(0)
+    n_words = 10
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        while n_words <= args.max_words:
+            # фраза без пауз, как в нерасставленной пунктуацией расшифровке речи
+            phrase = ' '.join(rnd.choice(words) for _ in range(n_words))
+            g2p.clear_cache()
+            start = time.perf_counter()
+            g2p.phrase_to_phonemes(phrase)
+            duration = time.perf_counter() - start
+            print(f'{n_words:>6} words: {duration * 1000.0:10.2f} ms, {duration * 1e6 / n_words:8.1f} us per word.')
+            n_words *= 10
+
+
+if __name__ == '__main__':
+    main()
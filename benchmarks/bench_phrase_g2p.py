@@ -0,0 +1,58 @@
+from argparse import ArgumentParser
+import os
+import random
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+
+
+def load_accented_words(file_name: str, g2p: Grapheme2Phoneme) -> list:
+    words = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            cur_word = cur_line.strip()
+            if ('+' not in cur_word) or ('-' in cur_word):
+                continue
+            try:
+                g2p.check_word(cur_word)
+            except AssertionError:
+                continue
+            words.append(cur_word)
+    return words
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-w', '--wordlist', dest='wordlist_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'wordlist'),
+                        help='List of accented words (one word per line).')
+    parser.add_argument('-n', '--words', dest='n_words', type=int, required=False, default=12,
+                        help='Number of words in each test phrase.')
+    parser.add_argument('-p', '--phrases', dest='n_phrases', type=int, required=False, default=2000,
+                        help='Number of test phrases.')
+    args = parser.parse_args()
+
+    g2p = Grapheme2Phoneme()
+    g2p_without_cache = Grapheme2Phoneme(cache_size=0)
+    words = load_accented_words(args.wordlist_name, g2p)
+    rnd = random.Random(0)
+    phrases = [' '.join(rnd.choice(words) for _ in range(args.n_words)) for _ in range(args.n_phrases)]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name, cur_g2p, validate in [('without cache', g2p_without_cache, True), ('with cache', g2p, True),
+                                        ('without cache, validate=False', g2p_without_cache, False)]:
+            start = time.perf_counter()
+            for cur_phrase in phrases:
+                cur_g2p.phrase_to_phonemes(cur_phrase, validate=validate)
+            duration = (time.perf_counter() - start) / len(phrases)
+            print(f'phrase_to_phonemes ({name}): {duration * 1e6:.1f} us per phrase of {args.n_words} words.')
+
+
+if __name__ == '__main__':
+    main()
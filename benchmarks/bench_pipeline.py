@@ -0,0 +1,59 @@
+from argparse import ArgumentParser
+import os
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Transcription import Transcription
+
+
+def load_texts(file_name: str) -> list:
+    texts = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = cur_line.strip().split()[1:]
+            if len(words) > 0:
+                texts.append(' '.join(words))
+    return texts
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('-b', '--batch', dest='texts_per_batch', type=int, required=False, default=500,
+                        help='Number of texts in a micro-batch.')
+    parser.add_argument('-d', '--depth', dest='pipeline_depth', type=int, required=False, default=2,
+                        help='How many tagged micro-batches can wait in the queue.')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger.')
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus_name)
+    print(f'{len(texts)} texts, {sum(map(lambda it: len(it.split()), texts))} words.')
+    transcription = Transcription(tagger=args.tagger, tag_only_homographs=False)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        # прогрев: загрузка модели и кэши слов не должны попадать в измерения
+        sequential_results = list(transcription.transcribe_iter(texts, texts_per_batch=args.texts_per_batch))
+        start = time.perf_counter()
+        sequential_results = list(transcription.transcribe_iter(texts, texts_per_batch=args.texts_per_batch))
+        duration_sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        pipelined_results = list(transcription.transcribe_iter(texts, texts_per_batch=args.texts_per_batch,
+                                                               pipeline_depth=args.pipeline_depth))
+        duration_pipelined = time.perf_counter() - start
+    assert sequential_results == pipelined_results, 'Results of the pipeline differ from sequential results!'
+    print(f'Sequential stages: {duration_sequential:.2f} s.')
+    print(f'Tagging in the background thread: {duration_pipelined:.2f} s '
+          f'({duration_sequential / duration_pipelined:.2f}x, '
+          f'{duration_sequential - duration_pipelined:.2f} s of overlap).')
+
+
+if __name__ == '__main__':
+    main()
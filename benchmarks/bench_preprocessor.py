@@ -0,0 +1,59 @@
+from argparse import ArgumentParser
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Preprocessor import Preprocessor
+
+
+def load_corpus_sentences(file_name: str) -> list:
+    sentences = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = cur_line.strip().lower().split()[1:]
+            if len(words) > 0:
+                sentences.append(words)
+    return sentences
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('-b', '--batch', dest='batch_size', type=int, required=False, default=64,
+                        help='Maximal number of sentences in a batch.')
+    parser.add_argument('-t', '--tokens', dest='tokens_per_batch', type=int, required=False, default=2048,
+                        help='Maximal number of words (with padding) in a batch.')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger.')
+    args = parser.parse_args()
+
+    sentences = load_corpus_sentences(args.corpus_name)
+    n_words = sum(map(len, sentences))
+    n_unique = len(set(map(tuple, sentences)))
+    print(f'{len(sentences)} sentences ({n_unique} unique ones), {n_words} words.')
+    preprocessor = Preprocessor(batch_size=args.batch_size, tokens_per_batch=args.tokens_per_batch,
+                                tagger=args.tagger)
+    # прогрев модели, чтобы её загрузка не попала в измерения
+    preprocessor.tagger.tag_sentences(sentences[:args.batch_size], batch_size=args.batch_size)
+    start = time.perf_counter()
+    preprocessor.tagger.tag_sentences(sentences, batch_size=args.batch_size)
+    duration_in_order = time.perf_counter() - start
+    if hasattr(preprocessor.tagger, 'tag_word'):
+        # кэш разборов слов не должен ускорять второй замер
+        preprocessor.tagger.tag_word.cache_clear()
+    print(f'Input order, fixed batch size: {n_words / duration_in_order:.0f} words/s.')
+    start = time.perf_counter()
+    preprocessor.predict_sentences(sentences)
+    duration_bucketed = time.perf_counter() - start
+    print(f'Deduplicated length buckets, token budget: {n_words / duration_bucketed:.0f} words/s '
+          f'({duration_in_order / duration_bucketed:.2f}x).')
+
+
+if __name__ == '__main__':
+    main()
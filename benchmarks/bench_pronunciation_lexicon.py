@@ -0,0 +1,85 @@
+from argparse import ArgumentParser
+import os
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Accentor import Accentor
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+
+
+def load_corpus_phrases(file_name: str, accentor: Accentor, g2p: Grapheme2Phoneme) -> list:
+    '''
+    Фразы корпуса, в которых ударения расставлены по словарю ударений
+    (для омографа берётся первый вариант, неизвестное слово остаётся без ударения).
+    '''
+    phrases = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            accented_words = []
+            for cur_word in cur_line.strip().lower().split()[1:]:
+                if not cur_word.isalpha():
+                    continue
+                if cur_word in accentor.simple_words_dawg:
+                    accent_pos = accentor.simple_words_dawg[cur_word]
+                    cur_word = cur_word[:accent_pos] + '+' + cur_word[accent_pos:]
+                elif cur_word in accentor.homographs:
+                    cur_word = sorted(accentor.homographs[cur_word].values())[0].lower()
+                try:
+                    g2p.check_word(cur_word)
+                except AssertionError:
+                    continue
+                accented_words.append(cur_word)
+            if len(accented_words) > 0:
+                phrases.append(accented_words)
+    return phrases
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('-m', '--mode', dest='users_mode', type=str, required=False, default='Modern',
+                        help='Transcription mode.')
+    args = parser.parse_args()
+
+    g2p_with_lexicon = Grapheme2Phoneme(args.users_mode, cache_size=0)
+    if g2p_with_lexicon.pronunciations is None:
+        print(f'The pronunciation lexicon for the mode `{args.users_mode}` is not built! Run '
+              f'`python -m russian_g2p.PronunciationLexicon -m {args.users_mode}` before this benchmark.')
+        return
+    g2p_with_rules = Grapheme2Phoneme(args.users_mode, cache_size=0, use_pronunciations=False)
+    phrases = load_corpus_phrases(args.corpus_name, Accentor(mode='one', use_wiki=False), g2p_with_rules)
+    words = [cur_word for cur_phrase in phrases for cur_word in cur_phrase]
+    unique_words = set(words)
+    n_hits = sum(map(lambda it: it in g2p_with_lexicon.pronunciations, words))
+    n_unique_hits = sum(map(lambda it: it in g2p_with_lexicon.pronunciations, unique_words))
+    print(f'{len(phrases)} phrases, {len(words)} words ({len(unique_words)} unique words).')
+    print(f'Hit rate of the pronunciation lexicon: {100.0 * n_hits / len(words):.2f}% of words, '
+          f'{100.0 * n_unique_hits / len(unique_words):.2f}% of unique words.')
+    text_phrases = [' '.join(cur_phrase) for cur_phrase in phrases]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        durations = dict()
+        for name, cur_g2p in [('rules', g2p_with_rules), ('lexicon', g2p_with_lexicon)]:
+            start = time.perf_counter()
+            for cur_word in words:
+                cur_g2p.word_to_phonemes(cur_word, validate=False)
+            words_duration = time.perf_counter() - start
+            start = time.perf_counter()
+            for cur_phrase in text_phrases:
+                cur_g2p.phrase_to_phonemes(cur_phrase, validate=False)
+            durations[name] = (words_duration, time.perf_counter() - start)
+            print(f'{name}: word_to_phonemes {len(words) / words_duration:.0f} words/s, '
+                  f'phrase_to_phonemes {durations[name][1] * 1e6 / len(text_phrases):.1f} us per phrase.')
+    print(f'Speedup: {durations["rules"][0] / durations["lexicon"][0]:.2f}x for words, '
+          f'{durations["rules"][1] / durations["lexicon"][1]:.2f}x for phrases.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+from argparse import ArgumentParser
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Transcription import Transcription
+
+
+def load_texts(file_name: str) -> list:
+    texts = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = cur_line.strip().split()[1:]
+            if len(words) > 0:
+                texts.append(' '.join(words))
+    return texts
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('--cache', dest='cache_name', type=str, required=False, default=None,
+                        help='SQLite file of the result cache (a temporary file by default).')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger.')
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus_name)
+    with tempfile.TemporaryDirectory() as tmp_dir, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        cache_name = os.path.join(tmp_dir, 'results.db') if args.cache_name is None else args.cache_name
+        with Transcription(tagger=args.tagger) as transcription:
+            # прогрев: загрузка моделей не должна попадать в измерения
+            transcription.transcribe(texts[:10])
+            start = time.perf_counter()
+            transcription.transcribe(texts)
+            print(f'Without cache: {len(texts) / (time.perf_counter() - start):.1f} texts/s.')
+        for run_name in ('Cold cache', 'Warm cache'):
+            # каждый проход - новый процесс с точки зрения кэша: он открывается заново
+            with Transcription(tagger=args.tagger, cache_name=cache_name) as transcription:
+                transcription.transcribe(texts[:10])
+                transcription.reset_stats()
+                start = time.perf_counter()
+                transcription.transcribe(texts)
+                duration = time.perf_counter() - start
+                print(f'{run_name}: {len(texts) / duration:.1f} texts/s, '
+                      f'{transcription.stats.cache_hits} of {len(texts)} texts are found in the cache.')
+        print(f'Cache file: {os.path.getsize(cache_name) / 1024 / 1024:.1f} MB.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+from argparse import ArgumentParser
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+MEASURING_CODE = '''
+import time
+start = time.perf_counter()
+from russian_g2p.Accentor import Accentor
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+imported = time.perf_counter()
+accentor = Accentor(use_snapshot={0})
+accentor_ready = time.perf_counter()
+g2p = Grapheme2Phoneme(use_snapshot={0})
+g2p_ready = time.perf_counter()
+print(imported - start, accentor_ready - imported, g2p_ready - accentor_ready)
+'''
+
+
+def measure_cold_start(use_snapshot: bool, n_repeats: int) -> list:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PROJECT_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    measurements = []
+    for _ in range(n_repeats):
+        output = subprocess.check_output([sys.executable, '-c', MEASURING_CODE.format(use_snapshot)], env=env)
+        measurements.append(tuple(map(float, output.decode('utf-8').split()[-3:])))
+    return measurements
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--repeats', dest='n_repeats', type=int, required=False, default=5,
+                        help='Number of cold starts (each one in a new Python process).')
+    args = parser.parse_args()
+
+    from russian_g2p.LexiconSnapshot import build_lexicon_snapshot, get_default_snapshot_name
+    if not os.path.isfile(get_default_snapshot_name()):
+        print('Building the lexicon snapshot...')
+        build_lexicon_snapshot()
+
+    for use_snapshot in (False, True):
+        measurements = measure_cold_start(use_snapshot, args.n_repeats)
+        print('')
+        print('Source dictionaries' if not use_snapshot else 'Lexicon snapshot')
+        for stage_idx, stage_name in enumerate(['import', 'Accentor()', 'Grapheme2Phoneme()']):
+            values = [cur[stage_idx] * 1000.0 for cur in measurements]
+            print('  {0:<20} median {1:9.2f} ms, max {2:9.2f} ms'.format(stage_name, statistics.median(values),
+                                                                        max(values)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+from argparse import ArgumentParser
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Transcription import Transcription
+
+
+def iterate_texts(file_name: str, n_repeats: int):
+    for _ in range(n_repeats):
+        with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+            for cur_line in fp:
+                words = cur_line.strip().split()[1:]
+                if len(words) > 0:
+                    yield ' '.join(words)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('-r', '--repeats', dest='repeats', type=int, nargs='+', required=False, default=[1, 2],
+                        help='How many times the corpus is repeated.')
+    parser.add_argument('-b', '--batch', dest='texts_per_batch', type=int, required=False, default=1000,
+                        help='Number of texts in a micro-batch of the streaming API.')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger.')
+    args = parser.parse_args()
+
+    transcription = Transcription(tagger=args.tagger)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        # прогрев: кэши слов не должны попадать в измерения памяти
+        transcription.transcribe(list(iterate_texts(args.corpus_name, 1)))
+        for n_repeats in args.repeats:
+            tracemalloc.start()
+            start = time.perf_counter()
+            results = transcription.transcribe(list(iterate_texts(args.corpus_name, n_repeats)))
+            duration = time.perf_counter() - start
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            n_texts = len(results)
+            del results
+            tracemalloc.stop()
+            print(f'transcribe, {n_texts} texts: {n_texts / duration:.1f} texts/s, '
+                  f'peak memory {peak_memory / 1024 / 1024:.1f} MB.')
+            tracemalloc.start()
+            start = time.perf_counter()
+            n_texts = 0
+            for _ in transcription.transcribe_iter(iterate_texts(args.corpus_name, n_repeats),
+                                                   texts_per_batch=args.texts_per_batch):
+                n_texts += 1
+            duration = time.perf_counter() - start
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'transcribe_iter, {n_texts} texts: {n_texts / duration:.1f} texts/s, '
+                  f'peak memory {peak_memory / 1024 / 1024:.1f} MB.')
+
+
+if __name__ == '__main__':
+    main()
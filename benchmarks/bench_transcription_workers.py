@@ -0,0 +1,59 @@
+from argparse import ArgumentParser
+import os
+import sys
+import time
+import warnings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from russian_g2p.Transcription import Transcription
+
+
+def load_texts(file_name: str) -> list:
+    texts = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = cur_line.strip().split()[1:]
+            if len(words) > 0:
+                texts.append(' '.join(words))
+    return texts
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('-w', '--workers', dest='workers', type=int, nargs='+', required=False,
+                        default=[1, 2, 4, os.cpu_count()], help='Numbers of worker processes to compare.')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger.')
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus_name)
+    n_words = sum(map(lambda it: len(it.split()), texts))
+    print(f'{len(texts)} texts, {n_words} words, {os.cpu_count()} CPUs.')
+    # рабочие процессы наследуют окружение, поэтому предупреждения об отдельных словах не выводятся и в них
+    os.environ['PYTHONWARNINGS'] = 'ignore'
+    base_speed = None
+    results = None
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for n_workers in sorted(set(args.workers)):
+            with Transcription(tagger=args.tagger, workers=n_workers) as transcription:
+                # прогрев: запуск рабочих процессов и загрузка моделей не попадают в измерения
+                transcription.transcribe(texts[:(n_workers * 4)])
+                start = time.perf_counter()
+                cur_results = transcription.transcribe(texts)
+                speed = n_words / (time.perf_counter() - start)
+            if base_speed is None:
+                base_speed = speed
+                results = cur_results
+            assert cur_results == results, f'Results of {n_workers} workers differ from results of one worker!'
+            print(f'{n_workers} workers: {speed:.0f} words/s ({speed / base_speed:.2f}x).')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+from argparse import ArgumentParser
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_texts(file_name: str) -> list:
+    texts = []
+    with open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        for cur_line in fp:
+            words = cur_line.strip().split()[1:]
+            if len(words) > 0:
+                texts.append(' '.join(words))
+    return texts
+
+
+def percentile(values: list, q: float) -> float:
+    sorted_values = sorted(values)
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100.0 * (len(sorted_values) - 1))))]
+
+
+def request(url: str, data: dict=None) -> dict:
+    if data is None:
+        cur_request = Request(url)
+    else:
+        cur_request = Request(url, data=json.dumps(data, ensure_ascii=False).encode('utf-8'), method='POST',
+                              headers={'Content-Type': 'application/json; charset=utf-8'})
+    with urlopen(cur_request, timeout=600) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def wait_for_server(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            request(url + '/health')
+            return
+        except (URLError, ConnectionError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def main():
+    parser = ArgumentParser(description='Load generator for `python -m russian_g2p.serve` on localhost.')
+    parser.add_argument('-c', '--corpus', dest='corpus_name', type=str, required=False,
+                        default=os.path.join(PROJECT_DIR, 'corpus', 'corpus_raw'),
+                        help='Text corpus (an utterance identifier and words in each line).')
+    parser.add_argument('-p', '--port', dest='port', type=int, required=False, default=8080,
+                        help='Port of the server on localhost.')
+    parser.add_argument('-n', '--clients', dest='n_clients', type=int, required=False, default=32,
+                        help='Number of concurrent clients.')
+    parser.add_argument('-r', '--requests', dest='requests_per_client', type=int, required=False, default=20,
+                        help='Number of sequential requests of each client.')
+    parser.add_argument('--start', dest='start_server', action='store_true',
+                        help='Start the server in a subprocess and stop it at the end.')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger of the started server.')
+    args = parser.parse_args()
+
+    url = f'http://127.0.0.1:{args.port}'
+    texts = load_texts(args.corpus_name)
+    server_process = None
+    if args.start_server:
+        server_process = subprocess.Popen([sys.executable, '-m', 'russian_g2p.serve', '--port', str(args.port),
+                                           '--tagger', args.tagger], cwd=PROJECT_DIR)
+    try:
+        wait_for_server(url, 600.0 if args.start_server else 5.0)
+        latencies = [[] for _ in range(args.n_clients)]
+        n_errors = [0]
+
+        def client(client_idx: int):
+            generator = random.Random(client_idx)
+            for _ in range(args.requests_per_client):
+                text = generator.choice(texts)
+                start = time.perf_counter()
+                try:
+                    request(url + '/transcribe', {'text': text})
+                    latencies[client_idx].append((len(text), time.perf_counter() - start))
+                except (URLError, ConnectionError):
+                    n_errors[0] += 1
+
+        threads = [threading.Thread(target=client, args=(it,)) for it in range(args.n_clients)]
+        start = time.perf_counter()
+        for cur in threads:
+            cur.start()
+        for cur in threads:
+            cur.join()
+        duration = time.perf_counter() - start
+        all_latencies = [it for cur in latencies for it in cur]
+        print(f'{len(all_latencies)} requests from {args.n_clients} clients, {n_errors[0]} errors: '
+              f'{len(all_latencies) / duration:.1f} requests/s.')
+        median_length = percentile([it[0] for it in all_latencies], 50)
+        for name, selected in [('all texts', all_latencies),
+                               ('short texts', [it for it in all_latencies if it[0] <= median_length]),
+                               ('long texts', [it for it in all_latencies if it[0] > median_length])]:
+            if len(selected) > 0:
+                values = [it[1] for it in selected]
+                print(f'Latency of {name}: p50 {1000.0 * percentile(values, 50):.1f} ms, '
+                      f'p90 {1000.0 * percentile(values, 90):.1f} ms, p99 {1000.0 * percentile(values, 99):.1f} ms.')
+        print('Metrics of the server:')
+        print(json.dumps(request(url + '/metrics'), indent=4))
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait()
+
+
+if __name__ == '__main__':
+    main()
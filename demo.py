@@ -1,5 +1,6 @@
 from argparse import ArgumentParser
 import codecs
+from collections import deque
 import os
 import re
 
@@ -7,37 +8,33 @@ from russian_g2p.Transcription import Transcription
 
 
 def iterate_by_texts(file_name):
-    batch_size = 1000
     re_for_russian_letters = re.compile(
         r'[^АаБбВвГгДдЕеЁёЖжЗзИиЙйКкЛлМмНнОоПпРрСсТтУуФфХхЦцЧчШшЩщЪъЫыЬьЭэЮюЯя]+',
         re.U
     )
-    source_lines_v1 = []
-    source_lines_v2 = []
     with codecs.open(file_name, mode='r', encoding='utf-8', errors='ignore') as src_fp:
         cur_line = src_fp.readline()
         while len(cur_line) > 0:
             prep_line_v1 = cur_line.strip()
             if len(prep_line_v1) > 0:
-                source_lines_v1.append(prep_line_v1)
                 prep_line_v2 = ' '.join(
                     filter(
                         lambda it2: len(it2) > 0,
                         map(lambda it1: it1.strip(), re_for_russian_letters.split(prep_line_v1))
                     )
                 )
-                source_lines_v2.append(prep_line_v2)
+                yield prep_line_v1, prep_line_v2
             cur_line = src_fp.readline()
-            if len(source_lines_v1) >= batch_size:
-                print('')
-                print('{0} texts have been prepared for processing...'.format(len(source_lines_v1)))
-                yield source_lines_v1, source_lines_v2
-                source_lines_v1 = []
-                source_lines_v2 = []
-    if len(source_lines_v1) > 0:
-        print('')
-        print('{0} texts have been prepared for processing...'.format(len(source_lines_v1)))
-        yield source_lines_v1, source_lines_v2
+
+
+def join_pronunciation(pronunciation, silence):
+    if len(pronunciation) == 0:
+        return []
+    transcription = [silence]
+    for cur_part in pronunciation:
+        transcription += cur_part
+        transcription.append(silence)
+    return transcription
 
 
 def main():
@@ -50,6 +47,9 @@ def main():
     parser.add_argument('-o', '--order', dest='pair_order', type=str, required=False,
                         choices=['text-pronunciation', 'pronunciation-text'], default='pronunciation-text',
                         help='Order of each pair: text and its pronunciation or pronunciation and corresponding text?')
+    parser.add_argument('--cache', dest='cache_name', type=str, required=False, default=None,
+                        help='SQLite file of the persistent result cache (transcriptions of repeated texts are taken '
+                             'from it).')
     args = parser.parse_args()
 
     src_name = os.path.normpath(args.source_data_file)
@@ -60,45 +60,41 @@ def main():
     if len(dst_dir) > 0:
         assert os.path.isdir(dst_dir), 'Directory "{0}" does not exist!'.format(dst_dir)
 
-    transcriptor = Transcription(raise_exceptions=True, verbose=False, batch_size=256, use_wiki=False)
+    transcriptor = Transcription(raise_exceptions=True, verbose=False, batch_size=256, use_wiki=False,
+                                 cache_name=args.cache_name)
     silence = '<sil>'
+    # тексты без пунктуации, которые уже отправлены на транскрипцию, но ещё не записаны
+    source_texts = deque()
+
+    def generate_texts():
+        # каждая строка транскрибируется дважды: с пунктуацией (v1) и без неё (v2), поэтому тексты идут парами
+        for text_v1, text_v2 in iterate_by_texts(src_name):
+            source_texts.append(text_v2)
+            yield text_v1
+            yield text_v2
+
+    all_pronunciations = transcriptor.transcribe_iter(generate_texts(), texts_per_batch=2000)
+    n_processed = 0
     with codecs.open(dst_name, mode='w', encoding='utf-8', errors='ignore') as dst_fp:
-        for source_lines_v1, source_lines_v2 in iterate_by_texts(src_name):
-            pronunciations_v1 = transcriptor.transcribe(source_lines_v1)
-            pronunciations_v2 = transcriptor.transcribe(source_lines_v2)
-            for line_idx in range(len(source_lines_v1)):
-                pronunciation_v1 = pronunciations_v1[line_idx]
-                if len(pronunciation_v1) > 0:
-                    transcription_v1 = [silence]
-                    for cur_part in pronunciation_v1:
-                        transcription_v1 += cur_part
-                        transcription_v1.append(silence)
-                else:
-                    transcription_v1 = []
-                pronunciation_v2 = pronunciations_v2[line_idx]
-                if len(pronunciation_v2) > 0:
-                    transcription_v2 = [silence]
-                    for cur_part in pronunciation_v2:
-                        transcription_v2 += cur_part
-                        transcription_v2.append(silence)
+        for pronunciation_v1 in all_pronunciations:
+            pronunciation_v2 = next(all_pronunciations)
+            source_text = source_texts.popleft()
+            transcription_v1 = join_pronunciation(pronunciation_v1, silence)
+            transcription_v2 = join_pronunciation(pronunciation_v2, silence)
+            if (len(transcription_v1) > 0) and (len(transcription_v2) > 0):
+                if args.pair_order == 'text-pronunciation':
+                    dst_fp.write('{0}\t{1}\n'.format(source_text.lower(), ' '.join(transcription_v1)))
                 else:
-                    transcription_v2 = []
-                source_text = source_lines_v2[line_idx]
-                if (len(transcription_v1) > 0) and (len(transcription_v2) > 0):
+                    dst_fp.write('{0}\t{1}\n'.format(' '.join(transcription_v1), source_text.lower()))
+                if transcription_v2 != transcription_v1:
                     if args.pair_order == 'text-pronunciation':
-                        dst_fp.write('{0}\t{1}\n'.format(source_text.lower(), ' '.join(transcription_v1)))
+                        dst_fp.write('{0}\t{1}\n'.format(source_text.lower(), ' '.join(transcription_v2)))
                     else:
-                        dst_fp.write('{0}\t{1}\n'.format(' '.join(transcription_v1), source_text.lower()))
-                    if transcription_v2 != transcription_v1:
-                        if args.pair_order == 'text-pronunciation':
-                            dst_fp.write('{0}\t{1}\n'.format(source_text.lower(), ' '.join(transcription_v2)))
-                        else:
-                            dst_fp.write('{0}\t{1}\n'.format(' '.join(transcription_v2), source_text.lower()))
-            print('{0} texts have been processed...'.format(len(source_lines_v1)))
-            del pronunciations_v1
-            del pronunciations_v2
-            del source_lines_v1
-            del source_lines_v2
+                        dst_fp.write('{0}\t{1}\n'.format(' '.join(transcription_v2), source_text.lower()))
+            n_processed += 1
+            if (n_processed % 1000) == 0:
+                print('{0} texts have been processed...'.format(n_processed))
+    print('{0} texts have been processed...'.format(n_processed))
 
 
 if __name__ == '__main__':
@@ -10,16 +10,38 @@ import lxml.html
 import itertools
 import dawg
 import logging
+import time
+
+from russian_g2p.LexiconSnapshot import get_lexicon_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+# уровни поиска ударения в порядке их проверки: уже ударное слово, служебное слово, слово с одной гласной,
+# словарь простых слов, словарь омографов, восстановление буквы "ё", Викисловарь и неизвестное слово
+ACCENT_TIERS = ('accented', 'function_words', 'one_vowel', 'simple_words', 'homographs', 'restored_jo', 'wiki',
+                'unknown')
 
 
 class Accentor:
-    def __init__(self, mode='one', debug='no', exception_for_unknown=False, use_wiki=True):
-        if debug == 'no':
-            logging.basicConfig()
-        else:
-            logging.basicConfig(level=logging.DEBUG)
-        self.logger = logging.getLogger()
+    '''
+    Отладочные сообщения пишутся в логгер russian_g2p.Accentor, а его уровень и
+    обработчики настраивает приложение, например:
+        logging.getLogger('russian_g2p.Accentor').setLevel(logging.DEBUG)
+    Аргумент debug сохранён для совместимости и логирование не настраивает.
+    '''
+
+    def __init__(self, mode='one', debug='no', exception_for_unknown=False, use_wiki=True, use_snapshot=True,
+                 collect_stats=False):
+        if debug == 'yes':
+            warnings.warn('The `debug` argument of Accentor does not configure logging any more. Set the level of '
+                          'the `russian_g2p.Accentor` logger to DEBUG instead.', DeprecationWarning, stacklevel=2)
+        self.logger = logger
         self.logger.debug('Setting up the Accentor...')
+        # счётчики и таймеры уровней поиска ударения; если они выключены, то на каждое слово
+        # тратится только одна проверка флага
+        self.collect_stats = collect_stats
+        self.reset_tier_stats()
         self.mode = mode
         self.__all_russian_letters = {'а', 'б', 'в', 'г', 'д', 'е', 'ё', 'ж', 'з', 'и', 'й', 'к', 'л', 'м', 'н', 'о',
                                       'п', 'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ', 'ъ', 'ы', 'ь', 'э', 'ю',
@@ -35,28 +57,67 @@ class Accentor:
         self.__bad_words = []
         self.__re_for_morphosplit = re.compile(r'[\,\s\|]+', re.U)
         self.__re_for_morphotag = re.compile(r'^(\w+|\w+[\-\=]\w+)$', re.U)
+        self.__jo_replaces = dawg.DAWG.compile_replaces({'е': 'ё'})
+        self.__homonyms_with_jo = None
         assert mode in ('one', 'many'), 'Set either "one" or "many" variant mode!'
         assert debug in ('yes', 'no'), 'Set either "yes" or "no" variant mode!'
-        homograph_dictionary_name = os.path.join(os.path.dirname(__file__), 'data', 'homographs.json')
-        assert os.path.isfile(homograph_dictionary_name), f'File `{homograph_dictionary_name}` does not exist!'
-        simple_words_dawg_name = os.path.join(os.path.dirname(__file__), 'data', 'simple_words.dawg')
-        assert os.path.isfile(simple_words_dawg_name), f'File `{simple_words_dawg_name}` does not exist!'
-        function_words_name = os.path.join(os.path.dirname(__file__), 'data', 'Function_words.json')
-        assert os.path.isfile(function_words_name), f'File `{function_words_name}` does not exist!'
-        data = None
-        try:
+        snapshot = get_lexicon_snapshot() if use_snapshot else None
+        if snapshot is not None:
+            self.__simple_words_dawg = snapshot.simple_words_dawg
+            self.__homonyms = snapshot.homographs
+            self.__function_words = snapshot.function_words
+        else:
+            homograph_dictionary_name = os.path.join(os.path.dirname(__file__), 'data', 'homographs.json')
+            assert os.path.isfile(homograph_dictionary_name), f'File `{homograph_dictionary_name}` does not exist!'
+            simple_words_dawg_name = os.path.join(os.path.dirname(__file__), 'data', 'simple_words.dawg')
+            assert os.path.isfile(simple_words_dawg_name), f'File `{simple_words_dawg_name}` does not exist!'
+            function_words_name = os.path.join(os.path.dirname(__file__), 'data', 'Function_words.json')
+            assert os.path.isfile(function_words_name), f'File `{function_words_name}` does not exist!'
             d = dawg.IntDAWG()
             self.__simple_words_dawg = d.load(simple_words_dawg_name)
-            ###
-            with codecs.open(homograph_dictionary_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+            self.__homonyms = self.load_homographs_dictionary(homograph_dictionary_name)
+            self.__function_words = self.load_function_words(function_words_name)
+
+    def __del__(self):
+        if self.__homonyms is not None:
+            del self.__homonyms
+        if self.__simple_words_dawg is not None:
+            del self.__simple_words_dawg
+        del self.__all_russian_letters
+        del self.__russian_vowels
+        del self.__re_for_morphosplit
+        del self.__re_for_morphotag
+        del self.__jo_replaces
+        del self.__homonyms_with_jo
+        del self.__new_homonyms
+        del self.__new_simple_words
+        del self.__bad_words
+        del self.__function_words
+
+    @property
+    def homographs(self) -> dict:
+        return self.__homonyms
+
+    @property
+    def simple_words_dawg(self) -> dawg.IntDAWG:
+        return self.__simple_words_dawg
+
+    @property
+    def function_words(self) -> list:
+        return self.__function_words
+
+    def load_homographs_dictionary(self, file_name: str) -> dict:
+        data = None
+        try:
+            with codecs.open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
                 data = json.load(fp)
-            error_message_homographs = f'File `{homograph_dictionary_name}` contains incorrect data!'
+            error_message_homographs = f'File `{file_name}` contains incorrect data!'
             assert isinstance(data, dict), error_message_homographs
-            self.__homonyms = dict()
+            homonyms = dict()
             for cur_wordform in data:
                 assert self.check_source_wordform(cur_wordform), \
                     error_message_homographs + f' Word `{cur_wordform}` is inadmissible!'
-                assert (cur_wordform not in self.__homonyms) and (cur_wordform.lower() not in self.__simple_words_dawg), \
+                assert (cur_wordform not in homonyms) and (cur_wordform.lower() not in self.__simple_words_dawg), \
                     error_message_homographs + f' Word `{cur_wordform}` is repeated!'
                 assert isinstance(data[cur_wordform], dict), \
                     error_message_homographs + f' Word `{cur_wordform}` has incorrect description of accents!'
@@ -65,33 +126,19 @@ class Accentor:
                         error_message_homographs + f' Word `{cur_wordform}` has incorrect description of accents!'
                     assert self.check_accented_wordform(data[cur_wordform][cur_key]), \
                         error_message_homographs + f' Word `{cur_wordform}` has incorrect description of accents!'
-                values = [data[cur_wordform][it] for it in data[cur_wordform]]
-                self.__homonyms[cur_wordform] = copy.deepcopy(data[cur_wordform])
-            ###
-            self.__function_words = None
-            with codecs.open(function_words_name, mode='r', encoding='utf-8', errors='ignore') as fp:
-                function_words = json.load(fp)
-            error_message_function_words = f'File `{function_words_name}` contains incorrect data!'
-            assert isinstance(function_words, list), error_message_function_words
-            assert isinstance(function_words[0], str), error_message_function_words
-            self.__function_words = function_words
+                homonyms[cur_wordform] = copy.deepcopy(data[cur_wordform])
         finally:
             if data is not None:
                 del data
+        return homonyms
 
-    def __del__(self):
-        if self.__homonyms is not None:
-            del self.__homonyms
-        if self.__simple_words_dawg is not None:
-            del self.__simple_words_dawg
-        del self.__all_russian_letters
-        del self.__russian_vowels
-        del self.__re_for_morphosplit
-        del self.__re_for_morphotag
-        del self.__new_homonyms
-        del self.__new_simple_words
-        del self.__bad_words
-        del self.__function_words
+    def load_function_words(self, file_name: str) -> list:
+        with codecs.open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+            function_words = json.load(fp)
+        error_message_function_words = f'File `{file_name}` contains incorrect data!'
+        assert isinstance(function_words, list), error_message_function_words
+        assert isinstance(function_words[0], str), error_message_function_words
+        return function_words
 
     def get_correct_omograph_wiki(self, root_text, cur_word, morphotag='X'):
         '''
@@ -255,14 +302,71 @@ class Accentor:
             http_exception_type = urllib.error.HTTPError
         except:
             http_exception_type = urllib.request.HTTPError
+        start = time.perf_counter() if self.collect_stats else None
         try:
             with urllib.request.urlopen(f'https://en.wiktionary.org/w/index.php?{query}&#printable=yes') as f:
                 root_text = f.read().decode('utf-8')
                 return root_text
         except http_exception_type:
+            if start is not None:
+                self.__wiki_errors += 1
             return
+        finally:
+            if start is not None:
+                self.__wiki_requests += 1
+                self.__wiki_time += time.perf_counter() - start
 
     def do_accents(self, source_phrase_and_morphotags: list) -> list:
+        return [list(variant) for variant in itertools.product(*self.get_accents_lattice(source_phrase_and_morphotags))]
+
+    def iterate_accents(self, source_phrase_and_morphotags: list, max_variants: int=None):
+        '''
+        Ленивый перебор вариантов ударений фразы (не более max_variants
+        вариантов, если это число задано) в том же порядке, что и в do_accents.
+        '''
+        variants = itertools.product(*self.get_accents_lattice(source_phrase_and_morphotags))
+        if max_variants is not None:
+            variants = itertools.islice(variants, max_variants)
+        for variant in variants:
+            yield list(variant)
+
+    def get_accents_lattice(self, source_phrase_and_morphotags: list) -> list:
+        '''
+        Решётка вариантов ударений: для каждого слова фразы - список
+        его возможных ударных форм (в режиме "one" - ровно одна форма).
+        '''
+        prepared_phrase, morphotags_of_phrase = self.__prepare_source_phrase(source_phrase_and_morphotags)
+        try:
+            res = self.__do_accents(prepared_phrase, morphotags_of_phrase)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(str(e))
+        return res
+
+    def do_accents_batch(self, source_phrases_and_morphotags: list) -> list:
+        '''
+        Расстановка ударений сразу в нескольких фразах. Каждая уникальная
+        пара "слово - морфотег" разбирается один раз на весь пакет. Для фразы,
+        ударения в которой расставить не удалось, возвращается пустой список.
+        '''
+        assert isinstance(source_phrases_and_morphotags, list), \
+            f'Expected `{type([1, 2])}`, but got `{type(source_phrases_and_morphotags)}`.'
+        resolved_tokens = dict()
+        results = []
+        for cur_phrase in source_phrases_and_morphotags:
+            try:
+                prepared_phrase, morphotags_of_phrase = self.__prepare_source_phrase(cur_phrase)
+                lattice = self.__do_accents(prepared_phrase, morphotags_of_phrase, resolved_tokens)
+            except Exception:
+                lattice = None
+            if lattice is None:
+                results.append([])
+            else:
+                results.append([list(variant) for variant in itertools.product(*lattice)])
+        return results
+
+    def __prepare_source_phrase(self, source_phrase_and_morphotags: list) -> tuple:
         self.logger.debug('Checking the source phrase...')
         error_message = f'`{source_phrase_and_morphotags}`: the phrase should be of a "list of lists" format!\nExample: [["word1","morphotag1"], ["word2","morphotag2"]] or [["word1"], ["word2"]]'
         assert isinstance(source_phrase_and_morphotags, list), error_message
@@ -286,24 +390,7 @@ class Accentor:
             assert len(prepared_phrase) == len(morphotags_of_phrase), \
                 f"`{' '.join(source_phrase)}`: morphotags do not correspond to words!"
         assert len(prepared_phrase) > 0, 'Source phrase is empty!'
-        try:
-            res = self.__do_accents(prepared_phrase, morphotags_of_phrase)
-        except Exception as e:
-            err_msg = str(e)
-            ok = False
-            res = []
-            for modified_phrase in self.__generate_phrases_with_jo(prepared_phrase, []):
-                try:
-                    res = self.__do_accents(modified_phrase, morphotags_of_phrase)
-                    ok = True
-                except Exception as e:
-                    ok = False
-                    err_msg = str(e)
-                if ok:
-                    break
-            if not ok:
-                raise ValueError(err_msg)
-        return res
+        return prepared_phrase, morphotags_of_phrase
 
     def check_source_wordform(self, checked: str) -> bool:
         if len(checked.strip()) == 0:
@@ -415,43 +502,180 @@ class Accentor:
     def get_bad_words(self):
         return self.__bad_words
 
-    def __generate_phrases_with_jo(self, old_phrase, new_phrase):
-        if len(old_phrase) == 0:
-            yield new_phrase
-        else:
-            found_pos = old_phrase[0].find('е')
-            while found_pos >= 0:
-                new_word = old_phrase[0][:found_pos] + 'ё' + old_phrase[0][(found_pos + 1):]
-                yield from self.__generate_phrases_with_jo(old_phrase[1:], new_phrase + [new_word])
-                found_pos = old_phrase[0].find('е', found_pos + 1)
-            yield from self.__generate_phrases_with_jo(old_phrase[1:], new_phrase + [old_phrase[0]])
-
-    def __do_accents(self, words_list: list, morphotags_list: list=None) -> list:
+    def reset_tier_stats(self):
+        self.__tier_hits = {it: 0 for it in ACCENT_TIERS}
+        self.__tier_times = {it: 0.0 for it in ACCENT_TIERS}
+        self.__batch_cache_hits = 0
+        self.__wiki_requests = 0
+        self.__wiki_errors = 0
+        self.__wiki_time = 0.0
+
+    def get_tier_stats(self) -> dict:
+        '''
+        Статистика уровней поиска ударения (собирается, если collect_stats=True).
+        Для каждого уровня из ACCENT_TIERS: hits - число слов, ударение в которых
+        определено на этом уровне, misses - число слов, которые дошли до этого
+        уровня, но были переданы дальше, time - время, потраченное на слова,
+        определённые на этом уровне (вместе с проверками предыдущих уровней).
+        Слова, повторно встретившиеся в пакете do_accents_batch, не разбираются
+        заново и учитываются только в batch_cache_hits.
+        '''
+        tiers = dict()
+        n_reached = sum(self.__tier_hits.values())
+        for cur_tier in ACCENT_TIERS:
+            tiers[cur_tier] = {'hits': self.__tier_hits[cur_tier], 'misses': n_reached - self.__tier_hits[cur_tier],
+                               'time': self.__tier_times[cur_tier]}
+            n_reached -= self.__tier_hits[cur_tier]
+        return {'tiers': tiers, 'batch_cache_hits': self.__batch_cache_hits,
+                'wiki': {'requests': self.__wiki_requests, 'errors': self.__wiki_errors, 'time': self.__wiki_time}}
+
+    def needs_morphotag(self, source_word: str) -> bool:
+        '''
+        Может ли морфотег повлиять на ударение в слове. Морфотег нужен только
+        омографам (в том числе найденным после восстановления буквы "ё")
+        и, если разрешён поиск в Викисловаре, неизвестным словам. Проверяются
+        и слово целиком, и все его части через дефис.
+        '''
+        cur_token = source_word.lower()
+        if '+' in cur_token:
+            return False
+        for cur_word in [cur_token] + cur_token.split('-'):
+            vowels_counter = len(list(filter(lambda it: it in self.__russian_vowels, cur_word)))
+            if (cur_word in self.__function_words) or (vowels_counter < 2) or \
+                    (('-' + cur_word) in self.__function_words) or ((cur_word + '-') in self.__function_words):
+                continue
+            if cur_word in self.__simple_words_dawg:
+                continue
+            if cur_word in self.__homonyms:
+                return True
+            restored_word = self.__restore_jo(cur_word)
+            if restored_word is not None:
+                if restored_word not in self.__simple_words_dawg:
+                    return True
+            elif self.use_wiki:
+                return True
+        return False
+
+    def __restore_jo(self, cur_word: str):
+        '''
+        Восстановление буквы "ё" в неизвестном слове: поиск в словаре
+        простых слов и в словаре омографов форм, отличающихся от слова
+        только заменой "е" на "ё".
+        '''
+        if 'е' not in cur_word:
+            return None
+        variants = self.__simple_words_dawg.similar_keys(cur_word, self.__jo_replaces)
+        if len(variants) == 0:
+            if self.__homonyms_with_jo is None:
+                # словарь заполняется до присваивания, чтобы другой поток не увидел его недостроенным
+                homonyms_with_jo = dict()
+                for cur_homonym in sorted(filter(lambda it: 'ё' in it, self.__homonyms), key=lambda it: it.find('ё')):
+                    if cur_homonym.replace('ё', 'е') not in homonyms_with_jo:
+                        homonyms_with_jo[cur_homonym.replace('ё', 'е')] = cur_homonym
+                self.__homonyms_with_jo = homonyms_with_jo
+            return self.__homonyms_with_jo.get(cur_word)
+        return min(variants, key=lambda it: it.find('ё'))
+
+    def __do_accents(self, words_list: list, morphotags_list: list=None, resolved_tokens: dict=None) -> list:
         n = len(words_list)
         if morphotags_list is not None:
             assert n == len(morphotags_list), 'Morphotags do not correspond to words!'
-        if n < 1:
-            return []
-        cur_token = words_list[0].lower()
+        lattice = []
+        for word_idx in range(n):
+            cur_token = words_list[word_idx].lower()
+            cur_morphotag = None if morphotags_list is None else morphotags_list[word_idx]
+            if resolved_tokens is None:
+                accented_wordform, accented_wordforms_many, warn = self.__resolve_token(cur_token, cur_morphotag)
+            else:
+                if (cur_token, cur_morphotag) not in resolved_tokens:
+                    resolved_tokens[(cur_token, cur_morphotag)] = self.__resolve_token(cur_token, cur_morphotag)
+                elif self.collect_stats:
+                    self.__batch_cache_hits += 1
+                accented_wordform, accented_wordforms_many, warn = resolved_tokens[(cur_token, cur_morphotag)]
+            if len(warn) > 0:
+                if warn == 'many':
+                    err_msg = f'Word `{cur_token}` has too many accent variants!'
+                else:  # warn == 'no':
+                    err_msg = f'Word `{cur_token}` is unknown!'
+                if self.exception_for_unknown:
+                    raise ValueError(err_msg)
+                self.__bad_words.append(cur_token)
+                warnings.warn(err_msg)
+            if self.mode == 'one':
+                lattice.append([accented_wordform])
+            else:
+                lattice.append(accented_wordforms_many)
+        return lattice
+
+    def __do_accents_for_homonym(self, cur_word: str, morphotag: str=None) -> tuple:
         warn = ''
+        self.logger.debug('The word `%s` is in the dictionary of homonyms', cur_word)
+        if (morphotag is None) or morphotag.isdigit():
+            accented_wordform = cur_word
+            variants = sorted([self.__homonyms[cur_word][it] for it in self.__homonyms[cur_word]])
+            warn = 'many'
+        else:
+            best_ind = -1
+            best_similarity = 0.0
+            morpho_variants = list(self.__homonyms[cur_word].keys())
+            for ind in range(len(morpho_variants)):
+                similarity = self.calculate_morpho_similarity(morpho_variants[ind], morphotag)
+                if similarity > best_similarity:
+                    best_similarity = similarity
+                    best_ind = ind
+            if best_ind >= 0:
+                accented_wordform = self.__homonyms[cur_word][morpho_variants[best_ind]]
+                variants = [self.__homonyms[cur_word][morpho_variants[best_ind]]]
+            else:
+                root_text = self.load_wiki_page(cur_word)
+                if root_text != None:
+                    #print('am I even here?')
+                    cur_accented_wordforms = sorted(self.get_correct_omograph_wiki(root_text, cur_word, morphotag))
+                    if len(cur_accented_wordforms) == 1:
+                        accented_wordform = cur_accented_wordforms[0]
+                        variants = [cur_accented_wordforms[0]]
+                        self.__new_homonyms[cur_word] = {morphotag : cur_accented_wordforms[0]}
+                    elif len(cur_accented_wordforms) > 1:
+                        accented_wordform = cur_word
+                        variants = cur_accented_wordforms
+                        warn = 'many'
+                    else:
+                        accented_wordform = cur_word
+                        variants = sorted([self.__homonyms[cur_word][it] for it in self.__homonyms[cur_word]])
+                        warn = 'many'
+                else:
+                    accented_wordform = cur_word
+                    variants = sorted([self.__homonyms[cur_word][it] for it in self.__homonyms[cur_word]])
+                    warn = 'many'
+        return accented_wordform, variants, warn
+
+    def __resolve_token(self, cur_token: str, morphotag: str=None) -> tuple:
+        warn = ''
+        collect_stats = self.collect_stats
         if '+' in cur_token:
+            if collect_stats:
+                self.__tier_hits['accented'] += 1
             accented_wordforms = [cur_token]
-            accented_wordforms_many = [cur_token]
+            accented_wordforms_many = [[cur_token]]
         else:
             accented_wordforms = []
             accented_wordforms_many = []
             separate_tokens = [cur_token] + cur_token.split('-')
             for i, cur_word in enumerate(separate_tokens):
+                if collect_stats:
+                    start = time.perf_counter()
                 vowels_counter = 0
                 for cur in cur_word:
                     if cur in self.__russian_vowels:
                         vowels_counter += 1
                 if (cur_word in self.__function_words) or (vowels_counter == 0) or (('-' + cur_word) in self.__function_words) or ((cur_word + '-') in self.__function_words):
-                    self.logger.debug(f'The word `{cur_word}` is in the list of function words')
+                    self.logger.debug('The word `%s` is in the list of function words', cur_word)
+                    tier = 'function_words'
                     accented_wordforms += [cur_word]
                     accented_wordforms_many.append([cur_word])
                 elif vowels_counter == 1:
-                    self.logger.debug(f'The word `{cur_word}` has one vowel: accented automatically')
+                    self.logger.debug('The word `%s` has one vowel: accented automatically', cur_word)
+                    tier = 'one_vowel'
                     cur_vowel = list(set(cur_word) & self.__russian_vowels)[0]
                     pos = cur_word.find(cur_vowel)
                     try:
@@ -461,77 +685,71 @@ class Accentor:
                         accented_wordforms += [cur_word[:pos] + '+']
                         accented_wordforms_many.append([cur_word[:pos] + '+'])
                 elif cur_word in self.__simple_words_dawg:
-                    self.logger.debug(f'The word `{cur_word}` is in the dictionary of simple words')
+                    self.logger.debug('The word `%s` is in the dictionary of simple words', cur_word)
+                    tier = 'simple_words'
                     accented_wordform = cur_word[:self.__simple_words_dawg[cur_word]] + '+' + cur_word[self.__simple_words_dawg[cur_word]:]
                     accented_wordforms += [accented_wordform]
                     accented_wordforms_many.append([accented_wordform])
                 elif cur_word in self.__homonyms:
-                    self.logger.debug(f'The word `{cur_word}` is in the dictionary of homonyms')
-                    if (morphotags_list is None) or morphotags_list[0].isdigit():
-                        accented_wordforms += [cur_word]
-                        accented_wordforms_many.append(sorted([self.__homonyms[cur_word][it] for it in self.__homonyms[cur_word]]))
-                        warn = 'many'
-                    else:
-                        best_ind = -1
-                        best_similarity = 0.0
-                        morpho_variants = list(self.__homonyms[cur_word].keys())
-                        for ind in range(len(morpho_variants)):
-                            similarity = self.calculate_morpho_similarity(morpho_variants[ind], morphotags_list[0])
-                            if similarity > best_similarity:
-                                best_similarity = similarity
-                                best_ind = ind
-                        if best_ind >= 0:
-                            accented_wordforms += [self.__homonyms[cur_word][morpho_variants[best_ind]]]
-                            accented_wordforms_many.append([self.__homonyms[cur_word][morpho_variants[best_ind]]])
+                    tier = 'homographs'
+                    accented_wordform, variants, homonym_warn = self.__do_accents_for_homonym(cur_word, morphotag)
+                    accented_wordforms += [accented_wordform]
+                    accented_wordforms_many.append(variants)
+                    if len(homonym_warn) > 0:
+                        warn = homonym_warn
+                else:
+                    restored_word = self.__restore_jo(cur_word)
+                    if restored_word is not None:
+                        self.logger.debug('The word `%s` is restored as `%s`', cur_word, restored_word)
+                        tier = 'restored_jo'
+                        if restored_word in self.__simple_words_dawg:
+                            accented_wordform = restored_word[:self.__simple_words_dawg[restored_word]] + '+' + \
+                                                restored_word[self.__simple_words_dawg[restored_word]:]
+                            accented_wordforms += [accented_wordform]
+                            accented_wordforms_many.append([accented_wordform])
                         else:
-                            root_text = self.load_wiki_page(cur_word)
-                            if root_text != None:
-                                #print('am I even here?')
-                                cur_accented_wordforms = sorted(self.get_correct_omograph_wiki(root_text, cur_word, morphotags_list[0]))
+                            accented_wordform, variants, homonym_warn = self.__do_accents_for_homonym(restored_word,
+                                                                                                      morphotag)
+                            if len(homonym_warn) > 0:
+                                accented_wordform = cur_word
+                                warn = homonym_warn
+                            accented_wordforms += [accented_wordform]
+                            accented_wordforms_many.append(variants)
+                    else:
+                        self.logger.debug('The word `%s` was not found in any of the dictionaries\n'
+                                          'Trying to parse wictionary page...', cur_word)
+                        tier = 'unknown'
+                        root_text = self.load_wiki_page(cur_word)
+                        if root_text != None:
+                            cur_accented_wordforms = sorted(self.get_simple_form_wiki(root_text, cur_word))
+                            if len(cur_accented_wordforms) == 1:
+                                tier = 'wiki'
+                                accented_wordforms += [cur_accented_wordforms[0]]
+                                accented_wordforms_many.append([cur_accented_wordforms[0]])
+                                self.__new_simple_words.add(cur_accented_wordforms[0])
+                            elif len(cur_accented_wordforms) == 0:
+                                accented_wordforms += [cur_word]
+                                accented_wordforms_many.append([cur_word])
+                                warn = 'no'
+                            else:
+                                cur_accented_wordforms = sorted(self.get_correct_omograph_wiki(root_text, cur_word, morphotag))
                                 if len(cur_accented_wordforms) == 1:
+                                    tier = 'wiki'
                                     accented_wordforms += [cur_accented_wordforms[0]]
                                     accented_wordforms_many.append([cur_accented_wordforms[0]])
-                                    self.__new_homonyms[cur_word] = {morphotags_list[0] : cur_accented_wordforms[0]}
-                                elif len(cur_accented_wordforms) > 1:
-                                    accented_wordforms += [cur_word]
-                                    accented_wordforms_many.append([cur_accented_wordforms])
-                                    warn = 'many'
+                                    self.__new_homonyms[cur_word] = {morphotag : cur_accented_wordforms[0]}
                                 else:
                                     accented_wordforms += [cur_word]
                                     accented_wordforms_many.append(sorted([self.__homonyms[cur_word][it] for it in self.__homonyms[cur_word]]))
                                     warn = 'many'
-                            else:
-                                accented_wordforms += [cur_word]
-                                accented_wordforms_many.append(sorted([self.__homonyms[cur_word][it] for it in self.__homonyms[cur_word]]))
-                                warn = 'many'
-                else:
-                    self.logger.debug(f'The word `{cur_word}` was not found in any of the dictionaries\nTrying to parse wictionary page...')
-                    root_text = self.load_wiki_page(cur_word)
-                    if root_text != None:
-                        cur_accented_wordforms = sorted(self.get_simple_form_wiki(root_text, cur_word))
-                        if len(cur_accented_wordforms) == 1:
-                            accented_wordforms += [cur_accented_wordforms[0]]
-                            accented_wordforms_many.append([cur_accented_wordforms[0]])
-                            self.__new_simple_words.add(cur_accented_wordforms[0])
-                        elif len(cur_accented_wordforms) == 0:
+
+                        else:
                             accented_wordforms += [cur_word]
                             accented_wordforms_many.append([cur_word])
                             warn = 'no'
-                        else:
-                            cur_accented_wordforms = sorted(self.get_correct_omograph_wiki(root_text, cur_word, morphotags_list[0]))
-                            if len(cur_accented_wordforms) == 1:
-                                accented_wordforms += [cur_accented_wordforms[0]]
-                                accented_wordforms_many.append([cur_accented_wordforms[0]])
-                                self.__new_homonyms[cur_word] = {morphotags_list[0] : cur_accented_wordforms[0]}
-                            else:
-                                accented_wordforms += [cur_word]
-                                accented_wordforms_many.append(sorted([self.__homonyms[cur_word][it] for it in self.__homonyms[cur_word]]))
-                                warn = 'many'
-
-                    else:
-                        accented_wordforms += [cur_word]
-                        accented_wordforms_many.append([cur_word])
-                        warn = 'no'
+                if collect_stats:
+                    self.__tier_hits[tier] += 1
+                    self.__tier_times[tier] += time.perf_counter() - start
                 if i == 0:
                     if (accented_wordforms[0].find('+') != -1) or (len(separate_tokens) == 2):
                         break
@@ -546,30 +764,6 @@ class Accentor:
         else:
             accented_wordforms = [accented_wordforms[0]]
             accented_wordforms_many = accented_wordforms_many[0]
-        if cur_token in accented_wordforms:
-            accented_wordforms = [accented_wordforms[accented_wordforms.index(cur_token)]]
-            if warn != '':
-                if warn == 'many':
-                    err_msg = f'Word `{cur_token}` has too many accent variants!'
-                else:  # warn == 'no':
-                    err_msg = f'Word `{cur_token}` is unknown!'
-                if self.exception_for_unknown:
-                    raise ValueError(err_msg)
-                self.__bad_words.append(cur_token)
-                warnings.warn(err_msg)
-        accented_phrases = []
-        if n > 1:
-            if self.mode == 'one':
-                for vt in self.__do_accents(words_list[1:], None if morphotags_list is None else morphotags_list[1:]):
-                    accented_phrases.append([accented_wordforms[0]] + vt)
-            else:
-                for cur_accent in accented_wordforms_many:
-                    for vt in self.__do_accents(words_list[1:], None if morphotags_list is None else morphotags_list[1:]):
-                        accented_phrases.append([cur_accent] + vt)
-        else:
-            if self.mode == 'one':
-                accented_phrases.append([accented_wordforms[0]])
-            else:
-                for cur_accent in accented_wordforms_many:
-                    accented_phrases.append([cur_accent])
-        return accented_phrases
+        if cur_token not in accented_wordforms:
+            warn = ''
+        return accented_wordforms[0], accented_wordforms_many, warn
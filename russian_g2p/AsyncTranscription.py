@@ -0,0 +1,124 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from russian_g2p.Grapheme2Phoneme import OUTPUT_FORMATS
+from russian_g2p.Transcription import Transcription
+
+
+class AsyncTranscription:
+    '''
+    Асинхронный фасад над Transcription. Вызовы `await transcribe(text)` из
+    разных корутин собираются в пакеты не более чем из max_batch_size текстов:
+    пакет отправляется, как только он заполнен или как только первый текст в
+    нём прождал max_wait секунд. Пакет транскрибируется в отдельном потоке,
+    чтобы не блокировать цикл событий, и каждый вызов получает свой результат.
+    Если транскрипция пакета завершилась ошибкой, то его тексты повторно
+    транскрибируются по одному, и ошибку получают только вызовы с ошибочными текстами.
+    '''
+
+    def __init__(self, transcription: Transcription=None, max_batch_size: int=64, max_wait: float=0.005,
+                 **kwargs):
+        assert max_batch_size > 0, f'{max_batch_size} is wrong size of the batch!'
+        assert max_wait >= 0.0, f'{max_wait} is wrong waiting time!'
+        self.transcription = Transcription(**kwargs) if transcription is None else transcription
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.n_batches = 0
+        self.n_texts = 0
+        self.__requests = None
+        self.__batching_task = None
+        self.__closed = False
+        # Transcription не потокобезопасен, поэтому все пакеты выполняются в одном потоке по очереди
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='russian_g2p-async')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        '''
+        Остановка сбора пакетов. Вызовы, которые ещё ждут результата, отменяются,
+        а новые вызовы после остановки невозможны.
+        '''
+        self.__closed = True
+        if self.__batching_task is not None:
+            self.__batching_task.cancel()
+            try:
+                await self.__batching_task
+            except asyncio.CancelledError:
+                pass
+            self.__batching_task = None
+        if self.__requests is not None:
+            while not self.__requests.empty():
+                _, _, future = self.__requests.get_nowait()
+                future.cancel()
+            self.__requests = None
+        self.__executor.shutdown(wait=True)
+
+    async def transcribe(self, text: str, output_format: str='list'):
+        '''
+        Транскрипция одного текста (результат такой же, как transcribe([text])[0]
+        у Transcription).
+        '''
+        assert output_format in OUTPUT_FORMATS, f'`{output_format}` is unknown output format!'
+        if self.__closed:
+            raise RuntimeError('AsyncTranscription is closed!')
+        if self.__batching_task is None:
+            self.__requests = asyncio.Queue()
+            self.__batching_task = asyncio.get_running_loop().create_task(self.__process_requests())
+        future = asyncio.get_running_loop().create_future()
+        await self.__requests.put((text, output_format, future))
+        return await future
+
+    async def __collect_batch(self) -> list:
+        batch = [await self.__requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self.__requests.empty():
+                batch.append(self.__requests.get_nowait())
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0.0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.__requests.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def __transcribe_requests(self, requests: list, output_format: str):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.__executor, self.transcription.transcribe,
+                                                 [it[0] for it in requests], output_format)
+        except Exception as err:
+            if len(requests) == 1:
+                if not requests[0][2].done():
+                    requests[0][2].set_exception(err)
+                return
+            # один ошибочный текст не должен приводить к ошибке у всех вызовов пакета
+            for cur_request in requests:
+                await self.__transcribe_requests([cur_request], output_format)
+            return
+        for (_, _, future), cur_result in zip(requests, results):
+            if not future.done():
+                future.set_result(cur_result)
+
+    async def __process_requests(self):
+        while True:
+            batch = [it for it in await self.__collect_batch() if not it[2].cancelled()]
+            if len(batch) == 0:
+                continue
+            self.n_batches += 1
+            self.n_texts += len(batch)
+            try:
+                for output_format in sorted(set(it[1] for it in batch)):
+                    await self.__transcribe_requests([it for it in batch if it[1] == output_format], output_format)
+            finally:
+                # при остановке сбора пакетов вызовы из текущего пакета не должны ждать вечно
+                for _, _, future in batch:
+                    if not future.done():
+                        future.cancel()
@@ -1,15 +1,65 @@
+from array import array
+from collections import OrderedDict
 import codecs
 import os
 import re
 import warnings
 
-from russian_g2p.RulesForGraphemes import RulesForGraphemes
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from russian_g2p.LexiconSnapshot import get_lexicon_snapshot
+from russian_g2p.PronunciationLexicon import get_pronunciation_lexicon
+from russian_g2p.RulesForGraphemes import RulesForGraphemes, PHONEME_SIL, PHONEME_DEAF, PHONEME_VOICED_WEAK, \
+    PHONEME_VOICED_STRONG, PHONEME_VOWEL
+
+
+OUTPUT_FORMATS = ('list', 'array', 'numpy')
+
+_merge_tables_of_modes = dict()
+
+# упрощение сочетаний согласных
+_CLUSTER_REWRITES = (('стн', 'сн'), ('стл', 'сл'), ('нтг', 'нг'), ('здн', 'зн'), ('здц', 'зц'),
+                     ('ндц', 'нц'), ('рдц', 'рц'), ('ндш', 'нш'), ('гдт', 'гт'), ('лнц', 'нц'))
+
+# сопряжённые фонемы, сливающиеся в одну
+_CONJUGATED_PHONEMES = {
+    ('Z', 'ZH'): 'ZH',
+    ('Z', 'ZH0'): 'ZH0', ('Z0', 'ZH0'): 'ZH0',
+
+    ('D', 'Z'): 'DZ', ('D', 'DZ'): 'DZ',
+    ('D', 'Z0'): 'DZ0', ('D0', 'Z0'): 'DZ0', ('D', 'DZ0'): 'DZ0', ('D0', 'DZ0'): 'DZ0',
+
+    ('D', 'ZH'): 'DZH', ('D', 'DZH'): 'DZH',
+    ('D', 'ZH0'): 'DZ0', ('D0', 'ZH0'): 'DZH0', ('D', 'DZH0'): 'DZH0', ('D0', 'DZH0'): 'DZH0',
+
+    ('T', 'S'): 'TS', ('T', 'TS'): 'TS',
+    ('T', 'S0'): 'TS0', ('T0', 'S0'): 'TS0', ('T', 'TS0'): 'TS0', ('T0', 'TS0'): 'TS0',
+
+    ('T', 'SH'): 'TSH', ('T', 'TSH'): 'TSH',
+    ('T', 'SH0'): 'TSH0', ('T0', 'SH0'): 'TSH0', ('T', 'TSH0'): 'TSH0', ('T0', 'TSH0'): 'TSH0',
+
+    ('S', 'SH'): 'SH',
+    ('S', 'TSH0'): 'SH0', ('SH', 'TSH0'): 'SH0',
+}
 
 
 class Grapheme2Phoneme(RulesForGraphemes):
-    def __init__(self, users_mode='Modern', exception_for_nonaccented=False):
+    def __init__(self, users_mode='Modern', exception_for_nonaccented=False, use_snapshot=True, cache_size=10000,
+                 use_pronunciations=True, pronunciations_name=None):
         RulesForGraphemes.__init__(self, users_mode)
         self.exception_for_nonaccented = exception_for_nonaccented
+        assert cache_size >= 0, f'{cache_size} is wrong size of the cache!'
+        self.cache_size = cache_size
+        self.__users_mode = users_mode
+        self.__cache = OrderedDict()
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__cache_evictions = 0
+        self.__boundary_class_names = {PHONEME_SIL: 'sil', PHONEME_DEAF: 'deaf', PHONEME_VOICED_WEAK: 'voiced_weak',
+                                       PHONEME_VOICED_STRONG: 'voiced_strong', PHONEME_VOWEL: 'vowel'}
 
         self.__re_for_phrase_split = None
 
@@ -26,11 +76,42 @@ class Grapheme2Phoneme(RulesForGraphemes):
         self.__function_words_2 = {'бы', 'б', 'де', 'ли', 'же', '-то', '-ка', '-либо', '-нибудь', '-таки'}
 
         self.__exclusions_dictionary = None
-        exclusions_dictionary_name = os.path.join(os.path.dirname(__file__), 'data', 'Phonetic_Exclusions.txt')
-        assert os.path.isfile(exclusions_dictionary_name), \
-            f'File `{exclusions_dictionary_name}` does not exist!'
-        self.__exclusions_dictionary = self.load_exclusions_dictionary(exclusions_dictionary_name)
+        snapshot = get_lexicon_snapshot() if use_snapshot else None
+        if snapshot is not None:
+            self.__exclusions_dictionary = snapshot.exclusions
+        else:
+            exclusions_dictionary_name = os.path.join(os.path.dirname(__file__), 'data', 'Phonetic_Exclusions.txt')
+            assert os.path.isfile(exclusions_dictionary_name), \
+                f'File `{exclusions_dictionary_name}` does not exist!'
+            self.__exclusions_dictionary = self.load_exclusions_dictionary(exclusions_dictionary_name)
         self.__re_for_phrase_split = re.compile(r'[\s\-]+', re.U)
+        # слово из словаря исключений сразу заменяется окончательной формой (исключение из исключения тоже учтено)
+        self.__word_rewrites = {word: self.__exclusions_dictionary.get(transformed_word, transformed_word)
+                                for word, transformed_word in self.__exclusions_dictionary.items()}
+        self.__re_for_clusters = re.compile('|'.join(map(lambda it: it[0], _CLUSTER_REWRITES)))
+        # проверка допустимости символов слова и фразы одним регулярным выражением
+        russian_letters = re.escape(''.join(sorted(self.mode.all_russian_letters)))
+        unaccented_vocals = re.escape(''.join(sorted(filter(lambda it: len(it) == 1, self.mode.vocals))))
+        self.__re_for_word_check = re.compile(f'[{russian_letters}+\\-]+')
+        self.__re_for_phrase_check = re.compile(f'[{russian_letters} +\\-sil]+')
+        self.__re_for_russian_letter = re.compile(f'[{russian_letters}]')
+        self.__re_for_letters = re.compile(f'[{unaccented_vocals}]\\+|[{russian_letters}]')
+        self.__re_for_vocals = re.compile(r'[аоуэыияёею]')
+        self.__re_for_phrase_cleaning = re.compile('[^a-zйцукенгшщзхъфывапролджэячсмитьбюё+ ]')
+        # после этих букв начальная «и» следующего слова не переходит в «ы»
+        self.__letters_before_i = self.mode.vocals | {'ь', ''} | self.mode.soft_consonants
+        # таблица символов: <eps> и тишина всегда имеют номера 0 и 1, остальные фонемы упорядочены по алфавиту
+        self.__phoneme_symbols = ['<eps>', self.__silence_name] + \
+                                 sorted(self.mode.russian_phonemes_set - {self.__silence_name})
+        self.__phoneme_symbol_ids = {phoneme: phoneme_id for phoneme_id, phoneme in enumerate(self.__phoneme_symbols)}
+        # таблицы слияния фонем, как и сами правила режима, строятся один раз на процесс
+        if self.compiled_mode not in _merge_tables_of_modes:
+            _merge_tables_of_modes[self.compiled_mode] = self.__compile_merge_tables()
+        self.__merge_phoneme_names, self.__merge_phoneme_ids, self.__merge_tables, self.__short_phoneme_ids = \
+            _merge_tables_of_modes[self.compiled_mode]
+        # готовые транскрипции известных слов (если словарь транскрипций построен для этого режима)
+        self.__pronunciations = get_pronunciation_lexicon(self.compiled_mode, pronunciations_name) \
+            if use_pronunciations else None
 
     @property
     def russian_letters(self) -> list:
@@ -44,6 +125,46 @@ class Grapheme2Phoneme(RulesForGraphemes):
     def silence_name(self) -> str:
         return self.__silence_name
 
+    @property
+    def phoneme_symbols(self) -> list:
+        return list(self.__phoneme_symbols)
+
+    @property
+    def exclusions(self) -> dict:
+        return self.__exclusions_dictionary
+
+    @property
+    def pronunciations(self):
+        return self.__pronunciations
+
+    @property
+    def cache_hits(self) -> int:
+        return self.__cache_hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self.__cache_misses
+
+    @property
+    def cache_evictions(self) -> int:
+        return self.__cache_evictions
+
+    def clear_cache(self):
+        self.__cache.clear()
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__cache_evictions = 0
+
+    def get_boundary_class(self, next_phoneme: str):
+        '''
+        Класс фонемы, следующей за словом: от него (а не от самой фонемы)
+        зависит транскрипция последнего согласного слова.
+        '''
+        phoneme_class = self.phoneme_classes.get(next_phoneme)
+        if phoneme_class is None:
+            return None
+        return self.__boundary_class_names[phoneme_class]
+
     def load_exclusions_dictionary(self, file_name: str) -> dict:
         words_and_words = dict()
         with codecs.open(file_name, mode='r', encoding='utf-8', errors='ignore') as dictionary_file:
@@ -66,36 +187,75 @@ class Grapheme2Phoneme(RulesForGraphemes):
                 cur_line_index += 1
         return words_and_words
 
+    def save_phoneme_symbols(self, file_name: str):
+        '''
+        Сохранение таблицы символов фонем в формате phones.txt системы Kaldi.
+        '''
+        with codecs.open(file_name, mode='w', encoding='utf-8', errors='ignore') as fp:
+            for phoneme_id, phoneme in enumerate(self.__phoneme_symbols):
+                fp.write(f'{phoneme} {phoneme_id}\n')
+
+    def phonemes_to_ids(self, phonemes: list, output_format: str='array'):
+        assert output_format in OUTPUT_FORMATS, f'`{output_format}` is unknown output format!'
+        if output_format == 'list':
+            return phonemes
+        try:
+            phoneme_ids = array('H', map(self.__phoneme_symbol_ids.__getitem__, phonemes))
+        except KeyError as err:
+            raise ValueError(f'`{err.args[0]}` is unknown phoneme!')
+        if output_format == 'numpy':
+            assert np is not None, 'NumPy is required for the `numpy` output format!'
+            return np.frombuffer(phoneme_ids, dtype=np.uint16)
+        return phoneme_ids
+
     def check_word(self, checked_word: str):
         assert len(checked_word) > 0, 'Checked word is empty string!'
-        assert all([c in (self.mode.all_russian_letters | {'+', '-'}) for c in checked_word.lower()]), \
+        prepared_word = checked_word.lower()
+        assert self.__re_for_word_check.fullmatch(prepared_word) is not None, \
             f'`{checked_word}`: this word contains inadmissible characters!'
-        assert len(list(filter(lambda c: c in self.mode.all_russian_letters, checked_word.lower()))) > 0, \
+        assert self.__re_for_russian_letter.search(prepared_word) is not None, \
             f'`{checked_word}`: this word is incorrect!'
 
     def check_phrase(self, checked_phrase: str):
         assert len(checked_phrase) > 0, 'Checked phrase is empty string!'
-        assert all([c in (self.mode.all_russian_letters | {' ', '+', '-'} | {'s', 'i', 'l'})
-                    for c in checked_phrase.lower()]), \
+        assert self.__re_for_phrase_check.fullmatch(checked_phrase.lower()) is not None, \
             f'`{checked_phrase}`: this phrase contains inadmissible characters!'
         # for cur_word in self.__re_for_phrase_split.split(checked_phrase.lower()):
         # assert (len(list(filter(lambda c: c in self.all_russian_letters, cur_word))) > 0) \
         #      or (cur_word.lower() == 'sil'), f'`{checked_phrase}`: this phrase is incorrect!'
 
-    def word_to_phonemes(self, source_word: str, next_phoneme: str = 'sil') -> list:
-        self.check_word(source_word)
+    def word_to_phonemes(self, source_word: str, next_phoneme: str = 'sil', validate: bool=True) -> list:
+        '''
+        Транскрипция слова. Если слово получено от Accentor-а или уже проверено
+        иным образом, можно отключить проверку его символов (validate=False).
+        '''
+        boundary_class = self.get_boundary_class(next_phoneme) if self.cache_size > 0 else None
+        if boundary_class is None:
+            return self.__word_to_phonemes(source_word, next_phoneme, validate)
+        cache_key = (source_word, boundary_class, self.__users_mode)
+        if cache_key in self.__cache:
+            self.__cache_hits += 1
+            self.__cache.move_to_end(cache_key)
+            return list(self.__cache[cache_key])
+        self.__cache_misses += 1
+        transcription = self.__word_to_phonemes(source_word, next_phoneme, validate)
+        self.__cache[cache_key] = tuple(transcription)
+        if len(self.__cache) > self.cache_size:
+            self.__cache.popitem(last=False)
+            self.__cache_evictions += 1
+        return transcription
+
+    def __word_to_phonemes(self, source_word: str, next_phoneme: str, validate: bool=True) -> list:
+        if validate:
+            self.check_word(source_word)
+        if self.__pronunciations is not None:
+            transcription = self.__find_pronunciation(source_word, next_phoneme)
+            if transcription is not None:
+                return transcription
         error_message = f'`{source_word}`: this word is incorrect!'
         prepared_word = source_word.lower()
-        if prepared_word in self.__exclusions_dictionary:
-            prepared_word = self.__exclusions_dictionary[prepared_word]
-        if '+' not in prepared_word:
-            counter = len(prepared_word) - len(re.sub(r'[аоуэыияёею]', '', prepared_word))
-            if counter > 1:
-                if self.exception_for_nonaccented:
-                    raise ValueError(f'`{source_word}`: the accent for this word is unknown!')
-                warnings.warn(f'`{source_word}`: the accent for this word is unknown!')
-        if prepared_word in self.__exclusions_dictionary:
-            prepared_word = self.__exclusions_dictionary[prepared_word]
+        prepared_word = self.__word_rewrites.get(prepared_word, prepared_word)
+        self.__check_accent(source_word, prepared_word)
         prepared_word = prepared_word.replace('\'', '')
         if '-' in prepared_word:
             if (not self.in_function_words_1(prepared_word)) and (not self.in_function_words_2(prepared_word)):
@@ -107,40 +267,113 @@ class Grapheme2Phoneme(RulesForGraphemes):
                         prepared_word_parts.append('-' + cur_part)
                     else:
                         prepared_word_parts.append(cur_part)
-                return self.phrase_to_phonemes(' '.join(prepared_word_parts))
+                # составное слово транскрибируется как фраза из его частей
+                return self.__words_to_phonemes(self.__clean_phrase(' '.join(prepared_word_parts)).split(),
+                                                validate)
             prepared_word = self.__remove_character(prepared_word, '-')
         letters_list = self.__word_to_letters_list(self.__prepare_word(prepared_word))
         n = len(letters_list)
         assert n > 0, error_message
-        ind = n - 1
         # начинаем формировать транскрипцию
-        transcription = list()
-        while ind >= 0:
-            if ind >= 0 and letters_list[ind] in self.mode.hard_and_soft_signs:
-                ind -= 1
-                continue
-            if letters_list[ind] in self.mode.vocals:
-                new_phonemes = self.apply_rule_for_vocals(letters_list, ind)
-            else:
-                assert letters_list[ind] in self.mode.consonants, error_message
-                new_phonemes = self.apply_rule_for_consonants(letters_list, next_phoneme, ind)
-            ind -= 1
-            transcription = new_phonemes + transcription
-            next_phoneme = new_phonemes[0]
+        transcription = self.ids_to_phonemes(self.letters_to_ids(letters_list), next_phoneme)
         assert len(transcription) > 0, f'`{source_word}`: this word cannot be transcribed!'
-        return self.__remove_long_phonemes(self.__remove_repeats_from_transcription(transcription))
-
-    def phrase_to_phonemes(self, source_phrase: str) -> list:
-        error_message = f'`{source_phrase}`: this phrase is incorrect!'
-        source_phrase = source_phrase.lower().replace('-', ' ')
-        source_phrase = re.sub('[^a-zйцукенгшщзхъфывапролджэячсмитьбюё+ ]', '', source_phrase)
-        self.check_phrase(source_phrase)
+        return self.__postprocess_transcription(transcription)
+
+    def words_to_phonemes_batch(self, source_words: list, next_phoneme: str='sil', batch_size: int=4096,
+                                validate: bool=True) -> list:
+        '''
+        Транскрипция большого списка отдельных слов (например, при построении
+        словаря произношений). Результат тот же, что и у word_to_phonemes для
+        каждого слова, но правила применяются с помощью NumPy сразу к пакету
+        слов одинаковой длины. Слова из словаря исключений и слова с дефисом
+        транскрибируются по одному.
+        '''
+        assert batch_size > 0, f'{batch_size} is wrong size of the batch!'
+        if np is None:
+            return [self.word_to_phonemes(cur_word, next_phoneme, validate) for cur_word in source_words]
+        transcriptions = [None for _ in range(len(source_words))]
+        words_for_batch = list()
+        for word_idx, source_word in enumerate(source_words):
+            if validate:
+                self.check_word(source_word)
+            if self.__pronunciations is not None:
+                transcriptions[word_idx] = self.__find_pronunciation(source_word, next_phoneme)
+                if transcriptions[word_idx] is not None:
+                    continue
+            prepared_word = source_word.lower()
+            if (prepared_word in self.__exclusions_dictionary) or ('-' in prepared_word):
+                transcriptions[word_idx] = self.word_to_phonemes(source_word, next_phoneme, validate)
+                continue
+            self.__check_accent(source_word, prepared_word)
+            letters_list = self.__word_to_letters_list(self.__prepare_word(prepared_word.replace('\'', '')))
+            assert len(letters_list) > 0, f'`{source_word}`: this word is incorrect!'
+            words_for_batch.append((word_idx, self.letters_to_ids(letters_list)))
+        # слова близкой длины попадают в один пакет, чтобы выравнивание было минимальным
+        words_for_batch.sort(key=lambda it: len(it[1]))
+        for batch_start in range(0, len(words_for_batch), batch_size):
+            batch = words_for_batch[batch_start:(batch_start + batch_size)]
+            batch_transcriptions = self.ids_batch_to_phonemes([it[1] for it in batch], next_phoneme)
+            for (word_idx, _), transcription in zip(batch, batch_transcriptions):
+                if (transcription is None) or (len(transcription) == 0):
+                    transcriptions[word_idx] = self.__word_to_phonemes(source_words[word_idx], next_phoneme, validate)
+                else:
+                    transcriptions[word_idx] = self.__postprocess_transcription(transcription)
+        return transcriptions
+
+    def phrase_to_phonemes(self, source_phrase: str, output_format: str='list', validate: bool=True):
+        '''
+        Транскрипция фразы. В зависимости от output_format возвращается список
+        фонем ('list') или номера фонем в таблице phoneme_symbols в виде
+        array('H') ('array') либо массива NumPy ('numpy'). Проверку символов
+        фразы, полученной от Accentor-а, можно отключить (validate=False), но
+        фраза, в которой после очистки не осталось ни одного слова (например,
+        состоявшая из цифр), отвергается всегда.
+        '''
+        assert output_format in OUTPUT_FORMATS, f'`{output_format}` is unknown output format!'
+        source_phrase = self.__clean_phrase(source_phrase)
+        if validate:
+            self.check_phrase(source_phrase)
         words_in_phrase = source_phrase.split()
+        assert len(words_in_phrase) > 0, 'Checked phrase is empty string!'
+        return self.phonemes_to_ids(self.__words_to_phonemes(words_in_phrase, validate), output_format)
+
+    def get_phrase_forms(self, source_word: str) -> list:
+        '''
+        Формы, в которых слово передаётся в word_to_phonemes при транскрипции
+        фразы: после замены по словарю исключений и упрощения окончаний,
+        а также с «ы» вместо начальной «и» и с «ъ» перед начальной йотированной
+        гласной.
+        '''
+        prepared_word = source_word.lower()
+        prepared_word = self.__prepare_word(self.__exclusions_dictionary.get(prepared_word, prepared_word))
+        if len(prepared_word) == 0:
+            return []
+        phrase_forms = [prepared_word]
+        if prepared_word[0] == 'и':
+            phrase_forms.append('ы' + prepared_word[1:])
+        if prepared_word[0] in self.mode.double_vocals:
+            phrase_forms.append('ъ' + prepared_word)
+        return phrase_forms
+
+    def __find_pronunciation(self, source_word: str, next_phoneme: str):
+        phoneme_class = self.phoneme_classes.get(next_phoneme)
+        if phoneme_class is None:
+            return None
+        return self.__pronunciations.get_transcription(source_word.lower(), phoneme_class == PHONEME_VOICED_STRONG)
+
+    def __clean_phrase(self, source_phrase: str) -> str:
+        return self.__re_for_phrase_cleaning.sub('', source_phrase.lower().replace('-', ' '))
+
+    def __words_to_phonemes(self, words_in_phrase: list, validate: bool) -> list:
+        '''
+        Транскрипция последовательности слов за линейное время: псевдослова
+        разбираются справа налево, и их транскрипции добавляются в конец
+        списка, который в конце переворачивается.
+        '''
         l = len(words_in_phrase)
         for i in range(l):
-            if words_in_phrase[i] in self.__exclusions_dictionary:
-                words_in_phrase[i] = self.__exclusions_dictionary[words_in_phrase[i]]
-            words_in_phrase[i] = self.__prepare_word(words_in_phrase[i])
+            words_in_phrase[i] = self.__prepare_word(self.__exclusions_dictionary.get(words_in_phrase[i],
+                                                                                     words_in_phrase[i]))
         # формируем псевдослова, объединяя предлоги со стоящими после них словами
         new_words = list()
         cur_word = ''
@@ -149,7 +382,7 @@ class Grapheme2Phoneme(RulesForGraphemes):
             clear_word = words_in_phrase[i].replace('+', '')
             to_append = (i == l - 1) or (clear_word not in self.__function_words_1)
             if words_in_phrase[i][0] == 'и':
-                if last_letter not in (self.mode.vocals | {'ь', ''} | self.mode.soft_consonants):
+                if last_letter not in self.__letters_before_i:
                     words_in_phrase[i] = 'ы' + words_in_phrase[i][1:]
             if words_in_phrase[i][0] in self.mode.double_vocals:
                 words_in_phrase[i] = 'ъ' + words_in_phrase[i]
@@ -162,17 +395,14 @@ class Grapheme2Phoneme(RulesForGraphemes):
         next_phoneme = 'sil'
         phrase_transcription = []
         for i in range(len(new_words) - 1, -1, -1):
-            new_transcription = self.word_to_phonemes(new_words[i], next_phoneme)
-            new_transcription = self.__remove_repeats_from_transcription(new_transcription)
-            new_transcription = self.__remove_long_phonemes(new_transcription)
-            phrase_transcription = [new_transcription] + phrase_transcription
+            new_transcription = self.word_to_phonemes(new_words[i], next_phoneme, validate)
+            new_transcription = self.__postprocess_transcription(new_transcription)
+            phrase_transcription.append(new_transcription)
             next_phoneme = new_transcription[0]
         final_transcription = list()
-        for word_transcription in phrase_transcription:
+        for word_transcription in reversed(phrase_transcription):
             final_transcription += word_transcription
-        final_transcription = self.__remove_repeats_from_transcription(final_transcription, full=False)
-        final_transcription = self.__remove_long_phonemes(final_transcription)
-        return final_transcription
+        return self.__postprocess_transcription(final_transcription, full=False)
 
     def in_function_words_1(self, source_word: str) -> bool:
         return self.__remove_character(source_word, '+').lower() in self.__function_words_1
@@ -183,11 +413,16 @@ class Grapheme2Phoneme(RulesForGraphemes):
     def __remove_character(self, source_word: str, removed_char: str) -> str:
         return ''.join(list(filter(lambda a: a != removed_char, source_word.lower())))
 
+    def __check_accent(self, source_word: str, prepared_word: str):
+        if '+' not in prepared_word:
+            counter = len(self.__re_for_vocals.findall(prepared_word))
+            if counter > 1:
+                if self.exception_for_nonaccented:
+                    raise ValueError(f'`{source_word}`: the accent for this word is unknown!')
+                warnings.warn(f'`{source_word}`: the accent for this word is unknown!')
+
     def __prepare_word(self, cur_word: str) -> str:
         prepared_word = cur_word.lower().strip()
-        replace_pairs = [('стн', 'сн'), ('стл', 'сл'), ('нтг', 'нг'), ('здн', 'зн'), ('здц', 'зц'),
-                         ('ндц', 'нц'), ('рдц', 'рц'), ('ндш', 'нш'), ('гдт', 'гт'), ('лнц', 'нц'),
-                         ]
         if (len(prepared_word) > 2 and prepared_word[-3:] == 'его') or \
                 (len(prepared_word) > 3 and prepared_word[-3:] == 'ого') or \
                 (len(prepared_word) > 3 and prepared_word[-4:] in {'о+го', 'е+го'}):
@@ -196,112 +431,108 @@ class Grapheme2Phoneme(RulesForGraphemes):
             prepared_word = prepared_word[:-3] + 'ца'
         elif len(prepared_word) > 3 and prepared_word[-4:] == 'ться':
             prepared_word = prepared_word[:-4] + 'ца'
-        for repl_from, repl_to in replace_pairs:
-            prepared_word = prepared_word.replace(repl_from, repl_to)
+        # замены применяются последовательно (результат одной может образовать сочетание для другой),
+        # но только к тем немногим словам, в которых есть хотя бы одно такое сочетание
+        if self.__re_for_clusters.search(prepared_word) is not None:
+            for repl_from, repl_to in _CLUSTER_REWRITES:
+                prepared_word = prepared_word.replace(repl_from, repl_to)
         return prepared_word
 
     def __word_to_letters_list(self, cur_word: str) -> list:
-        vocal_letters = set(filter(lambda letter: not letter.endswith('+'), self.mode.vocals))
-        error_message = f"`{cur_word}`: this word is incorrect!"
-        letters_list = list()
-        new_letter = ''
-        for ind in range(len(cur_word)):
-            if cur_word[ind] == '+':
-                assert new_letter in vocal_letters, error_message
-                new_letter += cur_word[ind]
-            else:
-                assert cur_word[ind] in self.mode.all_russian_letters, error_message
-                if len(new_letter):
-                    letters_list.append(new_letter)
-                new_letter = cur_word[ind]
-        if len(new_letter):
-            letters_list.append(new_letter)
-        del vocal_letters
+        # знак ударения может стоять только после безударной гласной, и любой другой символ,
+        # не попавший в список букв, делает слово некорректным
+        letters_list = self.__re_for_letters.findall(cur_word)
+        assert sum(map(len, letters_list)) == len(cur_word), f"`{cur_word}`: this word is incorrect!"
         return letters_list
 
-    def __remove_repeats_from_transcription(self, source_transcription: list, full: bool=True) -> list:
-        def equal(s_l: str, s_r: str) -> bool:
-            s_l_ = re.sub(r'[l]', '', s_l)
-            s_r_ = re.sub(r'[l]', '', s_r)
-            ans = s_l_ == s_r_
-            return ans
-
-        def equal_almost(s_l: str, s_r: str) -> bool:
-            s_l_ = re.sub(r'[l]', '', s_l)
-            s_r_ = re.sub(r'[0l]', '', s_r)
-            ans = s_l_ == s_r_
-            return ans
-
-        phomene_pairs = {('Z', 'ZH'): 'ZH',
-                         ('Z', 'ZH0'): 'ZH0', ('Z0', 'ZH0'): 'ZH0',
-
-                         ('D', 'Z'): 'DZ', ('D', 'DZ'): 'DZ',
-                         ('D', 'Z0'): 'DZ0', ('D0', 'Z0'): 'DZ0', ('D', 'DZ0'): 'DZ0', ('D0', 'DZ0'): 'DZ0',
-
-                         ('D', 'ZH'): 'DZH', ('D', 'DZH'): 'DZH',
-                         ('D', 'ZH0'): 'DZ0', ('D0', 'ZH0'): 'DZH0', ('D', 'DZH0'): 'DZH0', ('D0', 'DZH0'): 'DZH0',
-
-                         ('T', 'S'): 'TS', ('T', 'TS'): 'TS',
-                         ('T', 'S0'): 'TS0', ('T0', 'S0'): 'TS0', ('T', 'TS0'): 'TS0', ('T0', 'TS0'): 'TS0',
-
-                         ('T', 'SH'): 'TSH', ('T', 'TSH'): 'TSH',
-                         ('T', 'SH0'): 'TSH0', ('T0', 'SH0'): 'TSH0', ('T', 'TSH0'): 'TSH0', ('T0', 'TSH0'): 'TSH0',
-
-                         ('S', 'SH'): 'SH',
-                         ('S', 'TSH0'): 'SH0', ('SH', 'TSH0'): 'SH0',
-                         }
-
-        def conjugate(s_l: str, s_r: str) -> str:
-            s_l_ = re.sub(r'[l]', '', s_l)
-            s_r_ = re.sub(r'[l]', '', s_r)
-            ans = phomene_pairs[(s_l_, s_r_)] if (s_l_, s_r_) in phomene_pairs else ''
-            return ans
-
-        prepared_transcription = list()
-        previous_phoneme = ''
+    def __merge_phonemes(self, previous_phoneme: str, current_phoneme: str, full: bool) -> str:
+        '''
+        Слияние двух соседних фонем: возвращает фонему, которой заменяется
+        предыдущая, или пустую строку, если текущая фонема просто добавляется.
+        '''
+        previous_phoneme_ = previous_phoneme.replace('l', '')
+        current_phoneme_ = current_phoneme.replace('l', '')
+        #  1st case: S0 S0 -> S0l
+        #  2nd case: S S0 -> S0l
+        if (previous_phoneme_ == current_phoneme_) or (previous_phoneme_ == current_phoneme_.replace('0', '')):
+            return current_phoneme + 'l'
+        #  3rd case: S SH -> SHl
         if full:
-            for current_phoneme in source_transcription:
-                if equal(previous_phoneme, current_phoneme):
-                    #  1st case: S0 S0 -> S0l
-                    prepared_transcription[-1] = current_phoneme + 'l'
-                elif equal_almost(previous_phoneme, current_phoneme):
-                    #  2nd case: S S0 -> S0l
-                    prepared_transcription[-1] = current_phoneme + 'l'
-                else:
-                    conj = conjugate(previous_phoneme, current_phoneme)
-                    if len(conj) > 0:
-                        #  3rd case: S SH -> SHl
-                        prepared_transcription[-1] = conj
-                    else:
-                        prepared_transcription.append(current_phoneme)
-                previous_phoneme = prepared_transcription[-1]
-        else:
-            for current_phoneme in source_transcription:
-                if equal(previous_phoneme, current_phoneme):
-                    #  1st case: S0 S0 -> S0l
-                    prepared_transcription[-1] = current_phoneme + 'l'
-                elif equal_almost(previous_phoneme, current_phoneme):
-                    #  2nd case: S S0 -> S0l
-                    prepared_transcription[-1] = current_phoneme + 'l'
-                else:
-                    prepared_transcription.append(current_phoneme)
-                previous_phoneme = prepared_transcription[-1]
-        return prepared_transcription
-
-    def __remove_long_phonemes(self, source_transcription: list) -> list:
-
-        def postprocess_phoneme(src):
-            if (len(src) > 1) and (src.endswith('l')):
-                return src[:-1]
-            return src
-
-        n = len(source_transcription)
-        if n == 0:
-            return []
-        new_transcription = [postprocess_phoneme(source_transcription[0])]
-        for idx in range(1, n):
-            new_phoneme = postprocess_phoneme(source_transcription[idx])
-            if new_phoneme != new_transcription[-1]:
-                new_transcription.append(new_phoneme)
+            return _CONJUGATED_PHONEMES.get((previous_phoneme_, current_phoneme_), '')
+        return ''
+
+    def __compile_merge_tables(self):
+        '''
+        Таблицы слияния для всех пар фонем: номер фонемы, заменяющей
+        предыдущую, или -1, если текущая фонема просто добавляется.
+        Текущей может быть только фонема без признака долготы, а предыдущей -
+        также и результат слияния.
+        '''
+        base_phonemes = set(self.phoneme_classes)
+        for forms in self.vocal_forms + self.consonant_forms:
+            if forms is not None:
+                base_phonemes |= set(filter(lambda it: it is not None, forms))
+        base_phonemes = sorted(filter(lambda it: not it.endswith('l'), base_phonemes))
+        phoneme_names = base_phonemes + [phoneme + 'l' for phoneme in base_phonemes]
+        phoneme_ids = {phoneme: phoneme_id for phoneme_id, phoneme in enumerate(phoneme_names)}
+        merge_tables = {True: [], False: []}
+        for full in (True, False):
+            for previous_phoneme in phoneme_names:
+                merge_row = list()
+                for current_phoneme in base_phonemes:
+                    merged = self.__merge_phonemes(previous_phoneme, current_phoneme, full)
+                    assert (len(merged) == 0) or (merged in phoneme_ids), f'`{merged}` is unknown phoneme!'
+                    merge_row.append(phoneme_ids[merged] if len(merged) > 0 else -1)
+                merge_tables[full].append(merge_row)
+        short_ids = list(range(len(base_phonemes))) * 2
+        return phoneme_names, {phoneme: phoneme_ids[phoneme] for phoneme in base_phonemes}, merge_tables, short_ids
+
+    def __postprocess_transcription(self, source_transcription: list, full: bool=True) -> list:
+        '''
+        Слияние повторяющихся и сопряжённых фонем (S S0 -> S0l, T S -> TS)
+        и удаление признака долготы за один проход по транскрипции.
+        '''
+        phoneme_ids = self.__merge_phoneme_ids
+        if not all(map(lambda it: it in phoneme_ids, source_transcription)):
+            return self.__postprocess_unknown_transcription(source_transcription, full)
+        merge_table = self.__merge_tables[full]
+        short_ids = self.__short_phoneme_ids
+        phoneme_names = self.__merge_phoneme_names
+        new_transcription = list()
+        previous_id = -1
+        last_short_id = -1
+        for phoneme in source_transcription:
+            current_id = phoneme_ids[phoneme]
+            if previous_id >= 0:
+                merged_id = merge_table[previous_id][current_id]
+                if merged_id >= 0:
+                    previous_id = merged_id
+                    continue
+                # предыдущая фонема больше не изменится
+                short_id = short_ids[previous_id]
+                if short_id != last_short_id:
+                    new_transcription.append(phoneme_names[short_id])
+                    last_short_id = short_id
+            previous_id = current_id
+        if previous_id >= 0:
+            short_id = short_ids[previous_id]
+            if short_id != last_short_id:
+                new_transcription.append(phoneme_names[short_id])
         return list(filter(lambda it: len(it) > 0, new_transcription))
 
+    def __postprocess_unknown_transcription(self, source_transcription: list, full: bool) -> list:
+        prepared_transcription = list()
+        for current_phoneme in source_transcription:
+            merged = self.__merge_phonemes(prepared_transcription[-1], current_phoneme, full) \
+                if len(prepared_transcription) > 0 else ''
+            if len(merged) > 0:
+                prepared_transcription[-1] = merged
+            else:
+                prepared_transcription.append(current_phoneme)
+        new_transcription = list()
+        for phoneme in prepared_transcription:
+            if (len(phoneme) > 1) and phoneme.endswith('l'):
+                phoneme = phoneme[:-1]
+            if (len(new_transcription) == 0) or (phoneme != new_transcription[-1]):
+                new_transcription.append(phoneme)
+        return list(filter(lambda it: len(it) > 0, new_transcription))
@@ -0,0 +1,191 @@
+from argparse import ArgumentParser
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import warnings
+
+import dawg
+
+
+SNAPSHOT_MAGIC = b'RUG2PLEX'
+SNAPSHOT_FORMAT_VERSION = 1
+
+# magic, format version, SHA-256 of everything after the header, size of the section index
+_SNAPSHOT_HEADER = struct.Struct('<8sI32sI')
+
+_loaded_snapshots = dict()
+
+
+def get_default_snapshot_name() -> str:
+    return os.path.join(os.path.dirname(__file__), 'data', 'lexicon.snapshot')
+
+
+def get_lexicon_source_names() -> dict:
+    data_dir = os.path.join(os.path.dirname(__file__), 'data')
+    return {
+        'homographs': os.path.join(data_dir, 'homographs.json'),
+        'simple_words': os.path.join(data_dir, 'simple_words.dawg'),
+        'function_words': os.path.join(data_dir, 'Function_words.json'),
+        'exclusions': os.path.join(data_dir, 'Phonetic_Exclusions.txt')
+    }
+
+
+def describe_source_file(file_name: str) -> tuple:
+    file_stat = os.stat(file_name)
+    return file_stat.st_size, int(file_stat.st_mtime)
+
+
+class LexiconSnapshot:
+    '''
+    Предварительно проверенные словари Accentor-а и Grapheme2Phoneme,
+    сохранённые в один бинарный файл и загружаемые через mmap
+    без повторной проверки каждой записи.
+    '''
+    def __init__(self, file_name: str=None):
+        self.file_name = os.path.normpath(get_default_snapshot_name() if file_name is None else file_name)
+        error_message = f'File `{self.file_name}` is not a correct lexicon snapshot!'
+        self.__sections = dict()
+        with open(self.file_name, mode='rb') as fp:
+            self.__buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.__buffer) < _SNAPSHOT_HEADER.size:
+            raise ValueError(error_message)
+        magic, format_version, checksum, index_size = _SNAPSHOT_HEADER.unpack_from(self.__buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(error_message)
+        if format_version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(error_message + f' Format version {format_version} is not supported.')
+        body = memoryview(self.__buffer)[_SNAPSHOT_HEADER.size:]
+        try:
+            if hashlib.sha256(body).digest() != checksum:
+                raise ValueError(error_message + ' Checksum is wrong.')
+            index = marshal.loads(body[:index_size])
+        finally:
+            body.release()
+        self.__version = checksum.hex()
+        self.__sources = index['sources']
+        self.__offsets = index['sections']
+        self.__data_start = _SNAPSHOT_HEADER.size + index_size
+
+    def __del__(self):
+        if hasattr(self, '_LexiconSnapshot__buffer'):
+            self.__buffer.close()
+
+    @property
+    def version(self) -> str:
+        return self.__version
+
+    @property
+    def sources(self) -> dict:
+        return self.__sources
+
+    def is_fresh(self) -> bool:
+        source_names = get_lexicon_source_names()
+        for section_name, description in self.__sources.items():
+            source_name = source_names[section_name]
+            if os.path.isfile(source_name) and (describe_source_file(source_name) != tuple(description)):
+                return False
+        return True
+
+    @property
+    def simple_words_dawg(self) -> dawg.IntDAWG:
+        if 'simple_words' not in self.__sections:
+            self.__sections['simple_words'] = dawg.IntDAWG().frombytes(self.__get_section_bytes('simple_words'))
+        return self.__sections['simple_words']
+
+    @property
+    def homographs(self) -> dict:
+        return self.__get_marshaled_section('homographs')
+
+    @property
+    def function_words(self) -> list:
+        return self.__get_marshaled_section('function_words')
+
+    @property
+    def exclusions(self) -> dict:
+        return self.__get_marshaled_section('exclusions')
+
+    def __get_section_bytes(self, section_name: str) -> bytes:
+        offset, size = self.__offsets[section_name]
+        start = self.__data_start + offset
+        return self.__buffer[start:(start + size)]
+
+    def __get_marshaled_section(self, section_name: str):
+        if section_name not in self.__sections:
+            self.__sections[section_name] = marshal.loads(self.__get_section_bytes(section_name))
+        return self.__sections[section_name]
+
+
+def get_lexicon_snapshot(file_name: str=None):
+    '''
+    Загрузка снимка словарей (один раз на процесс). Возвращает None,
+    если снимок не построен, повреждён или устарел по отношению
+    к исходным файлам словарей.
+    '''
+    prepared_name = os.path.normpath(get_default_snapshot_name() if file_name is None else file_name)
+    if prepared_name in _loaded_snapshots:
+        return _loaded_snapshots[prepared_name]
+    snapshot = None
+    if os.path.isfile(prepared_name):
+        try:
+            snapshot = LexiconSnapshot(prepared_name)
+        except (ValueError, EOFError, KeyError, TypeError) as err:
+            warnings.warn(f'{err} The source dictionaries will be used instead.')
+        else:
+            if not snapshot.is_fresh():
+                warnings.warn(f'File `{prepared_name}` is outdated, it should be rebuilt! '
+                              f'The source dictionaries will be used instead.')
+                snapshot = None
+    _loaded_snapshots[prepared_name] = snapshot
+    return snapshot
+
+
+def build_lexicon_snapshot(file_name: str=None) -> str:
+    from russian_g2p.Accentor import Accentor
+    from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+
+    prepared_name = os.path.normpath(get_default_snapshot_name() if file_name is None else file_name)
+    source_names = get_lexicon_source_names()
+    sources = {section_name: describe_source_file(source_name) for section_name, source_name in source_names.items()}
+    # all entries are validated here by the usual loaders of the Accentor and the Grapheme2Phoneme
+    accentor = Accentor(use_snapshot=False)
+    g2p = Grapheme2Phoneme(use_snapshot=False)
+    sections_data = [
+        ('simple_words', accentor.simple_words_dawg.tobytes()),
+        ('homographs', marshal.dumps(accentor.homographs)),
+        ('function_words', marshal.dumps(accentor.function_words)),
+        ('exclusions', marshal.dumps(g2p.exclusions))
+    ]
+    sections = dict()
+    offset = 0
+    for section_name, section_data in sections_data:
+        sections[section_name] = (offset, len(section_data))
+        offset += len(section_data)
+    index = marshal.dumps({'sources': sources, 'sections': sections})
+    hasher = hashlib.sha256(index)
+    for _, section_data in sections_data:
+        hasher.update(section_data)
+    tmp_name = prepared_name + '.tmp'
+    with open(tmp_name, mode='wb') as fp:
+        fp.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, hasher.digest(), len(index)))
+        fp.write(index)
+        for _, section_data in sections_data:
+            fp.write(section_data)
+    os.replace(tmp_name, prepared_name)
+    _loaded_snapshots.pop(prepared_name, None)
+    return prepared_name
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-d', '--dst', dest='snapshot_name', type=str, required=False, default=None,
+                        help='Destination file of the lexicon snapshot (by default, it is `data/lexicon.snapshot` '
+                             'inside the package).')
+    args = parser.parse_args()
+    snapshot_name = build_lexicon_snapshot(args.snapshot_name)
+    print(f'Lexicon snapshot `{snapshot_name}` (version {LexiconSnapshot(snapshot_name).version}) has been built.')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,143 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
 from re import sub
 
-from rnnmorph.predictor import RNNMorphPredictor
 
+# морфотег слов из предложений, которые не отправлялись на морфологический анализ
+PLACEHOLDER_TAG = 'X _'
 
-class Preprocessor():
 
-    def __init__(self, batch_size=1):
-        self.batch_size = batch_size
+class Tagger(ABC):
+    '''
+    Интерфейс морфологического анализатора. Метод tag_sentences получает список
+    предложений (списков слов) и возвращает для каждого из них список пар
+    [слово, морфотег], где морфотег - это часть речи и грамматические признаки
+    в формате Universal Dependencies, например 'NOUN Case=Nom|Gender=Masc|Number=Sing'.
+    '''
+
+    @abstractmethod
+    def tag_sentences(self, sentences: list, batch_size: int) -> list:
+        pass
+
+
+class RNNMorphTagger(Tagger):
+    '''
+    Контекстный морфологический анализ нейросетью RNNMorph.
+    '''
+
+    def __init__(self):
+        from rnnmorph.predictor import RNNMorphPredictor
         self.predictor = RNNMorphPredictor(language="ru")
 
     def __del__(self):
         if hasattr(self, 'predictor'):
             del self.predictor
 
+    def tag_sentences(self, sentences: list, batch_size: int) -> list:
+        return [[[word.word, word.pos + ' ' + word.tag] for word in forms]
+                for forms in self.predictor.predict_sentences(sentences, batch_size=batch_size)]
+
+
+class PymorphyTagger(Tagger):
+    '''
+    Быстрый бесконтекстный морфологический анализ: каждому слову назначается самый
+    вероятный разбор pymorphy3 (или pymorphy2), переведённый из OpenCorpora в Universal Dependencies
+    (как в create_phonetic_dict.py). Омографы, различающиеся только контекстом,
+    размечаются хуже, чем RNNMorph.
+    '''
+
+    def __init__(self, cache_size: int=100000):
+        from russian_tagsets import converters
+        self.morph = create_morph_analyzer()
+        self.to_ud20 = converters.converter('opencorpora-int', 'ud20')
+        self.tag_word = lru_cache(maxsize=cache_size)(self.__tag_word)
+
+    def __tag_word(self, word: str) -> str:
+        pos, tag = self.to_ud20(str(self.morph.parse(word)[0].tag)).split(' ', 1)
+        # RNNMorph и словарь омографов используют часть речи CONJ из первой версии Universal Dependencies
+        if pos in {'CCONJ', 'SCONJ'}:
+            pos = 'CONJ'
+        return pos + ' ' + tag
+
+    def tag_sentences(self, sentences: list, batch_size: int) -> list:
+        return [[[word, self.tag_word(word)] for word in cur_sentence] for cur_sentence in sentences]
+
+
+def create_morph_analyzer():
+    '''
+    Анализатор pymorphy3 (поддерживаемое продолжение pymorphy2) или, если он
+    не установлен, pymorphy2. pymorphy2 импортируется и в Python 3.11, но его
+    анализатор там не создаётся, поэтому ошибка создания превращается в
+    ImportError с понятным сообщением.
+    '''
+    try:
+        import pymorphy3
+    except ImportError:
+        pymorphy3 = None
+    if pymorphy3 is not None:
+        return pymorphy3.MorphAnalyzer()
+    import pymorphy2
+    try:
+        return pymorphy2.MorphAnalyzer()
+    except AttributeError as err:
+        raise ImportError(f'pymorphy2 does not work with this version of Python ({err}). '
+                          f'Please install pymorphy3.') from err
+
+
+# морфологические анализаторы, которые можно выбрать по имени
+TAGGERS = {'rnnmorph': RNNMorphTagger, 'pymorphy2': PymorphyTagger}
+
+
+def get_tagger(tagger) -> Tagger:
+    if isinstance(tagger, Tagger):
+        return tagger
+    assert tagger in TAGGERS, f'`{tagger}` is unknown tagger! Available taggers: {sorted(TAGGERS.keys())}.'
+    return TAGGERS[tagger]()
+
+
+class Preprocessor():
+
+    def __init__(self, batch_size=1, tokens_per_batch=2048, tagger='rnnmorph'):
+        assert batch_size > 0, f'{batch_size} is wrong size of the batch!'
+        assert (tokens_per_batch is None) or (tokens_per_batch > 0), \
+            f'{tokens_per_batch} is wrong number of tokens per batch!'
+        self.batch_size = batch_size
+        self.tokens_per_batch = tokens_per_batch
+        self.tagged_sentences = 0
+        self.skipped_sentences = 0
+        self.tagger = get_tagger(tagger)
+
+    def __del__(self):
+        if hasattr(self, 'tagger'):
+            del self.tagger
+
     def __copy__(self):
         cls = self.__class__
         result = cls.__new__(cls)
-        result.predictor = self.predictor
+        result.batch_size = self.batch_size
+        result.tokens_per_batch = self.tokens_per_batch
+        result.tagged_sentences = 0
+        result.skipped_sentences = 0
+        result.tagger = self.tagger
         return result
 
     def __deepcopy__(self, memodict={}):
         cls = self.__class__
         result = cls.__new__(cls)
-        result.predictor = self.predictor
+        result.batch_size = self.batch_size
+        result.tokens_per_batch = self.tokens_per_batch
+        result.tagged_sentences = 0
+        result.skipped_sentences = 0
+        result.tagger = self.tagger
         return result
 
-    def gettags(self, texts):
+    def gettags(self, texts, needs_morphotag=None):
+        '''
+        Морфологическая разметка текстов. Если задана функция needs_morphotag
+        (слово -> bool), то на анализ отправляются только предложения, в которых
+        есть хотя бы одно слово, нуждающееся в морфотеге (например, омограф),
+        а слова остальных предложений получают морфотег PLACEHOLDER_TAG.
+        '''
         if not isinstance(texts, list):
             raise ValueError(f'Expected `{type([1, 2])}`, but got `{type(texts)}`.')
         if len(texts) == 0:
@@ -43,10 +155,18 @@ class Preprocessor():
                 all_phonetic_phrases.append(list_of_phonetic_phrases)
             else:
                 all_phonetic_phrases.append([])
-        if len(all_phrases_for_rnnmorph) > 0:
-            all_forms = self.predictor.predict_sentences(all_phrases_for_rnnmorph, batch_size=self.batch_size)
-        else:
-            all_forms = []
+        all_words_and_tags_for_phrases = [None for _ in range(len(all_phrases_for_rnnmorph))]
+        phrases_for_tagging = []
+        for phrase_ind, cur_phrase in enumerate(all_phrases_for_rnnmorph):
+            if (needs_morphotag is None) or any(map(needs_morphotag, cur_phrase)):
+                phrases_for_tagging.append(phrase_ind)
+            else:
+                all_words_and_tags_for_phrases[phrase_ind] = [[word, PLACEHOLDER_TAG] for word in cur_phrase]
+        self.tagged_sentences += len(phrases_for_tagging)
+        self.skipped_sentences += len(all_phrases_for_rnnmorph) - len(phrases_for_tagging)
+        all_tagged = self.predict_sentences([all_phrases_for_rnnmorph[it] for it in phrases_for_tagging])
+        for phrase_ind, words_and_tags in zip(phrases_for_tagging, all_tagged):
+            all_words_and_tags_for_phrases[phrase_ind] = words_and_tags
         all_words_and_tags = []
         phrase_ind = 0
         for cur in all_phonetic_phrases:
@@ -56,19 +176,49 @@ class Preprocessor():
                 for phonetic_phrase in cur:
                     if len(phonetic_phrase) > 0:
                         n = len(phonetic_phrase.split(' '))
-                        analysis = all_forms[phrase_ind][token_ind:(token_ind + n)]
-                        for word in analysis:
-                            word_and_tag = []
-                            word_and_tag.append(word.word)
-                            word_and_tag.append(word.pos + ' ' + word.tag)
-                            words_and_tags.append(word_and_tag)
+                        for word_and_tag in all_words_and_tags_for_phrases[phrase_ind][token_ind:(token_ind + n)]:
+                            words_and_tags.append(list(word_and_tag))
                         words_and_tags.append(['<sil>', 'SIL _'])
                         token_ind += n
                 phrase_ind += 1
             all_words_and_tags.append(words_and_tags)
         return all_words_and_tags
 
-    def preprocessing(self, texts):
+    def predict_sentences(self, sentences: list) -> list:
+        '''
+        Морфологический анализ предложений. Одинаковые предложения
+        анализируются один раз, а остальные упорядочиваются по длине, чтобы
+        выравнивание внутри пакета было минимальным. В пакет попадает не больше
+        batch_size предложений и не больше tokens_per_batch слов с учётом
+        выравнивания. Результаты (списки пар [слово, морфотег]) возвращаются в
+        исходном порядке предложений.
+        '''
+        unique_sentences = dict()
+        sentence_indices = []
+        for cur_sentence in sentences:
+            sentence_indices.append(unique_sentences.setdefault(tuple(cur_sentence), len(unique_sentences)))
+        unique_sentences = list(unique_sentences.keys())
+        sorted_indices = sorted(range(len(unique_sentences)), key=lambda it: len(unique_sentences[it]))
+        unique_tags = [None for _ in range(len(unique_sentences))]
+        batch_start = 0
+        while batch_start < len(sorted_indices):
+            batch_end = batch_start + 1
+            while (batch_end < len(sorted_indices)) and ((batch_end - batch_start) < self.batch_size):
+                # предложения упорядочены по длине, поэтому последнее из них - самое длинное в пакете
+                if (self.tokens_per_batch is not None) and \
+                        ((batch_end - batch_start + 1) * len(unique_sentences[sorted_indices[batch_end]]) >
+                         self.tokens_per_batch):
+                    break
+                batch_end += 1
+            batch_indices = sorted_indices[batch_start:batch_end]
+            batch_tags = self.tagger.tag_sentences([list(unique_sentences[it]) for it in batch_indices],
+                                                   batch_size=len(batch_indices))
+            for sentence_idx, sentence_tags in zip(batch_indices, batch_tags):
+                unique_tags[sentence_idx] = sentence_tags
+            batch_start = batch_end
+        return [unique_tags[it] for it in sentence_indices]
+
+    def preprocessing(self, texts, needs_morphotag=None):
 
         def prepare(src):
             dst = sub('[\.\,\?\!\(\);:]+', ' <sil>', src.lower())
@@ -77,5 +227,5 @@ class Preprocessor():
             dst = sub('^\s|(?<!\w)[\\\/@#~¬`£€\$%\^\&\*–_=+\'\"\|«»–-]+', '', dst)
             return dst.strip().split(' ')
 
-        words_and_tags = self.gettags([prepare(cur) for cur in texts])
+        words_and_tags = self.gettags([prepare(cur) for cur in texts], needs_morphotag)
         return words_and_tags
\ No newline at end of file
@@ -0,0 +1,310 @@
+from argparse import ArgumentParser
+import codecs
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import warnings
+
+import dawg
+
+from russian_g2p.LexiconSnapshot import describe_source_file, get_lexicon_source_names
+
+
+LEXICON_MAGIC = b'RUG2PPRN'
+LEXICON_FORMAT_VERSION = 1
+
+# magic, format version, SHA-256 of everything after the header, size of the section index
+_LEXICON_HEADER = struct.Struct('<8sI32sI')
+
+# единицы словаря dawgdic, в котором хранится IntDAWG
+_DAWG_UNIT = struct.Struct('<I')
+
+_loaded_lexicons = dict()
+
+
+def get_default_lexicon_name(users_mode: str='Modern') -> str:
+    return os.path.join(os.path.dirname(__file__), 'data', f'pronunciations_{users_mode}.lexicon')
+
+
+def get_pronunciation_source_names() -> dict:
+    source_names = get_lexicon_source_names()
+    package_dir = os.path.dirname(__file__)
+    source_names['grapheme2phoneme'] = os.path.join(package_dir, 'Grapheme2Phoneme.py')
+    source_names['rules_for_graphemes'] = os.path.join(package_dir, 'RulesForGraphemes.py')
+    return source_names
+
+
+def iterate_int_dawg(int_dawg: dawg.IntDAWG):
+    '''
+    Перебор всех пар (ключ, значение) словаря IntDAWG. В самой библиотеке
+    dawg для IntDAWG перебор ключей не реализован, поэтому обходится граф
+    словаря dawgdic, сохранённый в tobytes(): одна ячейка на узел, номер
+    потомка равен номеру ячейки, xor-нутому со смещением узла и меткой дуги.
+    '''
+    data = int_dawg.tobytes()
+    n_units = _DAWG_UNIT.unpack_from(data, 0)[0]
+    units = struct.unpack_from(f'<{n_units}I', data, _DAWG_UNIT.size)
+    labels = sorted(set(unit & 0xFF for unit in units if not (unit & 0x80000000)) - {0})
+    children_of_nodes = dict()
+    stack = [(0, b'')]
+    while len(stack) > 0:
+        node, key = stack.pop()
+        if node not in children_of_nodes:
+            unit = units[node]
+            base = node ^ ((unit >> 10) << ((unit & (1 << 9)) >> 6))
+            children = [(bytes((label,)), base ^ label) for label in labels
+                        if ((base ^ label) < n_units) and ((units[base ^ label] & 0x800000FF) == label)]
+            value = (units[base] & 0x7FFFFFFF) if (unit >> 8) & 1 else None
+            children_of_nodes[node] = (value, children)
+        value, children = children_of_nodes[node]
+        if value is not None:
+            yield key.decode('utf-8'), value
+        for label, child in children:
+            stack.append((child, key + label))
+
+
+class PronunciationLexicon:
+    '''
+    Готовые транскрипции всех слов словаря ударений, словаря исключений
+    и списка служебных слов (в виде номеров фонем), построенные для одного режима. Для каждого слова
+    хранятся две транскрипции: перед звонким шумным согласным и перед любой
+    другой фонемой, так как от следующей фонемы зависит только звонкость
+    согласных на конце слова.
+    '''
+    def __init__(self, file_name: str):
+        self.file_name = os.path.normpath(file_name)
+        error_message = f'File `{self.file_name}` is not a correct pronunciation lexicon!'
+        self.__offsets = None
+        self.__phoneme_ids = None
+        with open(self.file_name, mode='rb') as fp:
+            self.__buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.__buffer) < _LEXICON_HEADER.size:
+            raise ValueError(error_message)
+        magic, format_version, checksum, index_size = _LEXICON_HEADER.unpack_from(self.__buffer, 0)
+        if magic != LEXICON_MAGIC:
+            raise ValueError(error_message)
+        if format_version != LEXICON_FORMAT_VERSION:
+            raise ValueError(error_message + f' Format version {format_version} is not supported.')
+        body = memoryview(self.__buffer)[_LEXICON_HEADER.size:]
+        try:
+            if hashlib.sha256(body).digest() != checksum:
+                raise ValueError(error_message + ' Checksum is wrong.')
+            index = marshal.loads(body[:index_size])
+        finally:
+            body.release()
+        self.__version = checksum.hex()
+        self.__mode_name = index['mode']
+        self.__rules = index['rules']
+        self.__sources = index['sources']
+        self.__phoneme_symbols = index['phoneme_symbols']
+        data_start = _LEXICON_HEADER.size + index_size
+        sections = dict()
+        for section_name, (offset, size) in index['sections'].items():
+            sections[section_name] = (data_start + offset, data_start + offset + size)
+        start, end = sections['words']
+        self.__words = dawg.IntDAWG().frombytes(self.__buffer[start:end])
+        start, end = sections['offsets']
+        self.__offsets = memoryview(self.__buffer)[start:end].cast('I')
+        start, end = sections['phoneme_ids']
+        self.__phoneme_ids = memoryview(self.__buffer)[start:end].cast('H')
+
+    def __del__(self):
+        for cur_view in (getattr(self, '_PronunciationLexicon__offsets', None),
+                         getattr(self, '_PronunciationLexicon__phoneme_ids', None)):
+            if cur_view is not None:
+                cur_view.release()
+        if hasattr(self, '_PronunciationLexicon__buffer'):
+            self.__buffer.close()
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.__words
+
+    def __len__(self) -> int:
+        return len(self.__offsets) - 1
+
+    @property
+    def version(self) -> str:
+        return self.__version
+
+    @property
+    def mode_name(self) -> str:
+        return self.__mode_name
+
+    @property
+    def sources(self) -> dict:
+        return self.__sources
+
+    @property
+    def phoneme_symbols(self) -> list:
+        return list(self.__phoneme_symbols)
+
+    def is_fresh(self, compiled_mode) -> bool:
+        if compiled_mode.fingerprint != self.__rules:
+            return False
+        source_names = get_pronunciation_source_names()
+        for source_name, description in self.__sources.items():
+            if os.path.isfile(source_names[source_name]) and \
+                    (describe_source_file(source_names[source_name]) != tuple(description)):
+                return False
+        return True
+
+    def get_transcription(self, word: str, before_voiced_strong: bool=False):
+        '''
+        Транскрипция слова (в нижнем регистре, со знаками ударения) или None,
+        если слова нет в словаре. Флаг before_voiced_strong означает, что
+        за словом следует звонкий шумный согласный.
+        '''
+        value = self.__words.get(word)
+        if value is None:
+            return None
+        record = (value >> 1) + ((value & 1) if before_voiced_strong else 0)
+        phoneme_symbols = self.__phoneme_symbols
+        return [phoneme_symbols[it] for it in self.__phoneme_ids[self.__offsets[record]:self.__offsets[record + 1]]]
+
+
+def get_pronunciation_lexicon(compiled_mode, file_name: str=None):
+    '''
+    Загрузка словаря транскрипций для режима (один раз на процесс).
+    Возвращает None, если словарь не построен, повреждён или устарел
+    по отношению к словарям и правилам режима.
+    '''
+    prepared_name = os.path.normpath(get_default_lexicon_name(compiled_mode.name) if file_name is None else file_name)
+    cache_key = (prepared_name, compiled_mode.name)
+    if cache_key in _loaded_lexicons:
+        lexicon = _loaded_lexicons[cache_key]
+        # режим с тем же именем мог быть зарегистрирован заново с другими правилами
+        if (lexicon is None) or lexicon.is_fresh(compiled_mode):
+            return lexicon
+    lexicon = None
+    if os.path.isfile(prepared_name):
+        try:
+            lexicon = PronunciationLexicon(prepared_name)
+        except (ValueError, EOFError, KeyError, TypeError) as err:
+            warnings.warn(f'{err} The rules will be used instead.')
+        else:
+            if lexicon.mode_name != compiled_mode.name:
+                warnings.warn(f'File `{prepared_name}` is built for the mode `{lexicon.mode_name}` instead of '
+                              f'`{compiled_mode.name}`! The rules will be used instead.')
+                lexicon = None
+            elif not lexicon.is_fresh(compiled_mode):
+                warnings.warn(f'File `{prepared_name}` is outdated, it should be rebuilt! '
+                              f'The rules will be used instead.')
+                lexicon = None
+    _loaded_lexicons[cache_key] = lexicon
+    return lexicon
+
+
+def build_pronunciation_lexicon(users_mode: str='Modern', file_name: str=None, words: list=None) -> str:
+    '''
+    Построение словаря транскрипций для режима. По умолчанию в словарь
+    попадают все слова словаря ударений (во всех вариантах ударения
+    омографов), словаря исключений и списка служебных слов, но можно
+    передать и собственный список слов с ударениями (words).
+    '''
+    from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+    from russian_g2p.RulesForGraphemes import PHONEME_VOICED_STRONG, PHONEME_VOWEL
+
+    # слова без ударения и некорректные слова в словарь не попадают: для них
+    # word_to_phonemes должен по-прежнему выдавать предупреждение или ошибку
+    g2p = Grapheme2Phoneme(users_mode, exception_for_nonaccented=True, use_snapshot=False, cache_size=0,
+                           use_pronunciations=False)
+    compiled_mode = g2p.compiled_mode
+    prepared_name = os.path.normpath(get_default_lexicon_name(compiled_mode.name) if file_name is None
+                                     else file_name)
+    source_names = get_pronunciation_source_names()
+    sources = {source_name: describe_source_file(source_names[source_name]) for source_name in source_names}
+    if words is None:
+        source_words = set(g2p.exclusions.keys())
+        simple_words_dawg = dawg.IntDAWG()
+        simple_words_dawg.load(source_names['simple_words'])
+        for cur_word, accent_pos in iterate_int_dawg(simple_words_dawg):
+            source_words.add(cur_word[:accent_pos] + '+' + cur_word[accent_pos:])
+        with codecs.open(source_names['homographs'], mode='r', encoding='utf-8', errors='ignore') as fp:
+            homographs = json.load(fp)
+        for accent_variants in homographs.values():
+            source_words |= set(map(lambda it: it.lower(), accent_variants.values()))
+        with codecs.open(source_names['function_words'], mode='r', encoding='utf-8', errors='ignore') as fp:
+            source_words |= set(map(lambda it: it.lower(), json.load(fp)))
+    else:
+        source_words = set(map(lambda it: it.lower(), words))
+    # во фразе слово передаётся в word_to_phonemes уже в подготовленном виде
+    lexicon_words = set()
+    for cur_word in source_words:
+        lexicon_words.add(cur_word)
+        lexicon_words |= set(g2p.get_phrase_forms(cur_word))
+    phoneme_ids = dict(map(lambda it: (it[1], it[0]), enumerate(g2p.phoneme_symbols)))
+    voiced_strong_phoneme = min(filter(lambda it: g2p.phoneme_classes[it] == PHONEME_VOICED_STRONG,
+                                       g2p.phoneme_classes))
+    words_with_records = list()
+    offsets = [0]
+    all_phoneme_ids = list()
+    for cur_word in sorted(lexicon_words):
+        try:
+            transcription = g2p.word_to_phonemes(cur_word, 'sil')
+        except (AssertionError, ValueError):
+            continue
+        variants = [transcription]
+        if g2p.phoneme_classes.get(transcription[-1]) != PHONEME_VOWEL:
+            transcription_before_voiced = g2p.word_to_phonemes(cur_word, voiced_strong_phoneme)
+            if transcription_before_voiced != transcription:
+                variants.append(transcription_before_voiced)
+        words_with_records.append((cur_word, 2 * (len(offsets) - 1) + len(variants) - 1))
+        for cur_variant in variants:
+            all_phoneme_ids += map(phoneme_ids.__getitem__, cur_variant)
+            offsets.append(len(all_phoneme_ids))
+    sections_data = [
+        ('words', dawg.IntDAWG(words_with_records).tobytes()),
+        ('offsets', struct.pack(f'<{len(offsets)}I', *offsets)),
+        ('phoneme_ids', struct.pack(f'<{len(all_phoneme_ids)}H', *all_phoneme_ids))
+    ]
+    sections = dict()
+    offset = 0
+    for section_name, section_data in sections_data:
+        # номера в разделах выравниваются по четырём байтам
+        offset += (-offset) % 4
+        sections[section_name] = (offset, len(section_data))
+        offset += len(section_data)
+    index = marshal.dumps({'mode': compiled_mode.name, 'rules': compiled_mode.fingerprint, 'sources': sources,
+                           'phoneme_symbols': g2p.phoneme_symbols, 'sections': sections})
+    index += b'\0' * ((-(_LEXICON_HEADER.size + len(index))) % 4)
+    body = bytearray(index)
+    for section_name, section_data in sections_data:
+        body += b'\0' * (len(index) + sections[section_name][0] - len(body))
+        body += section_data
+    tmp_name = prepared_name + '.tmp'
+    with open(tmp_name, mode='wb') as fp:
+        fp.write(_LEXICON_HEADER.pack(LEXICON_MAGIC, LEXICON_FORMAT_VERSION, hashlib.sha256(body).digest(),
+                                      len(index)))
+        fp.write(body)
+    os.replace(tmp_name, prepared_name)
+    for cache_key in list(filter(lambda it: it[0] == prepared_name, _loaded_lexicons)):
+        del _loaded_lexicons[cache_key]
+    return prepared_name
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-m', '--mode', dest='users_mode', type=str, required=False, default='Modern',
+                        help='Transcription mode (`Modern` or `Classic`).')
+    parser.add_argument('-d', '--dst', dest='lexicon_name', type=str, required=False, default=None,
+                        help='Destination file of the pronunciation lexicon (by default, it is '
+                             '`data/pronunciations_<mode>.lexicon` inside the package).')
+    parser.add_argument('-w', '--words', dest='words_name', type=str, required=False, default=None,
+                        help='List of accented words (one word per line) which will be included in the lexicon '
+                             'instead of the whole known lexicon.')
+    args = parser.parse_args()
+    words = None
+    if args.words_name is not None:
+        with codecs.open(args.words_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+            words = list(filter(lambda it: len(it) > 0, map(lambda it: it.strip(), fp)))
+    lexicon_name = build_pronunciation_lexicon(args.users_mode, args.lexicon_name, words)
+    lexicon = PronunciationLexicon(lexicon_name)
+    print(f'Pronunciation lexicon `{lexicon_name}` (mode {lexicon.mode_name}, {len(lexicon)} transcriptions, '
+          f'version {lexicon.version}) has been built.')
+
+
+if __name__ == '__main__':
+    main()
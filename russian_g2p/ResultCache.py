@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from russian_g2p.LexiconSnapshot import describe_source_file
+from russian_g2p.PronunciationLexicon import get_pronunciation_source_names
+
+
+CACHE_FORMAT_VERSION = 1
+
+
+def get_dictionaries_version() -> str:
+    '''
+    Версия словарей и правил: хэш размеров и времени изменения исходных файлов,
+    от которых зависят транскрипции. Она меняется при любом изменении словарей.
+    '''
+    source_names = get_pronunciation_source_names()
+    package_dir = os.path.dirname(__file__)
+    for module_name in ('Accentor', 'Preprocessor', 'Transcription'):
+        source_names[module_name.lower()] = os.path.join(package_dir, module_name + '.py')
+    descriptions = sorted((source_name, describe_source_file(file_name))
+                          for source_name, file_name in source_names.items() if os.path.isfile(file_name))
+    return hashlib.sha256(repr((CACHE_FORMAT_VERSION, descriptions)).encode('utf-8')).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    # Preprocessor начинает с перевода текста в нижний регистр, поэтому регистр на результат не влияет
+    return text.lower()
+
+
+class ResultCache:
+    '''
+    Постоянный кэш транскрипций в базе SQLite. Ключ записи - SHA-256 от версии
+    (режима, словарей и настроек транскрипции) и нормализованного текста,
+    значение - последовательности фонем фраз текста в JSON. База работает в
+    режиме WAL, поэтому её могут одновременно использовать несколько процессов.
+    Если словари изменились, то при открытии кэша все записи удаляются.
+    '''
+
+    def __init__(self, file_name: str, version: str, dictionaries_version: str=None):
+        self.file_name = os.path.normpath(file_name)
+        self.version = version
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(self.file_name, timeout=60.0, check_same_thread=False,
+                                            isolation_level=None)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        with self.__connection:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, value TEXT)')
+            if dictionaries_version is not None:
+                row = self.__connection.execute("SELECT value FROM meta WHERE name = 'dictionaries'").fetchone()
+                if (row is None) or (row[0] != dictionaries_version):
+                    self.__connection.execute('DELETE FROM results')
+                    self.__connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dictionaries', ?)",
+                                              (dictionaries_version,))
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_ResultCache__connection', None) is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __len__(self):
+        with self.__lock:
+            return self.__connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def get_key(self, text: str) -> bytes:
+        return hashlib.sha256(f'{self.version}\n{normalize_text(text)}'.encode('utf-8')).digest()
+
+    def get_many(self, keys: list) -> dict:
+        '''
+        Поиск транскрипций по ключам. Возвращает словарь только для найденных ключей.
+        '''
+        found = dict()
+        unique_keys = list(set(keys))
+        # число параметров одного запроса SQLite ограничено
+        part_size = 500
+        with self.__lock:
+            for part_start in range(0, len(unique_keys), part_size):
+                part = unique_keys[part_start:(part_start + part_size)]
+                rows = self.__connection.execute(
+                    f'SELECT key, value FROM results WHERE key IN ({", ".join("?" * len(part))})', part
+                )
+                for key, value in rows:
+                    found[key] = json.loads(value)
+        return found
+
+    def put_many(self, items: dict):
+        if len(items) == 0:
+            return
+        with self.__lock, self.__connection:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            self.__connection.executemany(
+                'INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)',
+                [(key, json.dumps(value, ensure_ascii=False, separators=(',', ':'))) for key, value in items.items()]
+            )
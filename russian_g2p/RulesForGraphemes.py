@@ -1,100 +1,422 @@
-class RulesForGraphemes:
-    def __init__(self, users_mode: str='Modern'):
-        if users_mode == 'Classic':
-            from russian_g2p.modes.Classic import ClassicMode as UsersMode
-        else:
-            from russian_g2p.modes.Modern import ModernMode as UsersMode
+import codecs
+import hashlib
+import json
+from types import MappingProxyType
 
-        self.mode = UsersMode()
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-    def apply_rule_for_vocals(self, letters_list: list, cur_pos: int) -> list:
-        new_phonemes_list = list()
-        case = 0
-        if cur_pos == 0:
-            if letters_list[cur_pos] in self.mode.double_vocals:
-                new_phonemes_list.append('J0')
-            if cur_pos + 1 >= len(letters_list):
-                case = 1
-            else:
-                case = 2
-        elif letters_list[cur_pos - 1] in self.mode.hard_and_soft_signs:
-            if letters_list[cur_pos] in self.mode.gen_vocals_soft | {'о', 'о+'}:
-                new_phonemes_list.append('J0')
-            if cur_pos + 1 >= len(letters_list):
-                case = 1
+# классы букв
+LETTER_SIGN, LETTER_VOCAL, LETTER_SOFT, LETTER_HARD, LETTER_HARDSOFT, LETTER_OTHER = range(6)
+
+# классы фонем, следующих за согласным
+PHONEME_SIL, PHONEME_DEAF, PHONEME_VOICED_WEAK, PHONEME_VOICED_STRONG, PHONEME_VOWEL = range(5)
+
+# формы согласного: номер формы = 2 * номер звонкости (n, d, v) + мягкость
+CONSONANT_FORMS = ('n_hard', 'n_soft', 'd_hard', 'd_soft', 'v_hard', 'v_soft')
+VOICE_N, VOICE_D, VOICE_V = range(3)
+
+# звонкость последнего согласного слова и согласного внутри слова в зависимости от класса следующей фонемы
+END_VOICES = (VOICE_D, VOICE_D, VOICE_D, VOICE_V, VOICE_D)
+INNER_VOICES = (None, VOICE_D, VOICE_N, VOICE_V, VOICE_N)
+
+
+_mode_factories = dict()
+_compiled_modes = dict()
+
+
+class CompiledMode:
+    '''
+    Правила режима, скомпилированные в целочисленные таблицы: каждая буква
+    получает свой номер, а её класс, признаки и формы транскрипции хранятся
+    в кортежах, индексируемых этим номером. Таблицы режима строятся один раз
+    на процесс и используются всеми экземплярами RulesForGraphemes, поэтому
+    после построения они доступны только для чтения: словари обёрнуты в
+    MappingProxyType, списки преобразованы в кортежи, а присваивание атрибутов
+    запрещено.
+    '''
+    __slots__ = ('name', 'mode', 'letter_ids', 'letter_classes', 'double_vocal_flags', 'soft_vocal_flags',
+                 'vocal_after_sign_flags', 'vocal_forms', 'consonant_forms', 'rule_27_forms', 'phoneme_classes',
+                 '__batch_tables', '__fingerprint')
+
+    def __init__(self, mode, name: str='Modern'):
+        all_letters = sorted(mode.vocals | mode.consonants | mode.hard_and_soft_signs)
+        letter_classes = []
+        double_vocal_flags = []
+        soft_vocal_flags = []
+        vocal_after_sign_flags = []
+        vocal_forms = []
+        consonant_forms = []
+        rule_27_forms = []
+        vocals_after_sign = mode.gen_vocals_soft | {'о', 'о+'}
+        for letter in all_letters:
+            if letter in mode.hard_and_soft_signs:
+                letter_classes.append(LETTER_SIGN)
+            elif letter in mode.vocals:
+                letter_classes.append(LETTER_VOCAL)
+            elif letter in mode.soft_consonants:
+                letter_classes.append(LETTER_SOFT)
+            elif letter in mode.hard_consonants:
+                letter_classes.append(LETTER_HARD)
+            elif letter in mode.hardsoft_consonants:
+                letter_classes.append(LETTER_HARDSOFT)
             else:
-                case = 2
-        elif letters_list[cur_pos - 1] in self.mode.vocals:
-            if letters_list[cur_pos] in self.mode.double_vocals:
-                new_phonemes_list.append('J0')
-            if cur_pos + 1 >= len(letters_list):
-                case = 1
+                letter_classes.append(LETTER_OTHER)
+            double_vocal_flags.append(letter in mode.double_vocals)
+            soft_vocal_flags.append(letter in mode.gen_vocals_soft)
+            vocal_after_sign_flags.append(letter in vocals_after_sign)
+            if (letter in mode.vocals) and (letter in mode.TableG2P):
+                forms = mode.TableG2P[letter].forms
+                vocal_forms.append((None,) + tuple(forms['case' + str(case)] for case in range(1, 9)))
             else:
-                case = 2
-        elif letters_list[cur_pos - 1] in self.mode.soft_consonants:
-            if cur_pos + 1 >= len(letters_list):
-                case = 3
+                vocal_forms.append(None)
+            if (letter in mode.consonants) and (letter in mode.TableG2P):
+                forms = mode.TableG2P[letter].forms
+                consonant_forms.append(tuple(forms[case] for case in CONSONANT_FORMS))
+                rule_27 = dict()
+                for phoneme in mode.russian_phonemes_set:
+                    case = mode.rule_27([letter], phoneme, 0)
+                    if len(case) > 0:
+                        rule_27[phoneme] = CONSONANT_FORMS.index(case)
+                rule_27_forms.append(MappingProxyType(rule_27))
             else:
-                case = 4
-        elif letters_list[cur_pos - 1] in self.mode.hard_consonants:
-            if cur_pos + 1 >= len(letters_list):
-                case = 5
+                consonant_forms.append(None)
+                rule_27_forms.append(MappingProxyType(dict()))
+        phoneme_classes = {'sil': PHONEME_SIL}
+        for phoneme_class, phonemes in [(PHONEME_DEAF, mode.deaf_phonemes),
+                                        (PHONEME_VOICED_WEAK, mode.voiced_weak_phonemes),
+                                        (PHONEME_VOICED_STRONG, mode.voiced_strong_phonemes),
+                                        (PHONEME_VOWEL, mode.vocals_phonemes)]:
+            for phoneme in phonemes:
+                if phoneme not in phoneme_classes:
+                    phoneme_classes[phoneme] = phoneme_class
+        set_attribute = super().__setattr__
+        set_attribute('name', name)
+        set_attribute('mode', mode)
+        set_attribute('_CompiledMode__batch_tables', None)
+        set_attribute('_CompiledMode__fingerprint', None)
+        set_attribute('letter_ids', MappingProxyType({letter: idx for idx, letter in enumerate(all_letters)}))
+        set_attribute('letter_classes', tuple(letter_classes))
+        set_attribute('double_vocal_flags', tuple(double_vocal_flags))
+        set_attribute('soft_vocal_flags', tuple(soft_vocal_flags))
+        set_attribute('vocal_after_sign_flags', tuple(vocal_after_sign_flags))
+        set_attribute('vocal_forms', tuple(vocal_forms))
+        set_attribute('consonant_forms', tuple(consonant_forms))
+        set_attribute('rule_27_forms', tuple(rule_27_forms))
+        set_attribute('phoneme_classes', MappingProxyType(phoneme_classes))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'Compiled mode `{self.name}` is read-only!')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'Compiled mode `{self.name}` is read-only!')
+
+    @property
+    def fingerprint(self) -> str:
+        '''
+        Контрольная сумма таблиц режима: по ней можно понять, построены ли
+        сохранённые транскрипции по тем же правилам.
+        '''
+        if self.__fingerprint is None:
+            description = (sorted(self.letter_ids.items()), self.letter_classes, self.double_vocal_flags,
+                           self.soft_vocal_flags, self.vocal_after_sign_flags, self.vocal_forms, self.consonant_forms,
+                           tuple(sorted(it.items()) for it in self.rule_27_forms), sorted(self.phoneme_classes.items()))
+            # вычисленная контрольная сумма только кэшируется, таблицы режима при этом не меняются
+            super().__setattr__('_CompiledMode__fingerprint',
+                                hashlib.sha256(repr(description).encode('utf-8')).hexdigest())
+        return self.__fingerprint
+
+    def get_batch_tables(self) -> dict:
+        '''
+        Те же таблицы правил, что и для одного слова, но в виде массивов NumPy.
+        Последняя строка каждой таблицы соответствует выравнивающему символу.
+        Таблицы строятся при первом обращении и доступны только для чтения.
+        '''
+        if self.__batch_tables is not None:
+            return self.__batch_tables
+        phoneme_names = set(self.mode.russian_phonemes_set) | {'J0'}
+        for forms in self.vocal_forms + self.consonant_forms:
+            if forms is not None:
+                phoneme_names |= set(filter(lambda it: it is not None, forms))
+        phoneme_names = sorted(phoneme_names)
+        phoneme_ids = {phoneme: phoneme_id for phoneme_id, phoneme in enumerate(phoneme_names)}
+        # отсутствующая форма транскрипции получает отдельный номер, чтобы такое слово можно было отбраковать
+        none_id = len(phoneme_names)
+        n_letters = len(self.letter_classes)
+        vocal_forms = np.full((n_letters + 1, 9), none_id, dtype=np.int64)
+        consonant_forms = np.full((n_letters + 1, len(CONSONANT_FORMS)), none_id, dtype=np.int64)
+        rule_27_forms = np.full((n_letters + 1, none_id + 1), -1, dtype=np.int64)
+        for letter_id in range(n_letters):
+            if self.vocal_forms[letter_id] is not None:
+                for case in range(1, 9):
+                    phoneme = self.vocal_forms[letter_id][case]
+                    vocal_forms[letter_id, case] = none_id if phoneme is None else phoneme_ids[phoneme]
+            if self.consonant_forms[letter_id] is not None:
+                for form, phoneme in enumerate(self.consonant_forms[letter_id]):
+                    consonant_forms[letter_id, form] = none_id if phoneme is None else phoneme_ids[phoneme]
+            for phoneme, form in self.rule_27_forms[letter_id].items():
+                rule_27_forms[letter_id, phoneme_ids[phoneme]] = form
+        phoneme_classes = np.full(none_id + 1, -1, dtype=np.int64)
+        for phoneme, phoneme_class in self.phoneme_classes.items():
+            phoneme_classes[phoneme_ids[phoneme]] = phoneme_class
+        # номер первого случая гласной (без ударения / в конце слова) в зависимости от класса предыдущей буквы
+        vocal_cases = np.full(LETTER_OTHER + 1, -1, dtype=np.int64)
+        vocal_cases[[LETTER_SIGN, LETTER_VOCAL, LETTER_SOFT, LETTER_HARD, LETTER_HARDSOFT]] = [1, 1, 3, 5, 7]
+        batch_tables = {
+            'phoneme_names': np.array(phoneme_names + [''], dtype=object),
+            'phoneme_ids': MappingProxyType(phoneme_ids),
+            'none_id': none_id,
+            'j_id': phoneme_ids['J0'],
+            'letter_classes': np.array(list(self.letter_classes) + [LETTER_SIGN], dtype=np.int64),
+            'double_vocal_flags': np.array(list(self.double_vocal_flags) + [False], dtype=bool),
+            'soft_vocal_flags': np.array(list(self.soft_vocal_flags) + [False], dtype=bool),
+            'vocal_after_sign_flags': np.array(list(self.vocal_after_sign_flags) + [False], dtype=bool),
+            'vocal_forms': vocal_forms,
+            'consonant_forms': consonant_forms,
+            'rule_27_forms': rule_27_forms,
+            'phoneme_classes': phoneme_classes,
+            'vocal_cases': vocal_cases,
+            'end_voices': np.array(END_VOICES + (-1,), dtype=np.int64),
+            'inner_voices': np.array(tuple(-1 if it is None else it for it in INNER_VOICES) + (-1,), dtype=np.int64)
+        }
+        for table in batch_tables.values():
+            if isinstance(table, np.ndarray):
+                table.flags.writeable = False
+        super().__setattr__('_CompiledMode__batch_tables', MappingProxyType(batch_tables))
+        return self.__batch_tables
+
+
+def register_mode(users_mode: str, mode_factory):
+    '''
+    Регистрация режима: mode_factory - функция без аргументов, создающая
+    объект режима (наследник Phonetics). Режим компилируется при первом
+    создании RulesForGraphemes с этим именем режима.
+    '''
+    _mode_factories[users_mode] = mode_factory
+    _compiled_modes.pop(users_mode, None)
+
+
+def load_mode(file_name: str) -> str:
+    '''
+    Загрузка и регистрация режима, описанного в JSON-файле, например:
+        {"name": "MyMode", "base": "Modern",
+         "consonants": {"г": ["GH", "KH", "GH", "GH0", "KH0", "GH0"]},
+         "rule_27": [{"letters": ["н"], "next_phonemes": ["T0", "D0"], "form": "n_soft"}]}
+    Формы согласных перечисляются в порядке n_hard, d_hard, v_hard, n_soft,
+    d_soft, v_soft, формы гласных - в порядке case1...case8. Режим сразу
+    компилируется, поэтому ошибка в описании обнаруживается при загрузке, а
+    некорректный режим не регистрируется. Возвращает имя загруженного режима.
+    '''
+    from russian_g2p.modes.Custom import CustomMode
+
+    with codecs.open(file_name, mode='r', encoding='utf-8', errors='ignore') as fp:
+        description = json.load(fp)
+    error_message = f'File `{file_name}` does not contain a correct description of mode!'
+    assert isinstance(description, dict) and isinstance(description.get('name'), str), error_message
+    base_mode = description.get('base', 'Modern')
+    assert base_mode in _mode_factories, error_message + f' Base mode `{base_mode}` is unknown.'
+    for section_name in ('consonants', 'vocals'):
+        assert isinstance(description.get(section_name, dict()), dict), \
+            error_message + f' Section `{section_name}` should be a dictionary.'
+    assert isinstance(description.get('rule_27', list()), list) and \
+           all(map(lambda it: isinstance(it, dict), description.get('rule_27', list()))), \
+        error_message + ' Section `rule_27` should be a list of dictionaries.'
+    base = get_compiled_mode(base_mode).mode
+    compiled_mode = CompiledMode(CustomMode(description, base), description['name'])
+    register_mode(description['name'], lambda: CustomMode(description, base))
+    _compiled_modes[description['name']] = compiled_mode
+    return description['name']
+
+
+def get_compiled_mode(users_mode: str) -> CompiledMode:
+    # неизвестное имя режима по-прежнему означает современный режим
+    if users_mode not in _mode_factories:
+        users_mode = 'Modern'
+    if users_mode not in _compiled_modes:
+        _compiled_modes[users_mode] = CompiledMode(_mode_factories[users_mode](), users_mode)
+    return _compiled_modes[users_mode]
+
+
+def _create_modern_mode():
+    from russian_g2p.modes.Modern import ModernMode
+    return ModernMode()
+
+
+def _create_classic_mode():
+    from russian_g2p.modes.Classic import ClassicMode
+    return ClassicMode()
+
+
+register_mode('Modern', _create_modern_mode)
+register_mode('Classic', _create_classic_mode)
+
+
+class RulesForGraphemes:
+    def __init__(self, users_mode: str='Modern'):
+        self.compiled_mode = get_compiled_mode(users_mode)
+        self.mode = self.compiled_mode.mode
+        self.letter_ids = self.compiled_mode.letter_ids
+        self.letter_classes = self.compiled_mode.letter_classes
+        self.double_vocal_flags = self.compiled_mode.double_vocal_flags
+        self.soft_vocal_flags = self.compiled_mode.soft_vocal_flags
+        self.vocal_after_sign_flags = self.compiled_mode.vocal_after_sign_flags
+        self.vocal_forms = self.compiled_mode.vocal_forms
+        self.consonant_forms = self.compiled_mode.consonant_forms
+        self.rule_27_forms = self.compiled_mode.rule_27_forms
+        self.phoneme_classes = self.compiled_mode.phoneme_classes
+
+    def letters_to_ids(self, letters_list: list) -> list:
+        letter_ids = self.letter_ids
+        return [letter_ids[letter] for letter in letters_list]
+
+    def ids_to_phonemes(self, ids_list: list, next_phoneme: str) -> list:
+        '''
+        Транскрипция слова, заданного номерами букв, справа налево.
+        '''
+        letter_classes = self.letter_classes
+        transcription = list()
+        ind = len(ids_list) - 1
+        while ind >= 0:
+            letter_class = letter_classes[ids_list[ind]]
+            if letter_class == LETTER_SIGN:
+                ind -= 1
+                continue
+            if letter_class == LETTER_VOCAL:
+                new_phonemes = self.__apply_rule_for_vocals(ids_list, ind)
             else:
-                case = 6
-        elif letters_list[cur_pos - 1] in self.mode.hardsoft_consonants:
-            if cur_pos + 1 >= len(letters_list):
-                case = 7
+                new_phonemes = self.__apply_rule_for_consonants(ids_list, next_phoneme, ind)
+            ind -= 1
+            transcription += reversed(new_phonemes)
+            next_phoneme = new_phonemes[0]
+        transcription.reverse()
+        return transcription
+
+    def ids_batch_to_phonemes(self, ids_batch: list, next_phoneme: str) -> list:
+        '''
+        Транскрипция пакета слов, заданных номерами букв: слова выравниваются
+        в матрицу, и правила применяются сразу ко всему столбцу, справа налево.
+        Для слова, которое не удалось транскрибировать, возвращается None.
+        '''
+        assert np is not None, 'NumPy is required for the batch transcription!'
+        if len(ids_batch) == 0:
+            return []
+        tables = self.compiled_mode.get_batch_tables()
+        phoneme_ids = tables['phoneme_ids']
+        assert next_phoneme in phoneme_ids, f'`{next_phoneme}` is unknown phoneme!'
+        n_words = len(ids_batch)
+        lengths = np.array([len(cur) for cur in ids_batch], dtype=np.int64)
+        max_length = int(lengths.max())
+        pad_id = len(self.letter_classes)
+        letters = np.full((n_words, max_length + 1), pad_id, dtype=np.int64)
+        for word_idx, cur in enumerate(ids_batch):
+            letters[word_idx, :len(cur)] = cur
+        classes = tables['letter_classes'][letters]
+        rows = np.arange(n_words)
+        # если слово заканчивается знаком, последним считается предшествующий ему согласный
+        last_positions = lengths - 1 - (classes[rows, np.maximum(lengths - 1, 0)] == LETTER_SIGN)
+        errors = lengths == 0
+        emitted = np.full((n_words, max_length, 2), -1, dtype=np.int64)
+        next_phonemes = np.full(n_words, phoneme_ids[next_phoneme], dtype=np.int64)
+        for pos in range(max_length - 1, -1, -1):
+            cur_ids = letters[:, pos]
+            cur_classes = classes[:, pos]
+            last = pos + 1 >= lengths
+            vocals = cur_classes == LETTER_VOCAL
+            consonants = (cur_classes != LETTER_VOCAL) & (cur_classes != LETTER_SIGN)
+            # гласные
+            if pos == 0:
+                with_j = tables['double_vocal_flags'][cur_ids]
+                cases = np.where(last, 1, 2)
             else:
-                case = 8
-        else:
-            assert 0 == 1, "Incorrect word! " + ''.join(letters_list)
-        new_phonemes_list.append(self.mode.TableG2P[letters_list[cur_pos]].forms['case' + str(case)])
-        return new_phonemes_list
+                previous_classes = classes[:, pos - 1]
+                after_sign = previous_classes == LETTER_SIGN
+                with_j = np.where(after_sign, tables['vocal_after_sign_flags'][cur_ids],
+                                  (previous_classes == LETTER_VOCAL) & tables['double_vocal_flags'][cur_ids])
+                cases = tables['vocal_cases'][previous_classes] + np.where(last, 0, 1)
+                errors |= vocals & (cases < 1)
+            vocal_phonemes = tables['vocal_forms'][cur_ids, np.maximum(cases, 0)]
+            # согласные
+            phoneme_classes = tables['phoneme_classes'][next_phonemes]
+            soft = tables['soft_vocal_flags'][letters[:, pos + 1]].astype(np.int64)
+            rule_27_forms = tables['rule_27_forms'][cur_ids, next_phonemes]
+            inner_voices = tables['inner_voices'][phoneme_classes]
+            inner_forms = np.where(rule_27_forms >= 0, rule_27_forms, 2 * inner_voices + soft)
+            end_forms = 2 * tables['end_voices'][phoneme_classes] + soft
+            forms = np.where(pos == last_positions, end_forms, inner_forms)
+            errors |= consonants & ((phoneme_classes < 0) | (forms < 0))
+            consonant_phonemes = tables['consonant_forms'][cur_ids, np.maximum(forms, 0)]
+            first_phonemes = np.where(vocals, np.where(with_j, tables['j_id'], vocal_phonemes), consonant_phonemes)
+            emitted[:, pos, 0] = np.where(vocals | consonants, first_phonemes, -1)
+            emitted[:, pos, 1] = np.where(vocals & with_j, vocal_phonemes, -1)
+            next_phonemes = np.where(vocals | consonants, first_phonemes, next_phonemes)
+        emitted = emitted.reshape((n_words, 2 * max_length))
+        errors |= np.any(emitted == tables['none_id'], axis=1)
+        mask = emitted >= 0
+        phonemes = tables['phoneme_names'][emitted[mask]].tolist()
+        transcriptions = list()
+        start = 0
+        for word_idx, counter in enumerate(mask.sum(axis=1).tolist()):
+            transcriptions.append(None if errors[word_idx] else phonemes[start:(start + counter)])
+            start += counter
+        return transcriptions
+
+    def apply_rule_for_vocals(self, letters_list: list, cur_pos: int) -> list:
+        return self.__apply_rule_for_vocals(self.letters_to_ids(letters_list), cur_pos)
 
     def apply_rule_for_consonants(self, letters_list: list, next_phoneme: str, cur_pos: int) -> list:
-        new_phonemes_list = list()
-        n = len(letters_list)
-        # твердость / мягкость
-        if cur_pos < n - 1 and letters_list[cur_pos + 1] in self.mode.gen_vocals_soft:
-            hardsoft = 'soft'
+        return self.__apply_rule_for_consonants(self.letters_to_ids(letters_list), next_phoneme, cur_pos)
+
+    def __apply_rule_for_vocals(self, ids_list: list, cur_pos: int) -> list:
+        cur_id = ids_list[cur_pos]
+        last = cur_pos + 1 >= len(ids_list)
+        if cur_pos == 0:
+            with_j = self.double_vocal_flags[cur_id]
+            case = 1 if last else 2
         else:
-            hardsoft = 'hard'
-        if letters_list[-1] in self.mode.hard_and_soft_signs:
+            previous_class = self.letter_classes[ids_list[cur_pos - 1]]
+            with_j = False
+            if previous_class == LETTER_SIGN:
+                with_j = self.vocal_after_sign_flags[cur_id]
+                case = 1 if last else 2
+            elif previous_class == LETTER_VOCAL:
+                with_j = self.double_vocal_flags[cur_id]
+                case = 1 if last else 2
+            elif previous_class == LETTER_SOFT:
+                case = 3 if last else 4
+            elif previous_class == LETTER_HARD:
+                case = 5 if last else 6
+            elif previous_class == LETTER_HARDSOFT:
+                case = 7 if last else 8
+            else:
+                case = 0
+                assert 0 == 1, "Incorrect word! " + ''.join(self.__ids_to_letters(ids_list))
+        if with_j:
+            return ['J0', self.vocal_forms[cur_id][case]]
+        return [self.vocal_forms[cur_id][case]]
+
+    def __apply_rule_for_consonants(self, ids_list: list, next_phoneme: str, cur_pos: int) -> list:
+        cur_id = ids_list[cur_pos]
+        n = len(ids_list)
+        # твердость / мягкость
+        soft = 1 if (cur_pos < n - 1) and self.soft_vocal_flags[ids_list[cur_pos + 1]] else 0
+        if self.letter_classes[ids_list[-1]] == LETTER_SIGN:
             n -= 1
+        phoneme_class = self.phoneme_classes.get(next_phoneme)
+        assert phoneme_class is not None, "Incorrect word! " + ' '.join(self.__ids_to_letters(ids_list))
         # конец слова
         if cur_pos == n - 1:
-            if next_phoneme == 'sil':
-                voice = 'd'
-            elif next_phoneme in self.mode.deaf_phonemes:
-                voice = 'd'
-            elif next_phoneme in self.mode.voiced_weak_phonemes:
-                voice = 'd'
-            elif next_phoneme in self.mode.voiced_strong_phonemes:
-                voice = 'v'
-            elif next_phoneme in self.mode.vocals_phonemes:
-                voice = 'd'
-            else:
-                voice = ''
-                assert 0 == 1, "Incorrect word! " + ' '.join(letters_list)
-            case = voice + '_' + hardsoft
+            form = 2 * END_VOICES[phoneme_class] + soft
         # внутри слова
         else:
-            case = self.mode.rule_27(letters_list, next_phoneme, cur_pos)
-            if len(case) == 0:
-                if next_phoneme == 'sil':
-                    voice = ''
-                    assert 0 == 1, "Incorrect word! " + ' '.join(letters_list)
-                elif next_phoneme in self.mode.deaf_phonemes:
-                    voice = 'd'
-                elif next_phoneme in self.mode.voiced_weak_phonemes:
-                    voice = 'n'
-                elif next_phoneme in self.mode.voiced_strong_phonemes:
-                    voice = 'v'
-                elif next_phoneme in self.mode.vocals_phonemes:
-                    voice = 'n'
-                else:
-                    voice = ''
-                    assert 0 == 1, "Incorrect word! " + ' '.join(letters_list)
-                case = voice + '_' + hardsoft
-        new_phonemes_list.append(self.mode.TableG2P[letters_list[cur_pos]].forms[case])
-        return new_phonemes_list
+            form = self.rule_27_forms[cur_id].get(next_phoneme)
+            if form is None:
+                voice = INNER_VOICES[phoneme_class]
+                assert voice is not None, "Incorrect word! " + ' '.join(self.__ids_to_letters(ids_list))
+                form = 2 * voice + soft
+        return [self.consonant_forms[cur_id][form]]
+
+    def __ids_to_letters(self, ids_list: list) -> list:
+        letters = sorted(self.letter_ids, key=lambda letter: self.letter_ids[letter])
+        return [letters[letter_id] for letter_id in ids_list]
@@ -1,21 +1,346 @@
+import hashlib
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+
 from russian_g2p.Preprocessor import Preprocessor
 from russian_g2p.Accentor import Accentor
-from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme, OUTPUT_FORMATS
+from russian_g2p.ResultCache import ResultCache, get_dictionaries_version
+
+
+# экземпляр Transcription, который создаётся один раз в каждом рабочем процессе
+_worker_transcription = None
+
+
+def _init_worker(config: dict):
+    global _worker_transcription
+    _worker_transcription = Transcription(**config)
+
+
+def _transcribe_part(texts_and_output_format: tuple) -> tuple:
+    texts, output_format = texts_and_output_format
+    _worker_transcription.reset_stats()
+    return _worker_transcription.transcribe(texts, output_format), _worker_transcription.stats
+
+
+# этапы транскрипции, для которых собирается статистика
+STAGES = ('preprocessing', 'accenting', 'g2p')
+
+
+class TranscriptionStats:
+    '''
+    Статистика транскрипции: число пакетов, текстов и слов, время работы каждого
+    этапа и число текстов, на которых этап завершился ошибкой (такие тексты
+    получают пустую транскрипцию). Время обработки - это сумма времени этапов,
+    поэтому при разметке в фоновом потоке оно может превышать реальное время.
+    Тексты, транскрипции которых найдены в кэше, учитываются только в cache_hits.
+    '''
+
+    def __init__(self):
+        self.n_batches = 0
+        self.n_texts = 0
+        self.n_words = 0
+        self.max_batch_size = 0
+        self.stage_times = {it: 0.0 for it in STAGES}
+        self.failures = {it: 0 for it in STAGES}
+        self.cache_hits = 0
+
+    def __repr__(self):
+        return f'TranscriptionStats({self.as_dict()})'
+
+    def add(self, other: 'TranscriptionStats'):
+        self.n_batches += other.n_batches
+        self.n_texts += other.n_texts
+        self.n_words += other.n_words
+        self.max_batch_size = max(self.max_batch_size, other.max_batch_size)
+        for cur_stage in STAGES:
+            self.stage_times[cur_stage] += other.stage_times[cur_stage]
+            self.failures[cur_stage] += other.failures[cur_stage]
+        self.cache_hits += other.cache_hits
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.stage_times.values())
+
+    @property
+    def mean_batch_size(self) -> float:
+        return (self.n_texts / self.n_batches) if self.n_batches > 0 else 0.0
+
+    @property
+    def texts_per_second(self) -> float:
+        return (self.n_texts / self.total_time) if self.total_time > 0.0 else 0.0
+
+    @property
+    def words_per_second(self) -> float:
+        return (self.n_words / self.total_time) if self.total_time > 0.0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {'batches': self.n_batches, 'texts': self.n_texts, 'words': self.n_words,
+                'mean_batch_size': self.mean_batch_size, 'max_batch_size': self.max_batch_size,
+                'total_time': self.total_time, 'stage_times': dict(self.stage_times),
+                'failures': dict(self.failures), 'cache_hits': self.cache_hits,
+                'texts_per_second': self.texts_per_second, 'words_per_second': self.words_per_second}
 
 
 class Transcription:
     def __init__(self, raise_exceptions: bool=False, batch_size: int=64, verbose: bool=False,
-                 use_wiki: bool=False):
-        self.__preprocessor = Preprocessor(batch_size=batch_size)
+                 use_wiki: bool=False, tokens_per_batch: int=2048, tag_only_homographs: bool=True,
+                 tagger='rnnmorph', workers: int=1, stats_callback=None, cache_name: str=None):
+        assert workers > 0, f'{workers} is wrong number of workers!'
+        assert (workers == 1) or isinstance(tagger, str), \
+            'The tagger should be specified by its name if several workers are used!'
+        self.__config = dict(raise_exceptions=raise_exceptions, batch_size=batch_size, use_wiki=use_wiki,
+                             tokens_per_batch=tokens_per_batch, tag_only_homographs=tag_only_homographs,
+                             tagger=tagger)
+        self.workers = workers
+        self.__pool = None
+        # при нескольких рабочих процессах модели загружаются в них, а не в основном процессе
+        self.__preprocessor = Preprocessor(batch_size=batch_size, tokens_per_batch=tokens_per_batch,
+                                           tagger=tagger) if workers == 1 else None
         self.__accentor = Accentor(exception_for_unknown=raise_exceptions, use_wiki=use_wiki)
         self.__g2p = Grapheme2Phoneme(exception_for_nonaccented=raise_exceptions)
         self.verbose = verbose
+        # морфотеги нужны Accentor-у только для омографов, поэтому остальные предложения можно не размечать
+        self.tag_only_homographs = tag_only_homographs
+        # stats_callback (если задан) вызывается со статистикой каждого обработанного пакета
+        self.stats_callback = stats_callback
+        self.stats = TranscriptionStats()
+        self.__stats_lock = threading.Lock()
+        self.__cache = None
+        if cache_name is not None:
+            dictionaries_version = get_dictionaries_version()
+            # транскрипция зависит от словарей, правил режима и настроек разметки и расстановки ударений
+            settings = (dictionaries_version, self.__g2p.compiled_mode.name, self.__g2p.compiled_mode.fingerprint,
+                        tagger if isinstance(tagger, str) else type(tagger).__name__, tag_only_homographs, use_wiki,
+                        raise_exceptions)
+            self.__cache = ResultCache(cache_name, hashlib.sha256(repr(settings).encode('utf-8')).hexdigest(),
+                                       dictionaries_version)
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        '''
+        Завершение рабочих процессов (если они были запущены) и закрытие кэша.
+        '''
+        if getattr(self, '_Transcription__pool', None) is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+        if getattr(self, '_Transcription__cache', None) is not None:
+            self.__cache.close()
+            self.__cache = None
 
-    def transcribe(self, texts: list):
-        all_words_and_tags = self.__preprocessor.preprocessing(texts)
-        if self.verbose:
+    def reset_stats(self):
+        with self.__stats_lock:
+            self.stats = TranscriptionStats()
+
+    def __finish_batch(self, batch_stats: TranscriptionStats):
+        if batch_stats.n_texts == 0:
+            return
+        with self.__stats_lock:
+            self.stats.add(batch_stats)
+        if self.stats_callback is not None:
+            self.stats_callback(batch_stats)
+
+    @property
+    def phoneme_symbols(self) -> list:
+        return self.__g2p.phoneme_symbols
+
+    def save_phoneme_symbols(self, file_name: str):
+        self.__g2p.save_phoneme_symbols(file_name)
+
+    def transcribe(self, texts: list, output_format: str='list'):
+        assert output_format in OUTPUT_FORMATS, f'`{output_format}` is unknown output format!'
+        if self.__cache is not None:
+            return self.__transcribe_with_cache(texts, output_format, self.verbose)
+        return self.__transcribe_without_cache(texts, output_format, self.verbose)
+
+    def __transcribe_without_cache(self, texts: list, output_format: str, verbose: bool) -> list:
+        if self.workers > 1:
+            return self.__transcribe_in_pool(texts, output_format, verbose)
+        return self.__transcribe_batch(texts, output_format, verbose)
+
+    def __transcribe_with_cache(self, texts: list, output_format: str, verbose: bool) -> list:
+        keys, found, missed = self.__lookup_cache(texts)
+        results = self.__transcribe_without_cache(list(missed.values()), 'list', verbose)
+        return self.__merge_with_cache(keys, found, list(missed.keys()), results, output_format)
+
+    def __lookup_cache(self, texts: list) -> tuple:
+        '''
+        Поиск текстов в кэше. Возвращает ключи всех текстов, найденные транскрипции
+        и словарь "ключ - текст" для ненайденных текстов (каждый из них один раз).
+        '''
+        keys = [self.__cache.get_key(cur) for cur in texts]
+        found = self.__cache.get_many(keys)
+        missed = dict()
+        for key, text in zip(keys, texts):
+            if (key not in found) and (key not in missed):
+                missed[key] = text
+        return keys, found, missed
+
+    def __merge_with_cache(self, keys: list, found: dict, missed_keys: list, missed_results: list,
+                           output_format: str) -> list:
+        '''
+        Сохранение новых транскрипций (в формате списков имён фонем) в кэше и сборка
+        результатов для всех текстов. Пустые транскрипции не сохраняются: они могут
+        быть следствием временной ошибки, например, недоступности Викисловаря.
+        '''
+        new_results = dict(filter(lambda it: len(it[1]) > 0, zip(missed_keys, missed_results)))
+        self.__cache.put_many(new_results)
+        found.update(zip(missed_keys, missed_results))
+        with self.__stats_lock:
+            self.stats.cache_hits += len(keys) - len(missed_keys)
+        if output_format == 'list':
+            return [[list(phrase) for phrase in found[key]] for key in keys]
+        return [[self.__g2p.phonemes_to_ids(phrase, output_format) for phrase in found[key]] for key in keys]
+
+    def transcribe_iter(self, texts, output_format: str='list', texts_per_batch: int=1000,
+                        pipeline_depth: int=0):
+        '''
+        Потоковая транскрипция: тексты берутся из итерируемого объекта (например,
+        файла) по мере надобности и обрабатываются порциями по texts_per_batch штук,
+        а результаты выдаются по одному в порядке текстов. В памяти одновременно
+        находится только одна порция, поэтому объём корпуса не ограничен.
+        Если pipeline_depth > 0, то морфологическая разметка следующих порций
+        выполняется в фоновом потоке одновременно с расстановкой ударений и
+        транскрипцией текущей, но не более чем на pipeline_depth порций вперёд.
+        '''
+        assert output_format in OUTPUT_FORMATS, f'`{output_format}` is unknown output format!'
+        assert texts_per_batch > 0, f'{texts_per_batch} is wrong number of texts per batch!'
+        assert pipeline_depth >= 0, f'{pipeline_depth} is wrong depth of the pipeline!'
+        assert (pipeline_depth == 0) or (self.workers == 1), \
+            'The pipeline cannot be used with several workers!'
+        texts = iter(texts)
+        if pipeline_depth > 0:
+            batches = self.__tag_in_background(texts, texts_per_batch, pipeline_depth)
+        else:
+            batches = None
+        n_processed = 0
+        try:
+            while True:
+                if batches is not None:
+                    tagged_batch = next(batches, None)
+                    if tagged_batch is None:
+                        break
+                    all_words_and_tags, batch_stats, cache_lookup = tagged_batch
+                    del tagged_batch
+                    if cache_lookup is None:
+                        results = self.__transcribe_tagged(all_words_and_tags, output_format, False, batch_stats)
+                    else:
+                        keys, found, missed_keys = cache_lookup
+                        results = self.__merge_with_cache(
+                            keys, found, missed_keys,
+                            self.__transcribe_tagged(all_words_and_tags, 'list', False, batch_stats), output_format
+                        )
+                    del all_words_and_tags, cache_lookup
+                else:
+                    batch = list(itertools.islice(texts, texts_per_batch))
+                    if len(batch) == 0:
+                        break
+                    if self.__cache is not None:
+                        results = self.__transcribe_with_cache(batch, output_format, False)
+                    else:
+                        results = self.__transcribe_without_cache(batch, output_format, False)
+                    del batch
+                n_processed += len(results)
+                for cur_result in results:
+                    yield cur_result
+                del results
+                if self.verbose:
+                    print(f'{n_processed} texts have been processed...')
+        finally:
+            if batches is not None:
+                batches.close()
+
+    def __tag_in_background(self, texts, texts_per_batch: int, pipeline_depth: int):
+        '''
+        Морфологическая разметка порций текстов в фоновом потоке. Размеченные
+        порции передаются через очередь длиной pipeline_depth: когда она заполнена,
+        фоновый поток ждёт, пока основной поток заберёт очередную порцию.
+        '''
+        tagged_batches = queue.Queue(maxsize=pipeline_depth)
+        stop_event = threading.Event()
+
+        def put(item):
+            while not stop_event.is_set():
+                try:
+                    tagged_batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def tag_batches():
+            try:
+                while not stop_event.is_set():
+                    batch = list(itertools.islice(texts, texts_per_batch))
+                    if len(batch) == 0:
+                        break
+                    batch_stats = TranscriptionStats()
+                    cache_lookup = None
+                    if self.__cache is not None:
+                        keys, found, missed = self.__lookup_cache(batch)
+                        cache_lookup = (keys, found, list(missed.keys()))
+                        batch = list(missed.values())
+                    if not put(((self.__tag_batch(batch, batch_stats), batch_stats, cache_lookup), None)):
+                        return
+                put((None, None))
+            except BaseException as err:
+                put((None, err))
+
+        tagging_thread = threading.Thread(target=tag_batches, name='russian_g2p-tagging', daemon=True)
+        tagging_thread.start()
+        try:
+            while True:
+                tagged_batch, err = tagged_batches.get()
+                if err is not None:
+                    raise err
+                if tagged_batch is None:
+                    break
+                yield tagged_batch
+        finally:
+            stop_event.set()
+            tagging_thread.join()
+
+    def __tag_batch(self, texts: list, batch_stats: TranscriptionStats) -> list:
+        batch_stats.n_batches = 1
+        batch_stats.n_texts = len(texts)
+        batch_stats.max_batch_size = len(texts)
+        start = time.perf_counter()
+        try:
+            all_words_and_tags = self.__preprocessor.preprocessing(
+                texts, self.__accentor.needs_morphotag if self.tag_only_homographs else None
+            )
+        except Exception:
+            batch_stats.stage_times['preprocessing'] += time.perf_counter() - start
+            batch_stats.failures['preprocessing'] += len(texts)
+            self.__finish_batch(batch_stats)
+            raise
+        batch_stats.stage_times['preprocessing'] += time.perf_counter() - start
+        batch_stats.n_words = sum(1 for cur in all_words_and_tags for word_and_tag in cur
+                                  if word_and_tag[0] != '<sil>')
+        return all_words_and_tags
+
+    def __transcribe_batch(self, texts: list, output_format: str, verbose: bool) -> list:
+        batch_stats = TranscriptionStats()
+        all_words_and_tags = self.__tag_batch(texts, batch_stats)
+        if verbose:
             print('All texts have been preprocessed...')
-        n_texts = len(texts)
+        return self.__transcribe_tagged(all_words_and_tags, output_format, verbose, batch_stats)
+
+    def __transcribe_tagged(self, all_words_and_tags: list, output_format: str, verbose: bool,
+                            batch_stats: TranscriptionStats) -> list:
+        n_texts = len(all_words_and_tags)
         n_data_parts = 100
         part_size = n_texts // n_data_parts
         while (part_size * n_data_parts) < n_texts:
@@ -23,11 +348,11 @@ class Transcription:
         data_counter = 0
         part_counter = 0
         total_result = []
-        for cur_words_and_tags in all_words_and_tags:
-            try:
-                accented_text = self.__accentor.do_accents(cur_words_and_tags)
-            except:
-                accented_text = []
+        start = time.perf_counter()
+        all_accented_texts = self.__accentor.do_accents_batch(all_words_and_tags)
+        batch_stats.stage_times['accenting'] += time.perf_counter() - start
+        start = time.perf_counter()
+        for accented_text in all_accented_texts:
             if len(accented_text) > 0:
                 tmp = ' '.join(accented_text[0])
                 tmp = ' ' + tmp
@@ -36,18 +361,50 @@ class Transcription:
                     result = []
                     for phonetic_word in phonetic_words:
                         if len(phonetic_word) != 0:
-                            phonemes = self.__g2p.phrase_to_phonemes(phonetic_word)
+                            phonemes = self.__g2p.phrase_to_phonemes(phonetic_word, output_format, validate=False)
                             result.append(phonemes)
                 except:
                     result = []
+                    batch_stats.failures['g2p'] += 1
             else:
                 result = []
+                batch_stats.failures['accenting'] += 1
             total_result.append(result)
             data_counter += 1
-            if (part_size > 0) and self.verbose:
+            if (part_size > 0) and verbose:
                 if (data_counter % part_size) == 0:
                     part_counter += 1
                     print(f'{part_counter}% of texts have been processed...')
-        if (part_counter < n_data_parts) and self.verbose:
+        if (part_counter < n_data_parts) and verbose:
             print('100% of texts have been processed...')
+        batch_stats.stage_times['g2p'] += time.perf_counter() - start
+        self.__finish_batch(batch_stats)
+        return total_result
+
+    def __transcribe_in_pool(self, texts: list, output_format: str, verbose: bool) -> list:
+        '''
+        Тексты делятся на непрерывные части, которые транскрибируются рабочими
+        процессами. Каждый процесс загружает Preprocessor, Accentor и Grapheme2Phoneme
+        один раз при запуске пула, а результаты собираются в исходном порядке.
+        '''
+        if len(texts) == 0:
+            return []
+        if self.__pool is None:
+            # spawn, а не fork: TensorFlow и другие многопоточные библиотеки не переносят fork
+            self.__pool = multiprocessing.get_context('spawn').Pool(
+                processes=self.workers, initializer=_init_worker, initargs=(self.__config,)
+            )
+        # частей больше, чем процессов, чтобы процессы не простаивали из-за неравных по сложности частей
+        n_parts = min(len(texts), self.workers * 4)
+        part_size = len(texts) // n_parts
+        while (part_size * n_parts) < len(texts):
+            part_size += 1
+        parts = [texts[it:(it + part_size)] for it in range(0, len(texts), part_size)]
+        total_result = []
+        for part_counter, (part_result, part_stats) in enumerate(
+                self.__pool.imap(_transcribe_part, [(cur, output_format) for cur in parts])):
+            total_result += part_result
+            self.__finish_batch(part_stats)
+            if verbose:
+                print(f'{part_counter + 1} of {len(parts)} parts of texts have been processed...')
         return total_result
@@ -1 +1 @@
-__all__ = ['Grapheme2Phoneme', 'Accentor', 'RulesForGraphemes', 'Preprocessor', 'Transcription', 'modes']
+__all__ = ['Grapheme2Phoneme', 'Accentor', 'RulesForGraphemes', 'Preprocessor', 'Transcription', 'AsyncTranscription', 'modes']
@@ -0,0 +1,40 @@
+from russian_g2p.modes.Phonetics import Consonant, Vocal, Phonetics
+
+
+class CustomMode(Phonetics):
+    '''
+    Режим, заданный описанием из файла данных: таблица транскрипции базового
+    режима, в которой часть букв переопределена, и, при необходимости,
+    собственный список правил смягчения согласных (правило 27).
+    '''
+    def __init__(self, description: dict, base_mode: Phonetics):
+        Phonetics.__init__(self)
+        error_message = f'Description of the mode `{description.get("name")}` is incorrect!'
+        self.__base_mode = base_mode
+        self.TableG2P = dict(base_mode.TableG2P)
+        for letter, forms in description.get('consonants', dict()).items():
+            assert (letter in self.consonants) and (len(forms) == len(Consonant.FORM_NAMES)), error_message
+            assert all(map(lambda it: it in self.russian_phonemes_set, forms)), error_message
+            self.TableG2P[letter] = Consonant(*forms)
+        for letter, forms in description.get('vocals', dict()).items():
+            assert (letter in self.vocals) and (len(forms) == len(Vocal.FORM_NAMES)), error_message
+            assert all(map(lambda it: it in self.russian_phonemes_set, forms)), error_message
+            self.TableG2P[letter] = Vocal(*forms)
+        self.__rules_27 = None
+        if 'rule_27' in description:
+            self.__rules_27 = list()
+            for cur_rule in description['rule_27']:
+                assert set(cur_rule.keys()) == {'letters', 'next_phonemes', 'form'}, error_message
+                assert cur_rule['form'] in Consonant.FORM_NAMES, error_message
+                assert set(cur_rule['letters']) <= self.consonants, error_message
+                assert set(cur_rule['next_phonemes']) <= self.russian_phonemes_set, error_message
+                self.__rules_27.append((frozenset(cur_rule['letters']), frozenset(cur_rule['next_phonemes']),
+                                        cur_rule['form']))
+
+    def rule_27(self, letters_list: list, next_phoneme: str, cur_pos: int) -> str:
+        if self.__rules_27 is None:
+            return self.__base_mode.rule_27(letters_list, next_phoneme, cur_pos)
+        for letters, next_phonemes, form in self.__rules_27:
+            if (letters_list[cur_pos] in letters) and (next_phoneme in next_phonemes):
+                return form
+        return ''
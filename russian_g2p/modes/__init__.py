@@ -1 +1 @@
-__all__ = ['Classic','Modern', 'Phonetics']
+__all__ = ['Classic','Modern', 'Custom', 'Phonetics']
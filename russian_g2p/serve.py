@@ -0,0 +1,288 @@
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import CancelledError, Future, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import warnings
+
+from russian_g2p.Transcription import STAGES, Transcription
+
+
+class TranscriptionBatcher:
+    '''
+    Динамическое объединение текстов из одновременных запросов в пакеты.
+    Тексты ждут в очереди, а отдельный поток забирает из неё пакеты не более чем
+    из max_batch_size текстов, подождав max_wait секунд после появления первого
+    текста. В пакет сначала попадают тексты, прождавшие дольше max_delay секунд,
+    а затем самые короткие тексты, поэтому короткие запросы не стоят в очереди
+    за длинными, а длинные не ждут бесконечно. Если транскрипция пакета
+    завершилась ошибкой, то его тексты повторно транскрибируются по одному,
+    и ошибку получают только ошибочные тексты.
+    '''
+
+    def __init__(self, transcription: Transcription, max_batch_size: int=64, max_wait: float=0.005,
+                 max_delay: float=1.0, history_size: int=1000):
+        assert max_batch_size > 0, f'{max_batch_size} is wrong size of the batch!'
+        assert max_wait >= 0.0, f'{max_wait} is wrong waiting time!'
+        assert max_delay >= 0.0, f'{max_delay} is wrong delay!'
+        self.transcription = transcription
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_delay = max_delay
+        self.__queue = []
+        self.__condition = threading.Condition()
+        self.__counter = 0
+        self.__stopped = False
+        self.__start_time = time.monotonic()
+        self.__n_texts = 0
+        self.__n_batches = 0
+        self.__n_errors = 0
+        self.__batch_sizes = deque(maxlen=history_size)
+        self.__queue_times = deque(maxlen=history_size)
+        self.__batch_times = deque(maxlen=history_size)
+        self.__stage_times = {it: deque(maxlen=history_size) for it in STAGES}
+        self.__thread = threading.Thread(target=self.__process_batches, name='russian_g2p-batcher', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+        self.__thread.join()
+        for _, _, _, _, future in self.__queue:
+            future.cancel()
+        self.__queue = []
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        with self.__condition:
+            if self.__stopped:
+                raise RuntimeError('The batcher is stopped!')
+            self.__queue.append((len(text), self.__counter, time.monotonic(), text, future))
+            self.__counter += 1
+            self.__condition.notify_all()
+        return future
+
+    def __take_batch(self):
+        '''
+        Очередной пакет или None, если работа остановлена. Тексты отменённых
+        (например, по тайм-ауту) запросов в пакет не попадают.
+        '''
+        with self.__condition:
+            while (len(self.__queue) == 0) and (not self.__stopped):
+                self.__condition.wait()
+            if self.__stopped:
+                return None
+            deadline = self.__queue[0][2] + self.max_wait
+            while (len(self.__queue) < self.max_batch_size) and (not self.__stopped):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0.0:
+                    break
+                self.__condition.wait(timeout)
+            if self.__stopped:
+                return None
+            overdue_time = time.monotonic() - self.max_delay
+            self.__queue.sort(key=lambda it: (0, it[1]) if it[2] <= overdue_time else (1, it[0], it[1]))
+            batch = self.__queue[:self.max_batch_size]
+            self.__queue = self.__queue[self.max_batch_size:]
+        # после этого отменить запрос уже нельзя, поэтому его результат можно будет установить
+        return [it for it in batch if it[4].set_running_or_notify_cancel()]
+
+    def __transcribe(self, texts: list) -> list:
+        '''
+        Транскрипция текстов пакета. Возвращает для каждого текста пару
+        (транскрипция, ошибка), где ровно один элемент не равен None.
+        '''
+        try:
+            return [(cur, None) for cur in self.transcription.transcribe(texts)]
+        except Exception as err:
+            if len(texts) == 1:
+                return [(None, err)]
+        # один ошибочный текст не должен приводить к ошибке у всех запросов пакета
+        return [self.__transcribe([cur])[0] for cur in texts]
+
+    def __process_batches(self):
+        while True:
+            batch = self.__take_batch()
+            if batch is None:
+                break
+            if len(batch) == 0:
+                continue
+            start = time.monotonic()
+            # пакеты транскрибируются только в этом потоке, поэтому разность статистики относится к текущему пакету
+            stage_times = dict(self.transcription.stats.stage_times)
+            results = self.__transcribe([it[3] for it in batch])
+            duration = time.monotonic() - start
+            stage_times = {it: self.transcription.stats.stage_times[it] - stage_times[it] for it in STAGES}
+            with self.__condition:
+                self.__queue_times.extend(start - it[2] for it in batch)
+                self.__batch_times.append(duration)
+                for cur_stage in STAGES:
+                    self.__stage_times[cur_stage].append(stage_times[cur_stage])
+                self.__batch_sizes.append(len(batch))
+                self.__n_batches += 1
+                self.__n_texts += len(batch)
+                self.__n_errors += sum(1 for _, err in results if err is not None)
+            for (_, _, _, _, future), (cur_result, err) in zip(batch, results):
+                if err is None:
+                    future.set_result(cur_result)
+                else:
+                    future.set_exception(err)
+
+    def get_metrics(self) -> dict:
+
+        def describe(values: list) -> dict:
+            if len(values) == 0:
+                return {'mean': None, 'p50': None, 'p90': None, 'p99': None, 'max': None}
+            sorted_values = sorted(values)
+            res = {'mean': sum(sorted_values) / len(sorted_values), 'max': sorted_values[-1]}
+            for q in (50, 90, 99):
+                res[f'p{q}'] = sorted_values[min(len(sorted_values) - 1, (q * len(sorted_values)) // 100)]
+            return res
+
+        with self.__condition:
+            return {
+                'uptime': time.monotonic() - self.__start_time,
+                'queue_depth': len(self.__queue),
+                'texts': self.__n_texts,
+                'batches': self.__n_batches,
+                'errors': self.__n_errors,
+                'batch_size': describe(list(self.__batch_sizes)),
+                'latency': dict(
+                    [('queue', describe(list(self.__queue_times))),
+                     ('transcription', describe(list(self.__batch_times)))] +
+                    [(cur_stage, describe(list(self.__stage_times[cur_stage]))) for cur_stage in STAGES]
+                ),
+                'stages': self.transcription.stats.as_dict()
+            }
+
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    '''
+    POST /transcribe принимает {"texts": ["текст", ...]} (или {"text": "текст"})
+    и возвращает {"transcriptions": [...]} в том же порядке, GET /metrics
+    возвращает состояние очереди, задержки и статистику этапов транскрипции, а GET /health - {"status": "ok"}.
+    Если сервер останавливается, то запросы получают ответ 503, а если
+    транскрипция не завершилась за request_timeout секунд - ответ 504.
+    '''
+
+    server_version = 'russian_g2p'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def __send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self.__send_json(200, self.server.batcher.get_metrics())
+        elif self.path == '/health':
+            self.__send_json(200, {'status': 'ok'})
+        else:
+            self.__send_json(404, {'error': f'`{self.path}` is not found.'})
+
+    def do_POST(self):
+        if self.path != '/transcribe':
+            self.__send_json(404, {'error': f'`{self.path}` is not found.'})
+            return
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+            texts = [data['text']] if 'text' in data else data['texts']
+            if (not isinstance(texts, list)) or (not all(map(lambda it: isinstance(it, str), texts))):
+                raise ValueError('Texts should be a list of strings.')
+        except (ValueError, KeyError, TypeError) as err:
+            self.__send_json(400, {'error': f'Request is wrong: {err}'})
+            return
+        try:
+            futures = [self.server.batcher.submit(cur) for cur in texts]
+        except RuntimeError as err:
+            self.__send_json(503, {'error': str(err)})
+            return
+        deadline = time.monotonic() + self.server.request_timeout
+        try:
+            transcriptions = [cur.result(timeout=max(deadline - time.monotonic(), 0.0)) for cur in futures]
+        except CancelledError:
+            self.__send_json(503, {'error': 'The server is stopping.'})
+            return
+        except TimeoutError:
+            for cur in futures:
+                cur.cancel()
+            self.__send_json(504, {'error': f'Transcription is not finished in {self.server.request_timeout} seconds.'})
+            return
+        except Exception as err:
+            self.__send_json(500, {'error': str(err)})
+            return
+        self.__send_json(200, {'transcriptions': transcriptions})
+
+
+class TranscriptionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # очередь соединений по умолчанию (5) слишком мала для многих одновременных клиентов
+    request_queue_size = 1024
+
+    def __init__(self, server_address: tuple, batcher: TranscriptionBatcher, verbose: bool=False,
+                 request_timeout: float=60.0):
+        assert request_timeout > 0.0, f'{request_timeout} is wrong timeout!'
+        super().__init__(server_address, TranscriptionRequestHandler)
+        self.batcher = batcher
+        self.verbose = verbose
+        self.request_timeout = request_timeout
+
+
+def main():
+    parser = ArgumentParser(description='Local HTTP server for transcription of Russian texts.')
+    parser.add_argument('--host', dest='host', type=str, required=False, default='127.0.0.1',
+                        help='Host name or IP address to listen.')
+    parser.add_argument('-p', '--port', dest='port', type=int, required=False, default=8080,
+                        help='Port to listen.')
+    parser.add_argument('-b', '--batch', dest='max_batch_size', type=int, required=False, default=64,
+                        help='Maximal number of texts in a batch.')
+    parser.add_argument('-w', '--wait', dest='max_wait', type=float, required=False, default=0.005,
+                        help='Maximal time (in seconds) to wait for other texts after the first text of a batch.')
+    parser.add_argument('--max_delay', dest='max_delay', type=float, required=False, default=1.0,
+                        help='Texts which have waited longer than this time (in seconds) are not passed over by '
+                             'shorter ones.')
+    parser.add_argument('--timeout', dest='request_timeout', type=float, required=False, default=60.0,
+                        help='Maximal time (in seconds) to wait for transcriptions of one request.')
+    parser.add_argument('--tagger', dest='tagger', type=str, required=False, default='rnnmorph',
+                        choices=['rnnmorph', 'pymorphy2'], help='Morphological tagger.')
+    parser.add_argument('--wiki', dest='use_wiki', action='store_true',
+                        help='Unknown words are looked up in Wiktionary.')
+    parser.add_argument('--cache', dest='cache_name', type=str, required=False, default=None,
+                        help='SQLite file of the persistent result cache.')
+    parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', help='Log every request.')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # предупреждения о словах без ударения выводились бы на каждый запрос
+        warnings.simplefilter('ignore')
+    transcription = Transcription(batch_size=args.max_batch_size, use_wiki=args.use_wiki, tagger=args.tagger,
+                                  cache_name=args.cache_name)
+    # прогрев, чтобы загрузка модели не задержала первые запросы
+    transcription.transcribe(['Мама мыла раму.'])
+    batcher = TranscriptionBatcher(transcription, max_batch_size=args.max_batch_size, max_wait=args.max_wait,
+                                   max_delay=args.max_delay)
+    server = TranscriptionServer((args.host, args.port), batcher, verbose=args.verbose,
+                                 request_timeout=args.request_timeout)
+    print(f'Serving on http://{args.host}:{server.server_address[1]} ...', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.stop()
+        transcription.close()
+
+
+if __name__ == '__main__':
+    main()
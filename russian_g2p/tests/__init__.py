@@ -0,0 +1,12 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def pymorphy_is_available() -> bool:
+    # анализатор может импортироваться, но не создаваться (pymorphy2 в Python 3.11)
+    try:
+        from russian_g2p.Preprocessor import PymorphyTagger
+        _ = PymorphyTagger(cache_size=0)
+    except Exception:
+        return False
+    return True
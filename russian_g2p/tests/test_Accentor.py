@@ -1,7 +1,8 @@
+import logging
 import re
 import unittest
 
-from russian_g2p.Accentor import Accentor
+from russian_g2p.Accentor import Accentor, ACCENT_TIERS
 
 
 class TestRussianAccentor1(unittest.TestCase):
@@ -101,6 +102,67 @@ class TestRussianAccentor1(unittest.TestCase):
         real_variants = accentor.do_accents(source_phrase)
         self.assertEqual(target_variants, real_variants)
 
+    def test_do_accents_positive12(self):
+        accentor = Accentor(exception_for_unknown=True, use_wiki=False)
+        source_phrase = [['зеленого'], ['ежик'], ['выбежал'], ['на'], ['берег']]
+        target_variants = [
+            ['зелё+ного', 'ё+жик', 'вы+бежал', 'на', 'бе+рег']
+        ]
+        real_variants = accentor.do_accents(source_phrase)
+        self.assertEqual(target_variants, real_variants)
+
+    def test_do_accents_positive13(self):
+        accentor = Accentor(use_wiki=False)
+        source_phrase = [['зеленого']] + [['хракозябреневеке']] * 30
+        target_variants = [
+            ['зелё+ного'] + ['хракозябреневеке'] * 30
+        ]
+        with self.assertWarns(UserWarning):
+            real_variants = accentor.do_accents(source_phrase)
+        self.assertEqual(target_variants, real_variants)
+
+    def test_do_accents_positive14(self):
+        source_phrase = [['мама'], ['мыла'], ['раму']] * 1000
+        target_variants = [
+            ['ма+ма', 'мы+ла', 'ра+му'] * 1000
+        ]
+        real_variants = self.__accentor.do_accents(source_phrase)
+        self.assertEqual(target_variants, real_variants)
+
+    def test_do_accents_batch_positive01(self):
+        source_phrases = [
+            [['мама'], ['мыла'], ['раму']],
+            [['подарок', 'NOUN Animacy=Inan|Case=Nom|Gender=Masc|Number=Sing'], ['для', 'ADP _'],
+             ['кума', 'NOUN Animacy=Anim|Case=Gen|Gender=Masc|Number=Sing']],
+            [],
+            [['мама'], ['зеленого'], ['кума', 'NOUN Animacy=Anim|Case=Nom|Gender=Fem|Number=Sing']],
+            [['мама'], ['мыла'], ['раму']]
+        ]
+        target_variants = [
+            [['ма+ма', 'мы+ла', 'ра+му']],
+            [['пода+рок', 'для', 'ку+ма']],
+            [],
+            [],
+            [['ма+ма', 'мы+ла', 'ра+му']]
+        ]
+        real_variants = self.__accentor.do_accents_batch(source_phrases)
+        self.assertEqual(target_variants, real_variants)
+
+    def test_do_accents_batch_positive02(self):
+        accentor = Accentor(exception_for_unknown=True, use_wiki=False)
+        source_phrases = [
+            [['хракозябр'], ['впулил'], ['куздру']],
+            [['зеленого'], ['камня']],
+            [['впулил']]
+        ]
+        target_variants = [
+            [],
+            [['зелё+ного', 'ка+мня']],
+            []
+        ]
+        real_variants = accentor.do_accents_batch(source_phrases)
+        self.assertEqual(target_variants, real_variants)
+
     def test_do_accents_negative01(self):
         source_phrase_n_morphotags = [['подарок', 'NOUN Animacy=Inan|Case=Nom|Gender=Masc|Number=Sing'],
             ['для', 'NOUN Animacy=Inan|Case=Nom|Gender=Masc|Number=Sing'],
@@ -212,6 +274,77 @@ class TestRussianAccentor2(unittest.TestCase):
         real_variants = self.__accentor.do_accents(source_phrase)
         self.assertEqual(target_variants, real_variants)
 
+    def test_iterate_accents_positive01(self):
+        source_phrase = [['кубы'], ['для'], ['кубы']]
+        target_variants = [
+            ['ку+бы', 'для', 'ку+бы'],
+            ['ку+бы', 'для', 'кубы+'],
+            ['кубы+', 'для', 'ку+бы']
+        ]
+        real_variants = list(self.__accentor.iterate_accents(source_phrase, max_variants=3))
+        self.assertEqual(target_variants, real_variants)
+
+    def test_get_accents_lattice_positive01(self):
+        source_phrase = [['кубы'], ['ма+ма']] * 200
+        target_lattice = [['ку+бы', 'кубы+'], ['ма+ма']] * 200
+        real_lattice = self.__accentor.get_accents_lattice(source_phrase)
+        self.assertEqual(target_lattice, real_lattice)
+
+    def test_needs_morphotag_positive01(self):
+        """ Морфотег нужен омографам, а при поиске в Викисловаре - и неизвестным словам. """
+        for cur_word in ['замок', 'Замок', 'замок-крепость', 'абвгдейка']:
+            self.assertTrue(self.__accentor.needs_morphotag(cur_word), msg=cur_word)
+        self.assertFalse(Accentor(use_wiki=False).needs_morphotag('абвгдейка'))
+
+    def test_needs_morphotag_negative01(self):
+        for cur_word in ['мама', 'в', 'кое-где', 'сто+ит', 'ещё', '<sil>']:
+            self.assertFalse(self.__accentor.needs_morphotag(cur_word), msg=cur_word)
+
+
+class TestAccentorTierStats(unittest.TestCase):
+    def test_tier_stats_positive01(self):
+        """ Каждое разобранное слово учитывается на том уровне, где определено его ударение. """
+        accentor = Accentor(use_wiki=False, collect_stats=True)
+        source_phrases = [[['мама'], ['мыла'], ['раму']],
+                          [['кот'], ['и'], ['замок'], ['ежик'], ['фыва'], ['ко+т'], ['мама']]]
+        accentor.do_accents_batch(source_phrases)
+        stats = accentor.get_tier_stats()
+        self.assertEqual(list(ACCENT_TIERS), list(stats['tiers'].keys()))
+        self.assertEqual({'accented': 1, 'function_words': 1, 'one_vowel': 1, 'simple_words': 3, 'homographs': 1,
+                          'restored_jo': 1, 'wiki': 0, 'unknown': 1},
+                         {it: stats['tiers'][it]['hits'] for it in ACCENT_TIERS})
+        self.assertEqual(8, stats['tiers']['accented']['misses'])
+        self.assertEqual(2, stats['tiers']['homographs']['misses'])
+        self.assertEqual(0, stats['tiers']['unknown']['misses'])
+        self.assertGreater(stats['tiers']['simple_words']['time'], 0.0)
+        self.assertEqual(1, stats['batch_cache_hits'])
+        self.assertEqual({'requests': 0, 'errors': 0, 'time': 0.0}, stats['wiki'])
+        accentor.reset_tier_stats()
+        self.assertEqual(0, sum(it['hits'] for it in accentor.get_tier_stats()['tiers'].values()))
+
+    def test_tier_stats_negative01(self):
+        """ Без collect_stats статистика не собирается. """
+        accentor = Accentor(use_wiki=False)
+        accentor.do_accents([['мама'], ['мыла'], ['раму']])
+        self.assertEqual(0, sum(it['hits'] for it in accentor.get_tier_stats()['tiers'].values()))
+
+    def test_logger(self):
+        """ Accentor пишет в свой логгер и не настраивает корневой. """
+        root_handlers = list(logging.getLogger().handlers)
+        accentor = Accentor(use_wiki=False)
+        self.assertEqual('russian_g2p.Accentor', accentor.logger.name)
+        self.assertEqual(root_handlers, logging.getLogger().handlers)
+
+    def test_logger_debug(self):
+        """ Аргумент debug не меняет уровень и обработчики логгера. """
+        module_logger = logging.getLogger('russian_g2p.Accentor')
+        level = module_logger.level
+        handlers = list(module_logger.handlers)
+        with self.assertWarns(DeprecationWarning):
+            _ = Accentor(debug='yes', use_wiki=False)
+        self.assertEqual(level, module_logger.level)
+        self.assertEqual(handlers, module_logger.handlers)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
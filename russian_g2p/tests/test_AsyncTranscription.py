@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from russian_g2p.AsyncTranscription import AsyncTranscription
+from russian_g2p.Transcription import Transcription
+from russian_g2p.tests import pymorphy_is_available
+
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestAsyncTranscription(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.transcription = Transcription(tagger='pymorphy2')
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.transcription
+
+    def test_transcribe(self):
+        """ Одновременные вызовы собираются в пакеты и получают свои результаты. """
+        source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'Он открыл старый замок.',
+                          'Я иду домой', 'Мама мыла раму', 'Кто-нибудь выучил фразео-, нео- и прочие измы?']
+        target_variants = self.transcription.transcribe(source_phrases)
+
+        async def transcribe_all():
+            async with AsyncTranscription(self.transcription, max_batch_size=3, max_wait=0.05) as async_transcription:
+                results = await asyncio.gather(*[async_transcription.transcribe(cur) for cur in source_phrases])
+                return results, async_transcription.n_batches, async_transcription.n_texts
+
+        real_variants, n_batches, n_texts = asyncio.run(transcribe_all())
+        self.assertEqual(target_variants, real_variants)
+        self.assertEqual(len(source_phrases), n_texts)
+        self.assertEqual(3, n_batches)
+
+    def test_transcribe_output_format(self):
+        """ В одном пакете могут быть вызовы с разными форматами результата. """
+        source_phrase = 'Мама мыла раму'
+
+        async def transcribe_all():
+            async with AsyncTranscription(self.transcription, max_wait=0.05) as async_transcription:
+                return await asyncio.gather(async_transcription.transcribe(source_phrase),
+                                            async_transcription.transcribe(source_phrase, output_format='array'))
+
+        names, ids = asyncio.run(transcribe_all())
+        self.assertEqual(self.transcription.transcribe([source_phrase])[0], names)
+        self.assertEqual(names, [[self.transcription.phoneme_symbols[it] for it in cur] for cur in ids])
+
+    def test_transcribe_negative01(self):
+        """ Ошибку получает только вызов с ошибочным текстом, остальные вызовы пакета получают результаты. """
+
+        async def transcribe_all():
+            async with AsyncTranscription(self.transcription, max_wait=0.05) as async_transcription:
+                results = await asyncio.gather(async_transcription.transcribe(None),
+                                               async_transcription.transcribe('Мама мыла раму'),
+                                               return_exceptions=True)
+                return results, async_transcription.n_batches
+
+        results, n_batches = asyncio.run(transcribe_all())
+        self.assertIsInstance(results[0], Exception)
+        self.assertEqual(self.transcription.transcribe(['Мама мыла раму'])[0], results[1])
+        self.assertEqual(1, n_batches)
+
+    def test_transcribe_negative02(self):
+        """ После закрытия новые вызовы завершаются понятной ошибкой. """
+
+        async def transcribe_after_close():
+            async_transcription = AsyncTranscription(self.transcription)
+            await async_transcription.transcribe('Мама мыла раму')
+            await async_transcription.close()
+            await async_transcription.transcribe('Мама мыла раму')
+
+        with self.assertRaisesRegex(RuntimeError, 'AsyncTranscription is closed'):
+            asyncio.run(transcribe_after_close())
+
+    def test_init_negative01(self):
+        with self.assertRaises(AssertionError):
+            _ = AsyncTranscription(self.transcription, max_batch_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,7 +1,17 @@
+from array import array
+import json
+import os
 import re
+import tempfile
 import unittest
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+from russian_g2p.RulesForGraphemes import load_mode
 
 
 class TestRussianG2P(unittest.TestCase):
@@ -342,6 +352,158 @@ class TestRussianG2P(unittest.TestCase):
         """ Проверка, что костыль для удаления длинных фонем работает """
         self.assertEqual(['A', 'B0', 'I', 'S0', 'I0', 'N0', 'I'], self.__g2p.word_to_phonemes('абисси+нии'))
 
+    def test_word_to_phonemes_positive034(self):
+        """ Проверка кэширования транскрипций: результат не зависит от кэша, а счётчики кэша корректны. """
+        g2p = Grapheme2Phoneme(cache_size=2)
+        self.assertEqual(['V', 'D', 'R', 'U0', 'K'], g2p.word_to_phonemes('вдру+г'))
+        self.assertEqual(['V', 'D', 'R', 'U0', 'K'], g2p.word_to_phonemes('вдру+г', 'T'))
+        self.assertEqual(['V', 'D', 'R', 'U0', 'G'], g2p.word_to_phonemes('вдру+г', 'B'))
+        self.assertEqual((0, 3, 1), (g2p.cache_hits, g2p.cache_misses, g2p.cache_evictions))
+        self.assertEqual(['V', 'D', 'R', 'U0', 'G'], g2p.word_to_phonemes('вдру+г', 'D0'))
+        self.assertEqual(['V', 'D', 'R', 'U0', 'K'], g2p.word_to_phonemes('вдру+г', 'K0'))
+        self.assertEqual((2, 3, 1), (g2p.cache_hits, g2p.cache_misses, g2p.cache_evictions))
+        g2p.clear_cache()
+        self.assertEqual((0, 0, 0), (g2p.cache_hits, g2p.cache_misses, g2p.cache_evictions))
+
+    def test_word_to_phonemes_positive035(self):
+        """ Проверка кэширования транскрипций на словах из корпуса. """
+        g2p = Grapheme2Phoneme(cache_size=100)
+        g2p_without_cache = Grapheme2Phoneme(cache_size=0)
+        with open(os.path.join(os.path.dirname(__file__), '..', '..', 'corpus', 'wordlist'), encoding='utf-8') as fp:
+            words = [cur.strip() for cur in fp if '+' in cur][::50]
+        for next_phoneme in ['sil', 'T0', 'D', 'N', 'A0', 'sil']:
+            for cur_word in words:
+                self.assertEqual(g2p_without_cache.word_to_phonemes(cur_word, next_phoneme),
+                                 g2p.word_to_phonemes(cur_word, next_phoneme), msg=cur_word)
+        self.assertEqual(0, g2p_without_cache.cache_misses)
+        self.assertGreater(g2p.cache_evictions, 0)
+
+    def test_word_to_phonemes_positive036(self):
+        """ Проверка упрощения сочетаний согласных, в том числе последовательного, и замены окончаний. """
+        self.assertEqual(['P', 'R', 'A0', 'Z0', 'N0', 'I', 'K'], self.__g2p.word_to_phonemes('пра+здник'))
+        self.assertEqual(['L0', 'E0', 'S0', 'N0', 'I', 'TS', 'A'], self.__g2p.word_to_phonemes('ле+стница'))
+        self.assertEqual(['G', 'R', 'U0', 'S', 'N', 'A', 'V', 'A'], self.__g2p.word_to_phonemes('гру+стного'))
+        self.assertEqual(['K', 'O0', 'N', 'TS', 'A'], self.__g2p.word_to_phonemes('ко+лндцо'))
+        self.assertEqual(['S0', 'T0', 'E0', 'S', 'N', 'L', 'Y', 'J0'], self.__g2p.word_to_phonemes('сте+стнлый'))
+        self.assertEqual(['B', 'O0', 'J0', 'I', 'TS', 'A'], self.__g2p.word_to_phonemes('бо+ятся'))
+        self.assertEqual(['S', 'M0', 'I', 'J0', 'A0', 'TS', 'A'], self.__g2p.word_to_phonemes('смея+ться'))
+        self.assertEqual(['S', 'V', 'A', 'J0', 'E0', 'V', 'A'], self.__g2p.word_to_phonemes('свое+го'))
+        self.assertEqual(['M', 'N', 'O0', 'G', 'A'], self.__g2p.word_to_phonemes('мно+го'))
+        self.assertEqual(['Z', 'D', 'R', 'A0', 'S', 'T', 'V', 'U', 'J0', 'T0', 'I'],
+                         self.__g2p.word_to_phonemes('здра+вствуйте'))
+        self.assertEqual(['I', 'Z', 'V0', 'E0', 'S', 'N', 'Y', 'J0', 'L0', 'E0', 'S0', 'N0', 'I', 'TS', 'Y'],
+                         self.__g2p.phrase_to_phonemes('изве+стный ле+стницы'))
+
+    def test_word_to_phonemes_positive037(self):
+        """ Без проверки символов результат для корректных слов и фраз тот же самый. """
+        for cur_word in ['вдру+г', 'Ма+ма', 'кто+-нибудь', 'по-ру+сски', 'здра+вствуйте']:
+            self.assertEqual(self.__g2p.word_to_phonemes(cur_word), self.__g2p.word_to_phonemes(cur_word, validate=False))
+        self.assertEqual(self.__g2p.phrase_to_phonemes('е+сли бы не ты+'),
+                         self.__g2p.phrase_to_phonemes('е+сли бы не ты+', validate=False))
+
+    def test_apply_rules_positive001(self):
+        """ Проверка применения скомпилированных правил к отдельным буквам слова. """
+        letters = ['м', 'я+', 'с', 'н', 'и', 'к']
+        self.assertEqual(['A0'], self.__g2p.apply_rule_for_vocals(letters, 1))
+        self.assertEqual(['I'], self.__g2p.apply_rule_for_vocals(letters, 4))
+        self.assertEqual(['S0'], self.__g2p.apply_rule_for_consonants(letters, 'N0', 2))
+        self.assertEqual(['K'], self.__g2p.apply_rule_for_consonants(letters, 'sil', 5))
+        self.assertEqual(['G'], self.__g2p.apply_rule_for_consonants(letters, 'B', 5))
+        self.assertEqual(['J0', 'I'], self.__g2p.apply_rule_for_vocals(['я', 'м', 'а+'], 0))
+        self.assertEqual(['M0', 'A0', 'S0', 'N0', 'I', 'K'],
+                         self.__g2p.ids_to_phonemes(self.__g2p.letters_to_ids(letters), 'sil'))
+        self.assertEqual(['T'], self.__g2p.apply_rule_for_consonants(['п', 'у+', 'т', 'н', 'и', 'к'], 'N0', 2))
+        classic_g2p = Grapheme2Phoneme(users_mode='Classic')
+        self.assertEqual(['T0'], classic_g2p.apply_rule_for_consonants(['п', 'у+', 'т', 'н', 'и', 'к'], 'N0', 2))
+
+    def test_modes_positive001(self):
+        """ Таблицы режима общие для всех экземпляров с одним и тем же режимом. """
+        other_g2p = Grapheme2Phoneme()
+        self.assertIs(self.__g2p.mode, other_g2p.mode)
+        self.assertIs(self.__g2p.consonant_forms, other_g2p.consonant_forms)
+        classic_g2p = Grapheme2Phoneme(users_mode='Classic')
+        self.assertIsNot(self.__g2p.mode, classic_g2p.mode)
+        self.assertIs(classic_g2p.mode, Grapheme2Phoneme(users_mode='Classic').mode)
+
+    def test_modes_positive002(self):
+        """ Загрузка режима из файла данных. """
+        description = {
+            'name': 'TestMode', 'base': 'Modern',
+            'consonants': {'г': ['GH', 'KH', 'GH', 'GH0', 'KH0', 'GH0']},
+            'rule_27': [{'letters': ['т', 'д'], 'next_phonemes': ['N0'], 'form': 'd_soft'}]
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, 'test_mode.json')
+            with open(file_name, mode='w', encoding='utf-8') as fp:
+                json.dump(description, fp, ensure_ascii=False)
+            self.assertEqual('TestMode', load_mode(file_name))
+        g2p = Grapheme2Phoneme(users_mode='TestMode')
+        self.assertEqual(['S', 'N0', 'E0', 'KH'], g2p.word_to_phonemes('сне+г'))
+        self.assertEqual(['GH', 'O0', 'R', 'A', 'T'], g2p.word_to_phonemes('го+род'))
+        self.assertEqual(['P', 'U0', 'T0', 'N0', 'I', 'K'], g2p.word_to_phonemes('пу+тник'))
+        self.assertEqual(['S', 'T', 'A0', 'L', 'S0', 'A'], g2p.word_to_phonemes('ста+лся'))
+        self.assertEqual(['S0', 'N0', 'E0', 'K'], self.__g2p.word_to_phonemes('сне+г'))
+        self.assertEqual(['G', 'O0', 'R', 'A', 'T'], self.__g2p.word_to_phonemes('го+род'))
+        self.assertEqual(['P', 'U0', 'T', 'N0', 'I', 'K'], self.__g2p.word_to_phonemes('пу+тник'))
+
+    def test_modes_negative001(self):
+        """ Генерация исключения, если описание режима некорректно. """
+        description = {'name': 'WrongMode', 'consonants': {'г': ['GH', 'KH']}}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, 'wrong_mode.json')
+            with open(file_name, mode='w', encoding='utf-8') as fp:
+                json.dump(description, fp, ensure_ascii=False)
+            with self.assertRaisesRegex(AssertionError,
+                                        re.escape('Description of the mode `WrongMode` is incorrect!')):
+                load_mode(file_name)
+        self.assertEqual('Modern', Grapheme2Phoneme(users_mode='WrongMode').compiled_mode.name)
+
+    def test_modes_negative002(self):
+        """ Генерация исключения при загрузке, если раздел описания режима имеет неверный тип. """
+        description = {'name': 'WrongMode2', 'rule_27': {'letters': ['т'], 'next_phonemes': ['N0'], 'form': 'd_soft'}}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, 'wrong_mode.json')
+            with open(file_name, mode='w', encoding='utf-8') as fp:
+                json.dump(description, fp, ensure_ascii=False)
+            with self.assertRaisesRegex(AssertionError, re.escape('Section `rule_27` should be a list')):
+                load_mode(file_name)
+
+    def test_modes_negative003(self):
+        """ Общие таблицы скомпилированного режима нельзя изменить. """
+        compiled_mode = self.__g2p.compiled_mode
+        with self.assertRaises(AttributeError):
+            compiled_mode.letter_ids = dict()
+        with self.assertRaises(TypeError):
+            compiled_mode.letter_ids['а'] = 0
+        with self.assertRaises(TypeError):
+            compiled_mode.phoneme_classes['sil'] = 1
+        with self.assertRaises(TypeError):
+            compiled_mode.rule_27_forms[0]['N0'] = 0
+        with self.assertRaises(AttributeError):
+            del compiled_mode.name
+
+    def test_words_to_phonemes_batch_positive001(self):
+        """ Пакетная транскрипция совпадает с транскрипцией отдельных слов, в том числе для исключений и слов с дефисом. """
+        words = ['вдру+г', 'оттого+', 'кто+-нибудь', 'по-ру+сски', 'сча+стливый', 'объё+м', 'мать', 'со+лнце',
+                 'абисси+нии', 'я+', 'здра+вствуй', 'ро+дственник', 'извини+те']
+        for next_phoneme in ['sil', 'B', 'K0', 'A']:
+            self.assertEqual([self.__g2p.word_to_phonemes(cur_word, next_phoneme) for cur_word in words],
+                             self.__g2p.words_to_phonemes_batch(words, next_phoneme, batch_size=4))
+
+    def test_words_to_phonemes_batch_positive002(self):
+        """ Пакетная транскрипция слов из корпуса в обоих режимах. """
+        with open(os.path.join(os.path.dirname(__file__), '..', '..', 'corpus', 'wordlist'), encoding='utf-8') as fp:
+            words = [cur.strip() for cur in fp if '+' in cur][::10]
+        for users_mode in ['Modern', 'Classic']:
+            g2p = Grapheme2Phoneme(users_mode=users_mode, cache_size=0)
+            self.assertEqual([g2p.word_to_phonemes(cur_word) for cur_word in words],
+                             g2p.words_to_phonemes_batch(words))
+
+    def test_words_to_phonemes_batch_negative001(self):
+        """ Генерация исключения, если в пакете есть некорректное слово. """
+        with self.assertRaisesRegex(AssertionError, re.escape('Checked word is empty string!')):
+            self.__g2p.words_to_phonemes_batch(['ма+ма', ''])
+
     def test_word_to_phonemes_negative001(self):
         """ Генерация исключения, если аргумент - пустая строка. """
         source_word = ''
@@ -554,6 +716,63 @@ class TestRussianG2P(unittest.TestCase):
         self.assertEqual(['D', 'A', 'V', 'A0', 'J0', 'K', 'A', 'R', 'A', 'Z', 'B0', 'I', 'R0', 'O0', 'M', 'S0', 'A'],
                          self.__g2p.phrase_to_phonemes('дава+й-ка разберё+мся'))
 
+    def test_phrase_to_phonemes_positive021(self):
+        """ Проверка слияния повторяющихся и сопряжённых фонем внутри слова и на стыке слов. """
+        self.assertEqual(['A', 'TS0', 'U0', 'D', 'A'], self.__g2p.phrase_to_phonemes('отсю+да'))
+        self.assertEqual(['K', 'O0', 'N', 'Y', 'J0'], self.__g2p.phrase_to_phonemes('ко+нный'))
+        self.assertEqual(['ZH', 'Y', 'TSH0'], self.__g2p.phrase_to_phonemes('сжечь'))
+        self.assertEqual(['S', 'SH', 'U0', 'B', 'A', 'J0'], self.__g2p.phrase_to_phonemes('с шу+бой'))
+        self.assertEqual(['B', 'R', 'A', 'T', 'S0', 'I', 'S', 'T', 'R', 'Y0'],
+                         self.__g2p.phrase_to_phonemes('брат сестры+'))
+
+    def test_phrase_to_phonemes_positive022(self):
+        """ Проверка вывода номеров фонем в таблице символов вместо самих фонем. """
+        symbols = self.__g2p.phoneme_symbols
+        self.assertEqual(['<eps>', 'sil'], symbols[:2])
+        self.assertEqual(sorted(self.__g2p.mode.russian_phonemes_set - {'sil'}), symbols[2:])
+        self.assertEqual(symbols, Grapheme2Phoneme(users_mode='Classic').phoneme_symbols)
+        target_phonemes = ['M', 'A0', 'M', 'A', 'M', 'Y0', 'L', 'A', 'R', 'A0', 'M', 'U']
+        target_ids = [symbols.index(it) for it in target_phonemes]
+        phoneme_ids = self.__g2p.phrase_to_phonemes('ма+ма мы+ла ра+му', 'array')
+        self.assertIsInstance(phoneme_ids, array)
+        self.assertEqual('H', phoneme_ids.typecode)
+        self.assertEqual(target_ids, phoneme_ids.tolist())
+        if np is not None:
+            phoneme_ids = self.__g2p.phrase_to_phonemes('ма+ма мы+ла ра+му', 'numpy')
+            self.assertIsInstance(phoneme_ids, np.ndarray)
+            self.assertEqual(np.uint16, phoneme_ids.dtype)
+            self.assertEqual(target_ids, phoneme_ids.tolist())
+        self.assertEqual(target_phonemes, self.__g2p.phrase_to_phonemes('ма+ма мы+ла ра+му', 'list'))
+
+    def test_save_phoneme_symbols_positive001(self):
+        """ Сохранение таблицы символов фонем в формате phones.txt. """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, 'phones.txt')
+            self.__g2p.save_phoneme_symbols(file_name)
+            with open(file_name, encoding='utf-8') as fp:
+                lines = fp.read().split('\n')
+        self.assertEqual('', lines[-1])
+        self.assertEqual(['<eps> 0', 'sil 1'], lines[:2])
+        self.assertEqual(self.__g2p.phoneme_symbols, [it.split()[0] for it in lines[:-1]])
+        self.assertEqual(list(range(len(lines) - 1)), [int(it.split()[1]) for it in lines[:-1]])
+
+    def test_phrase_to_phonemes_negative002(self):
+        """ Генерация исключения, если формат вывода неизвестен. """
+        with self.assertRaisesRegex(AssertionError, re.escape('`str` is unknown output format!')):
+            self.__g2p.phrase_to_phonemes('ма+ма', 'str')
+
+    def test_word_to_phonemes_negative006(self):
+        """ Без проверки символов некорректное слово всё равно не транскрибируется. """
+        with self.assertRaisesRegex(AssertionError, re.escape('`м+а`: this word is incorrect!')):
+            self.__g2p.word_to_phonemes('м+а', validate=False)
+        with self.assertRaisesRegex(AssertionError, re.escape('`ма1`: this word is incorrect!')):
+            self.__g2p.word_to_phonemes('ма1', validate=False)
+
+    def test_phrase_to_phonemes_positive023(self):
+        """ Транскрипция очень длинной фразы без пауз. """
+        target_phonemes = ['M', 'A0', 'M', 'A', 'M', 'Y0', 'L', 'A', 'R', 'A0', 'M', 'U'] * 3000
+        self.assertEqual(target_phonemes, self.__g2p.phrase_to_phonemes(' '.join(['ма+ма мы+ла ра+му'] * 3000)))
+
     def test_phrase_to_phonemes_negative001(self):
         """ Генерация исключения, если аргумент - пустая строка. """
         source_phrase = ''
@@ -561,6 +780,13 @@ class TestRussianG2P(unittest.TestCase):
         with self.assertRaisesRegex(AssertionError, re.escape(target_error_message)):
             self.__g2p.phrase_to_phonemes(source_phrase)
 
+    def test_phrase_to_phonemes_negative002(self):
+        """ Фраза без слов после очистки отвергается и без проверки символов. """
+        target_error_message = 'Checked phrase is empty string!'
+        for validate in (True, False):
+            with self.assertRaisesRegex(AssertionError, re.escape(target_error_message)):
+                self.__g2p.phrase_to_phonemes(' 2020', validate=validate)
+
     def test_in_function_words_1_positive001(self):
         """ Проверить корректность определения функциональных слов первого рода. """
         self.assertFalse(self.__g2p.in_function_words_1('ма+ма'))
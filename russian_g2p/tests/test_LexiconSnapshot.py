@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from russian_g2p.Accentor import Accentor
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+from russian_g2p.LexiconSnapshot import LexiconSnapshot, build_lexicon_snapshot, get_lexicon_snapshot
+
+
+class TestLexiconSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.snapshot_name = build_lexicon_snapshot(os.path.join(cls.tmp_dir.name, 'lexicon.snapshot'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_content_positive01(self):
+        snapshot = LexiconSnapshot(self.snapshot_name)
+        accentor = Accentor(use_snapshot=False)
+        g2p = Grapheme2Phoneme(use_snapshot=False)
+        self.assertEqual(accentor.homographs, snapshot.homographs)
+        self.assertEqual(accentor.function_words, snapshot.function_words)
+        self.assertEqual(g2p.exclusions, snapshot.exclusions)
+        self.assertEqual(accentor.simple_words_dawg.tobytes(), snapshot.simple_words_dawg.tobytes())
+        self.assertEqual(64, len(snapshot.version))
+        self.assertTrue(snapshot.is_fresh())
+        del snapshot
+
+    def test_get_lexicon_snapshot_positive01(self):
+        snapshot = get_lexicon_snapshot(self.snapshot_name)
+        self.assertIsNotNone(snapshot)
+        self.assertIs(snapshot, get_lexicon_snapshot(self.snapshot_name))
+
+    def test_get_lexicon_snapshot_positive02(self):
+        self.assertIsNone(get_lexicon_snapshot(os.path.join(self.tmp_dir.name, 'unknown.snapshot')))
+
+    def test_load_negative01(self):
+        damaged_name = os.path.join(self.tmp_dir.name, 'damaged.snapshot')
+        with open(self.snapshot_name, mode='rb') as fp:
+            data = bytearray(fp.read())
+        data[-1] ^= 0xFF
+        with open(damaged_name, mode='wb') as fp:
+            fp.write(data)
+        with self.assertRaisesRegex(ValueError, 'Checksum is wrong'):
+            _ = LexiconSnapshot(damaged_name)
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(get_lexicon_snapshot(damaged_name))
+
+    def test_load_negative02(self):
+        wrong_name = os.path.join(self.tmp_dir.name, 'wrong.snapshot')
+        with open(wrong_name, mode='wb') as fp:
+            fp.write(b'0123456789' * 10)
+        with self.assertRaisesRegex(ValueError, 'is not a correct lexicon snapshot'):
+            _ = LexiconSnapshot(wrong_name)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,6 +1,7 @@
 import unittest
 
-from russian_g2p.Preprocessor import Preprocessor
+from russian_g2p.Preprocessor import Preprocessor, PymorphyTagger, Tagger
+from russian_g2p.tests import pymorphy_is_available
 
 
 class TestPrep(unittest.TestCase):
@@ -43,6 +44,68 @@ class TestPrep(unittest.TestCase):
         real_variants = self.__prep.preprocessing([source_phrase])[0]
         self.assertEqual(target_variants, real_variants)
 
+    def test_batches(self):
+        """ Повторы и предложения разной длины размечаются так же, как и по отдельности. """
+        source_phrases = ['Мама мыла раму.', 'Кто-нибудь выучил фразео-, нео- и прочие измы? Я - нет.', '...',
+                          'Мама мыла раму.', 'Он сказал, что придёт завтра утром, но так и не пришёл.']
+        target_variants = [self.__prep.preprocessing([cur])[0] for cur in source_phrases]
+        prep = Preprocessor(batch_size=2, tokens_per_batch=8)
+        real_variants = prep.preprocessing(source_phrases)
+        self.assertEqual(target_variants, real_variants)
+        self.assertEqual([], prep.predict_sentences([]))
+        del prep
+
+    def test_homographs_only(self):
+        """ Предложения без слов, которым нужен морфотег, не размечаются. """
+        source_phrases = ['Мама мыла раму.', 'Он открыл старый замок.']
+        prep = Preprocessor()
+        real_variants = prep.preprocessing(source_phrases, lambda it: it == 'замок')
+        self.assertEqual([['<sil>', 'SIL _'], ['мама', 'X _'], ['мыла', 'X _'], ['раму', 'X _'], ['<sil>', 'SIL _']],
+                         real_variants[0])
+        self.assertEqual(self.__prep.preprocessing(source_phrases[1:]), real_variants[1:])
+        self.assertEqual(1, prep.tagged_sentences)
+        self.assertEqual(1, prep.skipped_sentences)
+        del prep
+
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestPymorphyTagger(unittest.TestCase):
+    def test_tags(self):
+        """ Бесконтекстный анализатор выдаёт самый вероятный разбор в формате Universal Dependencies. """
+        prep = Preprocessor(batch_size=2, tagger='pymorphy2')
+        source_phrase = ' - Нет, - сказал он (и звали Андреем).'
+        target_variants = [['<sil>', 'SIL _'], ['нет', 'X Tense=Pres'], ['<sil>', 'SIL _'],
+                           ['сказал', 'VERB Aspect=Perf|Gender=Masc|Mood=Ind|Number=Sing|Tense=Past|VerbForm=Fin'],
+                           ['он', 'PRON Case=Nom|Gender=Masc|Number=Sing|Person=3'], ['<sil>', 'SIL _'],
+                           ['и', 'CONJ _'],
+                           ['звали', 'VERB Aspect=Imp|Mood=Ind|Number=Plur|Tense=Past|VerbForm=Fin'],
+                           ['андреем', 'PROPN Animacy=Anim|Case=Ins|Gender=Masc|Number=Sing'],
+                           ['<sil>', 'SIL _']]
+        self.assertEqual([target_variants], prep.preprocessing([source_phrase]))
+        del prep
+
+    def test_batches(self):
+        """ Разбиение на пакеты не влияет на результат бесконтекстного анализатора. """
+        tagger = PymorphyTagger()
+        source_phrases = ['Мама мыла раму.', 'Он открыл старый замок.', '...', 'Мама мыла раму.']
+        target_variants = Preprocessor(batch_size=64, tagger=tagger).preprocessing(source_phrases)
+        prep = Preprocessor(batch_size=1, tokens_per_batch=2, tagger=tagger)
+        self.assertIs(tagger, prep.tagger)
+        self.assertEqual(target_variants, prep.preprocessing(source_phrases))
+        del prep
+
+    def test_unknown_tagger(self):
+        with self.assertRaises(AssertionError):
+            _ = Preprocessor(tagger='unknown')
+        with self.assertRaises(TypeError):
+            _ = Tagger()
+
+        class IncompleteTagger(Tagger):
+            pass
+
+        with self.assertRaises(TypeError):
+            _ = IncompleteTagger()
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
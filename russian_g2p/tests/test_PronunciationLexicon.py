@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+import warnings
+
+import dawg
+
+from russian_g2p.Grapheme2Phoneme import Grapheme2Phoneme
+from russian_g2p.PronunciationLexicon import PronunciationLexicon, build_pronunciation_lexicon, \
+    get_pronunciation_lexicon, iterate_int_dawg
+
+
+class TestPronunciationLexicon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.words = ['сне+г', 'мо+зг', 'сто+ит', 'его+', 'кото+рого', 'е+ли', 'и+ва', 'учи+ться', 'во', 'ко+е-кто',
+                     'собака', 'ко+т']
+        cls.lexicon_name = build_pronunciation_lexicon('Modern', os.path.join(cls.tmp_dir.name, 'modern.lexicon'),
+                                                       cls.words)
+        cls.g2p = Grapheme2Phoneme(use_pronunciations=False, cache_size=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_iterate_int_dawg_positive01(self):
+        """ Перебор IntDAWG возвращает все ключи с их значениями. """
+        source_data = {'мама': 2, 'мамами': 2, 'рама': 2, 'снег': 3, 'ёж': 1, 'кое-кто': 2}
+        self.assertEqual(source_data, dict(iterate_int_dawg(dawg.IntDAWG(source_data.items()))))
+
+    def test_content_positive01(self):
+        """ Транскрипции словаря совпадают с транскрипциями по правилам перед любой фонемой. """
+        lexicon = PronunciationLexicon(self.lexicon_name)
+        self.assertEqual('Modern', lexicon.mode_name)
+        self.assertEqual(self.g2p.phoneme_symbols, lexicon.phoneme_symbols)
+        self.assertEqual(64, len(lexicon.version))
+        self.assertTrue(lexicon.is_fresh(self.g2p.compiled_mode))
+        for cur_word in self.words:
+            if cur_word == 'собака':
+                continue
+            for cur_form in [cur_word] + self.g2p.get_phrase_forms(cur_word):
+                self.assertIn(cur_form, lexicon)
+                for next_phoneme in ['sil', 'B', 'P', 'N0', 'A']:
+                    self.assertEqual(self.g2p.word_to_phonemes(cur_form, next_phoneme),
+                                     lexicon.get_transcription(cur_form, next_phoneme == 'B'))
+        del lexicon
+
+    def test_content_positive02(self):
+        """ Слово без ударения в словарь не попадает, чтобы предупреждение о нём сохранилось. """
+        lexicon = PronunciationLexicon(self.lexicon_name)
+        self.assertNotIn('собака', lexicon)
+        self.assertIsNone(lexicon.get_transcription('собака'))
+        del lexicon
+
+    def test_word_to_phonemes_positive01(self):
+        """ Grapheme2Phoneme со словарём транскрипций даёт тот же результат, что и по правилам. """
+        lexicon = get_pronunciation_lexicon(self.g2p.compiled_mode, self.lexicon_name)
+        self.assertIsNotNone(lexicon)
+        self.assertIs(lexicon, get_pronunciation_lexicon(self.g2p.compiled_mode, self.lexicon_name))
+        g2p = Grapheme2Phoneme(cache_size=0, pronunciations_name=self.lexicon_name)
+        self.assertIs(lexicon, g2p.pronunciations)
+        for cur_word in ['Сне+г', 'мо+зг', 'ко+т', 'ко+е-кто']:
+            for next_phoneme in ['sil', 'B', 'N0']:
+                self.assertEqual(self.g2p.word_to_phonemes(cur_word, next_phoneme),
+                                 g2p.word_to_phonemes(cur_word, next_phoneme))
+        source_phrase = 'ко+т и+ва во е+ли мо+зг сне+г'
+        self.assertEqual(self.g2p.phrase_to_phonemes(source_phrase), g2p.phrase_to_phonemes(source_phrase))
+        self.assertEqual(self.g2p.words_to_phonemes_batch(self.words[:4], 'B'),
+                         g2p.words_to_phonemes_batch(self.words[:4], 'B'))
+        with self.assertWarns(UserWarning):
+            g2p.word_to_phonemes('собака')
+
+    def test_get_pronunciation_lexicon_positive01(self):
+        """ Словарь транскрипций для другого режима не используется. """
+        classic_g2p = Grapheme2Phoneme('Classic', use_pronunciations=False)
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            warnings.simplefilter('always')
+            self.assertIsNone(get_pronunciation_lexicon(classic_g2p.compiled_mode, self.lexicon_name))
+        self.assertGreater(len(caught_warnings), 0)
+
+    def test_get_pronunciation_lexicon_positive02(self):
+        self.assertIsNone(get_pronunciation_lexicon(self.g2p.compiled_mode,
+                                                    os.path.join(self.tmp_dir.name, 'unknown.lexicon')))
+
+    def test_load_negative01(self):
+        damaged_name = os.path.join(self.tmp_dir.name, 'damaged.lexicon')
+        with open(self.lexicon_name, mode='rb') as fp:
+            data = bytearray(fp.read())
+        data[-1] ^= 0xFF
+        with open(damaged_name, mode='wb') as fp:
+            fp.write(data)
+        with self.assertRaisesRegex(ValueError, 'Checksum is wrong'):
+            _ = PronunciationLexicon(damaged_name)
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(get_pronunciation_lexicon(self.g2p.compiled_mode, damaged_name))
+
+    def test_load_negative02(self):
+        wrong_name = os.path.join(self.tmp_dir.name, 'wrong.lexicon')
+        with open(wrong_name, mode='wb') as fp:
+            fp.write(b'0123456789' * 10)
+        with self.assertRaisesRegex(ValueError, 'is not a correct pronunciation lexicon'):
+            _ = PronunciationLexicon(wrong_name)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from russian_g2p.ResultCache import ResultCache, get_dictionaries_version
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_name = os.path.join(self.tmp_dir.name, 'results.db')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_put_get_positive01(self):
+        cache = ResultCache(self.cache_name, 'v1', 'd1')
+        key = cache.get_key('Мама мыла раму')
+        self.assertEqual(key, cache.get_key('мама МЫЛА раму'))
+        self.assertNotEqual(key, cache.get_key('Мама мыла раму.'))
+        self.assertEqual({}, cache.get_many([key]))
+        cache.put_many({key: [['M', 'A0', 'M', 'A']]})
+        self.assertEqual({key: [['M', 'A0', 'M', 'A']]}, cache.get_many([key, cache.get_key('Нет')]))
+        self.assertEqual(1, len(cache))
+        cache.close()
+
+    def test_put_get_positive02(self):
+        """ Записи сохраняются между открытиями кэша, а ключи зависят от версии. """
+        cache = ResultCache(self.cache_name, 'v1', 'd1')
+        cache.put_many({cache.get_key('Мама'): [['M', 'A0', 'M', 'A']]})
+        cache.close()
+        cache = ResultCache(self.cache_name, 'v1', 'd1')
+        self.assertEqual([['M', 'A0', 'M', 'A']], cache.get_many([cache.get_key('Мама')])[cache.get_key('Мама')])
+        cache.close()
+        other_cache = ResultCache(self.cache_name, 'v2', 'd1')
+        self.assertEqual({}, other_cache.get_many([other_cache.get_key('Мама')]))
+        self.assertEqual(1, len(other_cache))
+        other_cache.close()
+
+    def test_many_keys_positive01(self):
+        cache = ResultCache(self.cache_name, 'v1')
+        items = {cache.get_key(str(it)): [[str(it)]] for it in range(1200)}
+        cache.put_many(items)
+        self.assertEqual(items, cache.get_many(list(items.keys())))
+        cache.close()
+
+    def test_invalidation_positive01(self):
+        """ При изменении словарей все записи кэша удаляются. """
+        cache = ResultCache(self.cache_name, 'v1', 'd1')
+        cache.put_many({cache.get_key('Мама'): [['M', 'A0', 'M', 'A']]})
+        cache.close()
+        cache = ResultCache(self.cache_name, 'v1', 'd2')
+        self.assertEqual(0, len(cache))
+        cache.close()
+
+    def test_dictionaries_version_positive01(self):
+        self.assertEqual(64, len(get_dictionaries_version()))
+        self.assertEqual(get_dictionaries_version(), get_dictionaries_version())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
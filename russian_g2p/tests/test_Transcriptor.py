@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
 
 from russian_g2p.Transcription import Transcription
+from russian_g2p.tests import pymorphy_is_available
 
 
 class TestAll(unittest.TestCase):
@@ -23,6 +26,13 @@ class TestAll(unittest.TestCase):
         real_variants = self.__transcription.transcribe([source_phrase])[0]
         self.assertEqual(target_variants, real_variants)
 
+    def test_normal_ids(self):
+        source_phrase = 'Мама мыла раму'
+        target_variants = [['M', 'A0', 'M', 'A', 'M', 'Y0', 'L', 'A', 'R', 'A0', 'M', 'U']]
+        symbols = self.__transcription.phoneme_symbols
+        real_variants = self.__transcription.transcribe([source_phrase], output_format='array')[0]
+        self.assertEqual(target_variants, [[symbols[it] for it in cur] for cur in real_variants])
+
     def test_nothing(self):
         source_phrase = '...'
         target_variants = []
@@ -42,5 +52,181 @@ class TestAll(unittest.TestCase):
         real_variants_2 = self.__transcription.transcribe([source_phrase_2])[0]
         self.assertEqual(real_variants_1, real_variants_2)
 
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestWorkers(unittest.TestCase):
+    def test_workers(self):
+        """ Несколько рабочих процессов дают те же результаты в том же порядке, что и один процесс. """
+        source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'Он открыл старый замок.',
+                          'Я иду домой', 'Мама мыла раму']
+        transcription = Transcription(tagger='pymorphy2')
+        target_variants = transcription.transcribe(source_phrases)
+        with Transcription(tagger='pymorphy2', workers=2) as parallel_transcription:
+            self.assertEqual(target_variants, parallel_transcription.transcribe(source_phrases))
+            self.assertEqual([], parallel_transcription.transcribe([]))
+            self.assertEqual(transcription.phoneme_symbols, parallel_transcription.phoneme_symbols)
+        del transcription
+
+    def test_workers_negative01(self):
+        with self.assertRaises(AssertionError):
+            _ = Transcription(tagger='pymorphy2', workers=0)
+
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestStats(unittest.TestCase):
+    def test_stats(self):
+        """ Статистика учитывает все пакеты, тексты и слова, а функция обратного вызова получает каждый пакет. """
+        batches_stats = []
+        transcription = Transcription(tagger='pymorphy2', stats_callback=batches_stats.append)
+        source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'Я иду домой']
+        transcription.transcribe(source_phrases)
+        list(transcription.transcribe_iter(source_phrases, texts_per_batch=3, pipeline_depth=1))
+        self.assertEqual(3, transcription.stats.n_batches)
+        self.assertEqual(8, transcription.stats.n_texts)
+        self.assertEqual(24, transcription.stats.n_words)
+        self.assertEqual(4, transcription.stats.max_batch_size)
+        self.assertEqual([4, 3, 1], [cur.n_texts for cur in batches_stats])
+        self.assertEqual({'preprocessing': 0, 'accenting': 0, 'g2p': 0}, transcription.stats.failures)
+        self.assertTrue(all(map(lambda it: it > 0.0, transcription.stats.stage_times.values())))
+        self.assertGreater(transcription.stats.words_per_second, 0.0)
+        transcription.reset_stats()
+        self.assertEqual(0, transcription.stats.n_texts)
+        self.assertEqual(0.0, transcription.stats.texts_per_second)
+        del transcription
+
+    def test_stats_failures(self):
+        """ Тексты, на которых этап завершился ошибкой, подсчитываются. """
+        transcription = Transcription(tagger='pymorphy2')
+        with self.assertRaises(Exception):
+            transcription.transcribe(['Мама мыла раму', None])
+        self.assertEqual(2, transcription.stats.failures['preprocessing'])
+        self.assertEqual(2, transcription.stats.n_texts)
+        del transcription
+
+    def test_stats_failures02(self):
+        """ Текст, часть которого после очистки не содержит слов (только цифры), не транскрибируется. """
+        transcription = Transcription(tagger='pymorphy2')
+        real_variants = transcription.transcribe(['Мама, 2020!', 'Мама мыла раму'])
+        self.assertEqual([], real_variants[0])
+        self.assertEqual([['M', 'A0', 'M', 'A', 'M', 'Y0', 'L', 'A', 'R', 'A0', 'M', 'U']], real_variants[1])
+        self.assertEqual(1, transcription.stats.failures['g2p'])
+        del transcription
+
+    def test_stats_workers(self):
+        """ Статистика рабочих процессов собирается в основном процессе. """
+        source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'Я иду домой']
+        with Transcription(tagger='pymorphy2', workers=2) as transcription:
+            transcription.transcribe(source_phrases)
+            self.assertEqual(4, transcription.stats.n_texts)
+            self.assertEqual(12, transcription.stats.n_words)
+
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestTranscribeIter(unittest.TestCase):
+    def setUp(self):
+        self.__transcription = Transcription(tagger='pymorphy2')
+
+    def tearDown(self):
+        del self.__transcription
+
+    def test_transcribe_iter(self):
+        """ Потоковая транскрипция порциями даёт те же результаты в том же порядке. """
+        source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'Он открыл старый замок.',
+                          'Я иду домой', 'Мама мыла раму', 'Кто-нибудь выучил фразео-, нео- и прочие измы?']
+        target_variants = self.__transcription.transcribe(source_phrases)
+        for texts_per_batch in [1, 3, 1000]:
+            real_variants = self.__transcription.transcribe_iter(iter(source_phrases),
+                                                                 texts_per_batch=texts_per_batch)
+            self.assertEqual(target_variants, list(real_variants))
+        self.assertEqual([], list(self.__transcription.transcribe_iter([])))
+
+    def test_transcribe_iter_lazy(self):
+        """ Тексты читаются не дальше текущей порции. """
+        consumed = []
+
+        def generate_texts():
+            for cur in range(10):
+                consumed.append(cur)
+                yield 'Мама мыла раму'
+
+        real_variants = self.__transcription.transcribe_iter(generate_texts(), texts_per_batch=4)
+        self.assertEqual([['M', 'A0', 'M', 'A', 'M', 'Y0', 'L', 'A', 'R', 'A0', 'M', 'U']], next(real_variants))
+        self.assertEqual(4, len(consumed))
+        self.assertEqual(9, len(list(real_variants)))
+        self.assertEqual(10, len(consumed))
+
+    def test_transcribe_iter_pipeline(self):
+        """ Разметка в фоновом потоке не меняет результатов и их порядка. """
+        source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'Он открыл старый замок.',
+                          'Я иду домой', 'Мама мыла раму', 'Кто-нибудь выучил фразео-, нео- и прочие измы?']
+        target_variants = self.__transcription.transcribe(source_phrases)
+        for pipeline_depth in [1, 3]:
+            real_variants = self.__transcription.transcribe_iter(source_phrases, texts_per_batch=2,
+                                                                 pipeline_depth=pipeline_depth)
+            self.assertEqual(target_variants, list(real_variants))
+        real_variants = self.__transcription.transcribe_iter(source_phrases, texts_per_batch=1, pipeline_depth=1)
+        self.assertEqual(target_variants[0], next(real_variants))
+        real_variants.close()
+
+    def test_transcribe_iter_pipeline_negative01(self):
+        """ Ошибка при чтении текстов в фоновом потоке передаётся вызывающему коду. """
+
+        def generate_texts():
+            yield 'Мама мыла раму'
+            raise RuntimeError('Texts are damaged!')
+
+        with self.assertRaisesRegex(RuntimeError, 'Texts are damaged!'):
+            _ = list(self.__transcription.transcribe_iter(generate_texts(), pipeline_depth=1))
+
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_name = os.path.join(self.tmp_dir.name, 'results.db')
+        self.source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'мама МЫЛА раму']
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cache(self):
+        """ Транскрипции из кэша совпадают с вычисленными заново во всех форматах и всех режимах. """
+        with Transcription(tagger='pymorphy2') as transcription:
+            target_variants = transcription.transcribe(self.source_phrases)
+            target_ids = transcription.transcribe(self.source_phrases, output_format='array')
+        with Transcription(tagger='pymorphy2', cache_name=self.cache_name) as transcription:
+            self.assertEqual(target_variants, transcription.transcribe(self.source_phrases))
+            self.assertEqual(1, transcription.stats.cache_hits)
+            self.assertEqual(3, transcription.stats.n_texts)
+            self.assertEqual(target_ids, transcription.transcribe(self.source_phrases, output_format='array'))
+            self.assertEqual(4, transcription.stats.n_texts)
+            self.assertEqual(target_variants, list(transcription.transcribe_iter(self.source_phrases,
+                                                                                 texts_per_batch=3)))
+            self.assertEqual(target_variants, list(transcription.transcribe_iter(self.source_phrases,
+                                                                                 texts_per_batch=3,
+                                                                                 pipeline_depth=1)))
+        with Transcription(tagger='pymorphy2', cache_name=self.cache_name) as transcription:
+            self.assertEqual(target_variants, transcription.transcribe(self.source_phrases))
+            self.assertEqual(3, transcription.stats.cache_hits)
+            self.assertEqual(1, transcription.stats.n_texts)
+
+    def test_cache_settings(self):
+        """ Записи, сделанные при других настройках транскрипции, не используются. """
+        with Transcription(tagger='pymorphy2', cache_name=self.cache_name) as transcription:
+            transcription.transcribe(self.source_phrases)
+        with Transcription(tagger='pymorphy2', tag_only_homographs=False, cache_name=self.cache_name) as transcription:
+            transcription.transcribe(self.source_phrases)
+            self.assertEqual(1, transcription.stats.cache_hits)
+
+    def test_cache_workers(self):
+        """ Кэш работает вместе с рабочими процессами. """
+        with Transcription(tagger='pymorphy2', cache_name=self.cache_name) as transcription:
+            target_variants = transcription.transcribe(self.source_phrases)
+        with Transcription(tagger='pymorphy2', workers=2, cache_name=self.cache_name) as transcription:
+            self.assertEqual(target_variants, transcription.transcribe(self.source_phrases + ['Я иду домой'])[:4])
+            self.assertEqual(3, transcription.stats.cache_hits)
+            self.assertEqual(2, transcription.stats.n_texts)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
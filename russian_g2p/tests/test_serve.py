@@ -0,0 +1,148 @@
+import json
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from russian_g2p.Preprocessor import PymorphyTagger
+from russian_g2p.serve import TranscriptionBatcher, TranscriptionServer
+from russian_g2p.Transcription import Transcription
+from russian_g2p.tests import pymorphy_is_available
+
+
+class FailingTagger(PymorphyTagger):
+    def tag_sentences(self, sentences: list, batch_size: int) -> list:
+        if any(map(lambda it: 'бздыщ' in it, sentences)):
+            raise ValueError('The tagger has failed!')
+        return super().tag_sentences(sentences, batch_size)
+
+
+def send_request(url: str, data=None) -> dict:
+    if data is None:
+        request = Request(url)
+    else:
+        request = Request(url, data=json.dumps(data).encode('utf-8'), method='POST',
+                          headers={'Content-Type': 'application/json'})
+    with urlopen(request, timeout=60) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestServe(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.transcription = Transcription(tagger='pymorphy2')
+        cls.batcher = TranscriptionBatcher(cls.transcription, max_batch_size=4, max_wait=0.05)
+        cls.server = TranscriptionServer(('127.0.0.1', 0), cls.batcher)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.batcher.stop()
+        del cls.transcription
+
+    def request(self, path: str, data=None) -> dict:
+        return send_request(self.url + path, data)
+
+    def test_transcribe(self):
+        """ Тексты одновременных запросов транскрибируются так же, как и по отдельности. """
+        source_phrases = ['Мама мыла раму', 'Мама мыла ра-му, а ты?! - Нет.', '...', 'Он открыл старый замок.',
+                          'Я иду домой', 'Кто-нибудь выучил фразео-, нео- и прочие измы?']
+        target_variants = self.transcription.transcribe(source_phrases)
+        real_variants = [None for _ in range(len(source_phrases))]
+
+        def send(idx: int):
+            real_variants[idx] = self.request('/transcribe', {'text': source_phrases[idx]})['transcriptions'][0]
+
+        threads = [threading.Thread(target=send, args=(it,)) for it in range(len(source_phrases))]
+        for cur in threads:
+            cur.start()
+        for cur in threads:
+            cur.join()
+        self.assertEqual(target_variants, real_variants)
+        self.assertEqual({'transcriptions': target_variants}, self.request('/transcribe', {'texts': source_phrases}))
+
+    def test_metrics(self):
+        self.request('/transcribe', {'texts': ['Мама мыла раму']})
+        metrics = self.request('/metrics')
+        self.assertEqual(0, metrics['queue_depth'])
+        self.assertGreater(metrics['texts'], 0)
+        self.assertGreater(metrics['batches'], 0)
+        self.assertLessEqual(metrics['batch_size']['max'], 4)
+        self.assertIn('p99', metrics['latency']['queue'])
+        self.assertIn('p99', metrics['latency']['transcription'])
+        for cur_stage in ('preprocessing', 'accenting', 'g2p'):
+            self.assertGreaterEqual(metrics['latency'][cur_stage]['max'], 0.0)
+        self.assertEqual(metrics['texts'], metrics['stages']['texts'])
+        self.assertEqual({'preprocessing', 'accenting', 'g2p'}, set(metrics['stages']['stage_times'].keys()))
+        self.assertEqual({'status': 'ok'}, self.request('/health'))
+
+    def test_transcribe_negative01(self):
+        with self.assertRaises(HTTPError) as cm:
+            self.request('/transcribe', {'texts': 'Мама мыла раму'})
+        self.assertEqual(400, cm.exception.code)
+        cm.exception.close()
+        with self.assertRaises(HTTPError) as cm:
+            self.request('/unknown')
+        self.assertEqual(404, cm.exception.code)
+        cm.exception.close()
+
+
+@unittest.skipUnless(pymorphy_is_available(), 'pymorphy and russian-tagsets are not installed')
+class TestServeFailures(unittest.TestCase):
+    def test_failures(self):
+        """ Ошибку получает только ошибочный текст, а не весь пакет. """
+        transcription = Transcription(tagger=FailingTagger())
+        batcher = TranscriptionBatcher(transcription, max_batch_size=4, max_wait=0.1)
+        # в фразе с ошибкой есть омограф, иначе она не попадёт на морфологический анализ
+        futures = [batcher.submit(cur) for cur in ['Мама мыла раму', 'Бздыщ и замок', 'Я иду домой']]
+        with self.assertRaisesRegex(ValueError, 'The tagger has failed'):
+            futures[1].result(timeout=60)
+        real_variants = [futures[0].result(timeout=60), futures[2].result(timeout=60)]
+        metrics = batcher.get_metrics()
+        batcher.stop()
+        self.assertEqual(transcription.transcribe(['Мама мыла раму', 'Я иду домой']), real_variants)
+        self.assertEqual(1, metrics['batches'])
+        self.assertEqual(1, metrics['errors'])
+
+    def test_stopped(self):
+        """ После остановки пакетов сервер отвечает 503. """
+        batcher = TranscriptionBatcher(Transcription(tagger='pymorphy2'))
+        batcher.stop()
+        with self.assertRaises(RuntimeError):
+            batcher.submit('Мама мыла раму')
+        server = TranscriptionServer(('127.0.0.1', 0), batcher)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            with self.assertRaises(HTTPError) as cm:
+                send_request(f'http://127.0.0.1:{server.server_address[1]}/transcribe', {'text': 'Мама мыла раму'})
+            self.assertEqual(503, cm.exception.code)
+            cm.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_timeout(self):
+        """ Если транскрипция не завершилась вовремя, то сервер отвечает 504. """
+        batcher = TranscriptionBatcher(Transcription(tagger='pymorphy2'), max_batch_size=64, max_wait=30.0)
+        server = TranscriptionServer(('127.0.0.1', 0), batcher, request_timeout=0.2)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            with self.assertRaises(HTTPError) as cm:
+                send_request(f'http://127.0.0.1:{server.server_address[1]}/transcribe', {'text': 'Мама мыла раму'})
+            self.assertEqual(504, cm.exception.code)
+            cm.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            batcher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
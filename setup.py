@@ -66,7 +66,7 @@ setup(
     # dependencies). You can install these using the following syntax,
     # for example:
     # $ pip install -e .[dev,test]
-    extras_require={},
+    extras_require={'numpy': ['numpy'], 'pymorphy2': ['pymorphy3', 'russian-tagsets']},
 
     # If there are data files included in your packages that need to be
     # installed, specify them here.  If using Python 2.6 or less, then these